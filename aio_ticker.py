@@ -0,0 +1,332 @@
+# aio_ticker.py
+"""
+asyncio implementation of the Kite ticker.
+
+Same public API and callbacks as `ticker.KiteTicker` (subscribe, set_mode,
+on_ticks, reconnect with exponential backoff, ping/pong checks), but the
+connection runs on a single asyncio event loop instead of the twisted
+reactor. The websocket protocol is handled by `wsproto` over asyncio streams.
+
+The loop is exposed as `ticker.loop` so other coroutines (trigger
+evaluation etc.) can be hosted on it, e.g. with
+`asyncio.run_coroutine_threadsafe(coro, ticker.loop)`.
+"""
+import asyncio
+import random
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+import six
+from wsproto import ConnectionType, WSConnection
+from wsproto.connection import ConnectionState
+from wsproto.events import (
+    AcceptConnection,
+    BytesMessage,
+    CloseConnection,
+    Ping,
+    Pong,
+    RejectConnection,
+    Request,
+    TextMessage,
+)
+
+from logger_config import setup_logger
+from ticker import KiteTicker
+
+logger = setup_logger("Async_Kite_Ticker")
+
+
+class _AsyncWebSocket:
+    """
+    Minimal stand-in for the autobahn protocol object `KiteTicker` talks to.
+
+    `sendMessage` / `sendClose` are safe to call from any thread, the write
+    is always done on the event loop.
+    """
+
+    STATE_CONNECTING = 0
+    STATE_OPEN = 1
+    STATE_CLOSING = 2
+    STATE_CLOSED = 3
+
+    def __init__(self, loop, connection, writer):
+        self.loop = loop
+        self.connection = connection
+        self.writer = writer
+        self.state = self.STATE_CONNECTING
+
+    def sendMessage(self, payload, isBinary=False):  # noqa
+        if self.state != self.STATE_OPEN:
+            raise RuntimeError("WebSocket is not open")
+
+        if isBinary:
+            event = BytesMessage(data=bytes(payload))
+        else:
+            event = TextMessage(data=payload.decode("utf-8") if isinstance(payload, bytes) else payload)
+        self._call(self._send, event)
+
+    def sendClose(self, code=None, reason=None):  # noqa
+        self._call(self._close, code or 1000, reason or "")
+
+    def _call(self, fn, *args):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self.loop:
+            fn(*args)
+        else:
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def _send(self, event):
+        if self.connection.state == ConnectionState.OPEN:
+            self.writer.write(self.connection.send(event))
+
+    def _close(self, code, reason):
+        if self.connection.state == ConnectionState.OPEN:
+            self.state = self.STATE_CLOSING
+            self.writer.write(self.connection.send(CloseConnection(code=code, reason=reason)))
+
+    def abort(self):
+        self.state = self.STATE_CLOSED
+        self.writer.close()
+
+
+class AsyncKiteTicker(KiteTicker):
+    """`KiteTicker` running on asyncio. See `KiteTicker` for the callbacks and tick structure."""
+
+    PING_INTERVAL = 2.5
+    READ_CHUNK = 64 * 1024
+
+    # Backoff parameters of twisted's ReconnectingClientFactory, so both backends retry alike
+    _initial_delay = 1.0
+    _factor = 2.7182818284590451
+    _jitter = 0.11962656472
+
+    def __init__(self, api_key, access_token, debug=False, root=None,
+                 reconnect=True, reconnect_max_tries=KiteTicker.RECONNECT_MAX_TRIES,
+                 reconnect_max_delay=KiteTicker.RECONNECT_MAX_DELAY, connect_timeout=KiteTicker.CONNECT_TIMEOUT,
+                 tick_format=KiteTicker.TICK_FORMAT_DICT, decode_profile=KiteTicker.PROFILE_FULL, recorder=None):
+        """Same arguments as `KiteTicker`."""
+        super(AsyncKiteTicker, self).__init__(
+            api_key, access_token, debug=debug, root=root,
+            reconnect=reconnect, reconnect_max_tries=reconnect_max_tries, reconnect_max_delay=reconnect_max_delay,
+            connect_timeout=connect_timeout, tick_format=tick_format, decode_profile=decode_profile, recorder=recorder,
+        )
+        # KiteTicker does not keep `reconnect`, the retry loop of this backend honours it
+        self.reconnect = reconnect
+
+        self.loop = None
+        self.factory = None
+        self.websocket_thread = None
+
+        self._closing = False
+        self._retries = 0
+        self._session_opened = False  # the current session got past the handshake
+        self._last_pong_time = None
+        self._wakeup = None
+
+    # ---------------------------------------------------------
+    # CONNECTION LIFECYCLE
+    # ---------------------------------------------------------
+    def connect(self, threaded=False, disable_ssl_verification=False, proxy=None):
+        """
+        Establish a websocket connection.
+
+        - `threaded` runs a dedicated event loop in a daemon thread, otherwise this blocks on `asyncio.run`.
+        - `disable_ssl_verification` skips certificate verification.
+        - `proxy` is not supported by the asyncio backend.
+        """
+        if proxy:
+            raise ValueError("proxy is not supported by AsyncKiteTicker")
+
+        coro = self.run(disable_ssl_verification=disable_ssl_verification)
+
+        if threaded:
+            self.websocket_thread = threading.Thread(target=asyncio.run, args=(coro,), name="kite-ticker-aio", daemon=True)
+            self.websocket_thread.start()
+        else:
+            asyncio.run(coro)
+
+    async def run(self, disable_ssl_verification=False):
+        """Connect and keep reconnecting until `close()`/`stop()`, on the running event loop."""
+        self.loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._retries = 0
+
+        while not self._closing:
+            try:
+                await self._session(disable_ssl_verification)
+            except Exception as e:
+                if not self._closing:
+                    logger.error("Connection error: %s", e)
+                    self._on_error(self.ws, 0, str(e))
+                if self._session_opened:
+                    # An open connection died without a close frame → report it closed like a dropped one
+                    self._on_close(self.ws, 1006, str(e))
+
+            if self._closing or not self.reconnect:
+                break
+
+            self._retries += 1
+            if self._retries > self.reconnect_max_tries:
+                logger.error("Maximum retries (%s) exhausted.", self.reconnect_max_tries)
+                self._on_noreconnect()
+                break
+
+            delay = self._next_delay()
+            logger.error("Retrying connection. Retry attempt count: %s. Next retry in around: %s seconds",
+                         self._retries, int(round(delay)))
+            self._on_reconnect(self._retries)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+        self.ws = None
+
+    def _next_delay(self):
+        delay = min(self._initial_delay * (self._factor ** self._retries), self.reconnect_max_delay)
+        return random.normalvariate(delay, delay * self._jitter) if self._jitter else delay
+
+    def is_connected(self):
+        return bool(self.ws and self.ws.state == self.ws.STATE_OPEN)
+
+    def stop_retry(self):
+        """Stop auto retry, the current connection (if any) is left open."""
+        self._closing = True
+        if self.loop and self._wakeup:
+            try:
+                self.loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # run() already ended and its loop is closed
+
+    def stop(self):
+        """Close the connection and end the event loop run."""
+        self.stop_retry()
+        if self.ws:
+            self.ws.sendClose(1000, "stop")
+
+    # ---------------------------------------------------------
+    # ONE CONNECTION
+    # ---------------------------------------------------------
+    async def _session(self, disable_ssl_verification):
+        self._session_opened = False
+        url = urlsplit(self.socket_url)
+        secure = url.scheme == "wss"
+        port = url.port or (443 if secure else 80)
+
+        context = None
+        if secure:
+            context = ssl.create_default_context()
+            if disable_ssl_verification:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(url.hostname, port, ssl=context,
+                                    server_hostname=url.hostname if secure else None),
+            self.connect_timeout,
+        )
+
+        connection = WSConnection(ConnectionType.CLIENT)
+        ws = _AsyncWebSocket(self.loop, connection, writer)
+        self.ws = ws
+
+        target = url.path or "/"
+        if url.query:
+            target += "?" + url.query
+
+        writer.write(connection.send(Request(
+            host=url.netloc,
+            target=target,
+            extra_headers=[
+                (b"X-Kite-Version", b"3"),
+                (b"User-Agent", six.b(self._user_agent())),
+            ],
+        )))
+
+        heartbeat = None
+        message = []
+
+        try:
+            while True:
+                data = await reader.read(self.READ_CHUNK)
+                if not data:
+                    connection.receive_data(None)
+                else:
+                    connection.receive_data(data)
+                    self._last_pong_time = time.time()
+
+                for event in connection.events():
+                    if isinstance(event, AcceptConnection):
+                        ws.state = ws.STATE_OPEN
+                        self._session_opened = True
+                        self._retries = 0
+                        self._last_pong_time = time.time()
+                        heartbeat = self.loop.create_task(self._heartbeat(ws))
+                        self._on_connect(ws, event)
+                        self._on_open(ws)
+
+                    elif isinstance(event, RejectConnection):
+                        raise ConnectionError("WebSocket handshake rejected: {}".format(event.status_code))
+
+                    elif isinstance(event, (BytesMessage, TextMessage)):
+                        message.append(event.data)
+                        if event.message_finished:
+                            is_binary = isinstance(event, BytesMessage)
+                            payload = b"".join(message) if is_binary else "".join(message)
+                            message = []
+                            self._dispatch(ws, payload, is_binary)
+
+                    elif isinstance(event, Ping):
+                        writer.write(connection.send(event.response()))
+
+                    elif isinstance(event, Pong):
+                        self._last_pong_time = time.time()
+
+                    elif isinstance(event, CloseConnection):
+                        if connection.state == ConnectionState.REMOTE_CLOSING:
+                            writer.write(connection.send(event.response()))
+                        ws.state = ws.STATE_CLOSED
+                        if event.code == 1006:
+                            self._on_error(ws, event.code, event.reason)
+                        self._on_close(ws, event.code, event.reason)
+                        return
+
+                if not data:
+                    ws.state = ws.STATE_CLOSED
+                    self._on_error(ws, 1006, "Connection lost")
+                    self._on_close(ws, 1006, "Connection lost")
+                    return
+
+                await writer.drain()
+        finally:
+            ws.state = ws.STATE_CLOSED
+            if heartbeat:
+                heartbeat.cancel()
+            writer.close()
+
+    def _dispatch(self, ws, payload, is_binary):
+        try:
+            self._on_message(ws, payload, is_binary)
+        except Exception:
+            logger.exception("❌ on_message callback error")
+
+    async def _heartbeat(self, ws):
+        """Ping every PING_INTERVAL and drop the connection if nothing came back for 2 intervals."""
+        while ws.state == ws.STATE_OPEN:
+            await asyncio.sleep(self.PING_INTERVAL)
+
+            last_pong_diff = time.time() - (self._last_pong_time or 0)
+            if last_pong_diff > 2 * self.PING_INTERVAL:
+                logger.error("Last pong was %s seconds ago. So dropping connection to reconnect.", round(last_pong_diff, 2))
+                ws.abort()
+                return
+
+            ws._send(Ping())
@@ -0,0 +1,210 @@
+# candles.py
+"""
+Incremental OHLCV candles for several intervals at once.
+
+Every tick updates open/high/low/close/volume of the running candle of each
+(token, interval) in place, so the cost per tick is a few comparisons and the
+memory per token is one small record per interval, however long the period.
+Periods are aligned to the 09:15 IST session start (9:15, 9:18, 9:21 ... for
+3 min). A candle closes on the first tick of a later period, or by `flush`
+once its end has passed; closed candles are handed to the listeners.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+
+from logger_config import IST, setup_logger
+
+logger = setup_logger("Candles")
+
+CANDLE_INTERVALS = tuple(int(m) for m in os.getenv("CANDLE_INTERVALS", "3,5,15").split(",") if m.strip())
+
+MINUTE_NS = 60 * 10**9
+DAY_NS = 24 * 60 * MINUTE_NS
+IST_OFFSET_NS = 330 * MINUTE_NS           # IST is UTC+05:30, no DST
+SESSION_START_NS = (9 * 60 + 15) * MINUTE_NS  # 09:15 IST, from local midnight
+
+
+def period_bounds(ts_ns, interval_ns):
+    """`(start_ns, end_ns)` of the period containing `ts_ns`, aligned to that day's 09:15 IST."""
+    day_start = (ts_ns + IST_OFFSET_NS) // DAY_NS * DAY_NS - IST_OFFSET_NS
+    session_start = day_start + SESSION_START_NS
+    start = session_start + (ts_ns - session_start) // interval_ns * interval_ns
+    return start, start + interval_ns
+
+
+class Candle:
+    __slots__ = ("token", "interval", "start_ns", "end_ns",
+                 "open", "high", "low", "close", "volume", "tick_count", "_volume_base")
+
+    def __init__(self, token, interval, start_ns, end_ns, price, volume_base):
+        self.token = token
+        self.interval = interval   # minutes
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.open = self.high = self.low = self.close = price
+        self.volume = 0
+        self.tick_count = 1
+        self._volume_base = volume_base  # cumulative day volume when the period started
+
+    @property
+    def start(self):
+        return datetime.fromtimestamp(self.start_ns / 1e9, IST)
+
+    @property
+    def end(self):
+        return datetime.fromtimestamp(self.end_ns / 1e9, IST)
+
+    def to_dict(self):
+        return {
+            "token": self.token,
+            "interval": self.interval,
+            "period_start": str(self.start),
+            "period_end": str(self.end),
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+            "tick_count": self.tick_count,
+        }
+
+    def __repr__(self):
+        return "Candle(%s %sm %s O=%s H=%s L=%s C=%s V=%s)" % (
+            self.token, self.interval, self.start.strftime("%H:%M"),
+            self.open, self.high, self.low, self.close, self.volume)
+
+
+class CandleAggregator:
+    """
+    Running candle per (token, interval). `update` is called by the tick dispatcher,
+    `flush` from any thread; listeners get `listener(candle)` for every closed candle.
+    """
+
+    def __init__(self, intervals=CANDLE_INTERVALS):
+        self.intervals = tuple(sorted({int(m) for m in intervals}))
+        self._open = {}          # token -> {interval: Candle}
+        self._last_volume = {}   # token -> last cumulative volume seen
+        self._listeners = ()
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # CONFIG
+    # ---------------------------------------------------------
+    def add_interval(self, minutes):
+        minutes = int(minutes)
+        with self._lock:
+            if minutes not in self.intervals:
+                self.intervals = tuple(sorted(self.intervals + (minutes,)))
+                logger.info("🕯 Candle intervals → %s", self.intervals)
+
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners = self._listeners + (listener,)
+        return listener
+
+    def remove_listener(self, listener):
+        with self._lock:
+            self._listeners = tuple(l for l in self._listeners if l is not listener)
+
+    # ---------------------------------------------------------
+    # WRITES
+    # ---------------------------------------------------------
+    def update(self, ticks, now_ns=None):
+        """Fold a tick batch into the running candles (tick dispatcher thread)."""
+        now_ns = now_ns or time.time_ns()
+        closed = []
+
+        with self._lock:
+            intervals = self.intervals
+            for tick in ticks:
+                token = tick.get("instrument_token")
+                price = tick.get("last_price")
+                if not token or price is None:
+                    continue
+
+                ts = getattr(tick, "received_ns", None) or now_ns
+                volume = tick["volume_traded"] if "volume_traded" in tick else None
+                last_volume = self._last_volume.get(token)
+                if volume is not None:
+                    self._last_volume[token] = volume
+
+                candles = self._open.get(token)
+                if candles is None:
+                    candles = self._open[token] = {}
+
+                for minutes in intervals:
+                    candle = candles.get(minutes)
+                    if candle is not None and ts >= candle.end_ns:
+                        closed.append(candle)
+                        candle = None
+
+                    if candle is None:
+                        start, end = period_bounds(ts, minutes * MINUTE_NS)
+                        base = last_volume if last_volume is not None else volume
+                        candles[minutes] = candle = Candle(token, minutes, start, end, price, base)
+                    else:
+                        if price > candle.high:
+                            candle.high = price
+                        elif price < candle.low:
+                            candle.low = price
+                        candle.close = price
+                        candle.tick_count += 1
+
+                    if volume is not None and candle._volume_base is not None:
+                        candle.volume = volume - candle._volume_base
+
+        self._emit(closed)
+
+    def flush(self, now_ns=None):
+        """Close every running candle whose period ended before `now_ns` (no later tick needed)."""
+        now_ns = now_ns or time.time_ns()
+        closed = []
+
+        with self._lock:
+            for candles in self._open.values():
+                for minutes in [m for m, c in candles.items() if c.end_ns <= now_ns]:
+                    closed.append(candles.pop(minutes))
+
+        self._emit(closed)
+        return closed
+
+    def retain(self, tokens):
+        """Drop the running candles of tokens not in `tokens` (e.g. after unsubscribing them)."""
+        keep = {int(t) for t in tokens}
+        with self._lock:
+            for token in [t for t in self._open if t not in keep]:
+                del self._open[token]
+                self._last_volume.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._open.clear()
+            self._last_volume.clear()
+
+    def _emit(self, closed):
+        if not closed:
+            return
+        closed.sort(key=lambda c: c.end_ns)
+        for candle in closed:
+            for listener in self._listeners:
+                try:
+                    listener(candle)
+                except Exception:
+                    logger.exception("❌ Candle listener error | %s", candle)
+
+    # ---------------------------------------------------------
+    # READS
+    # ---------------------------------------------------------
+    def current(self, token, minutes):
+        """The running (not yet closed) candle of `token` as a dict, or None."""
+        with self._lock:
+            candle = self._open.get(int(token), {}).get(int(minutes))
+            return candle.to_dict() if candle else None
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+candle_aggregator = CandleAggregator()
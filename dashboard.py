@@ -1,10 +1,18 @@
 import json
+import numpy as np
 from flask import Blueprint, jsonify, request, session
 from state_manager import trading_state as state
 from util import get_kite
+from latency import STAGE_NOTES, latency
+from order_executor import order_executor
+from service_ws import ws_manager
+from tick_history import tick_history
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
+HISTORY_MAX_SECONDS = 6.5 * 60 * 60  # one trading day
+HISTORY_MAX_POINTS = 5000
+
 
 EXCLUDED_KEYS = {
     "kite",
@@ -132,6 +140,48 @@ def get_trading_config():
     })
 
 
+@dashboard_bp.route("/latency", methods=["GET"])
+def latency_details():
+    if not session.get("logged_in"):
+        return jsonify({"success": False, "error": "Not logged in"}), 401
+
+    if request.args.get("reset") == "1":
+        latency.reset()
+
+    return jsonify({
+        "success": True,
+        "stages": latency.snapshot(),
+        "notes": STAGE_NOTES,
+        "tick_queue": ws_manager.tick_queue.stats(),
+        "orders": order_executor.stats(),
+    })
+
+
+@dashboard_bp.route("/history/<int:token>", methods=["GET"])
+def tick_history_details(token):
+    if not session.get("logged_in"):
+        return jsonify({"success": False, "error": "Not logged in"}), 401
+
+    # Bad or out of range values fall back to / are clamped into sane bounds instead of a 500
+    seconds = request.args.get("seconds", 300.0, type=float)
+    seconds = min(max(seconds, 1.0), HISTORY_MAX_SECONDS) if seconds == seconds else 300.0
+    points = min(max(request.args.get("points", 300, type=int), 1), HISTORY_MAX_POINTS)
+
+    ts, prices, _ = tick_history.last_seconds(token, seconds)
+
+    # Sparkline: evenly spaced sample of at most `points` ticks
+    if len(ts) > points > 0:
+        pick = np.linspace(0, len(ts) - 1, points).astype(int)
+        ts, prices = ts[pick], prices[pick]
+
+    return jsonify({
+        "success": True,
+        "token": token,
+        "time_ms": (ts // 1_000_000).tolist(),
+        "price": prices.tolist(),
+    })
+
+
 @dashboard_bp.route("/get-state-details", methods=["GET"])
 def get_state_details():
     if not session.get("logged_in"):
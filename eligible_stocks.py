@@ -1,5 +1,5 @@
 # eligible_stocks.py
-import json, os, time , os, pandas as pd
+import json, os, os, pandas as pd
 from datetime import date, datetime
 from flask import jsonify, session
 
@@ -8,6 +8,7 @@ from state_manager import trading_state as state
 
 # websocket & stocks service
 from service_ws import ws_manager
+from ticker import KiteTicker
 # from service_stocks import load_stocks_for_today
 
 
@@ -148,51 +149,14 @@ def run_eligibility(force: bool = False):
     else:
         logger.info("🔥 Force enabled — ignoring cache")
 
-    # ============================================================
-    # 3️⃣ FORCE CLEAN WEBSOCKET STATE (CRITICAL FOR PROD)
-    # ============================================================
-    logger.info("🧹 Resetting WebSocket state before eligibility")
-
-    try:
-        ws_manager.stop()
-    except Exception:
-        logger.exception("WS stop error (pre-eligibility)")
-
-    time.sleep(0.5)
-
-    # hard reset flags (prevents zombie WS in prod)
-    ws_manager.kws = None
-    ws_manager.connected = False
-    ws_manager.running = False
-
     kite =get_kite(state["username"])
     # ============================================================
-    # 4️⃣ Setup WebSocket (FRESH)
-    # ============================================================
-    logger.info("🔧 Setting up WebSocket (fresh)")
-
-    if not ws_manager.setup("PradeepApi", state["enctoken"], state["user_id"]):
-        logger.error("❌ WebSocket setup failed")
-        return {"success": False, "error": "WebSocket setup failed"}
-
-    logger.info("▶ Starting WebSocket thread")
-    ws_manager.start()
-
-    # ============================================================
-    # 5️⃣ Wait for WebSocket connection (PROD SAFE)
+    # 3️⃣ WebSocket (reused across engine phases)
     # ============================================================
-    for i in range(20):  # longer wait for prod latency
-        logger.info(
-            "⏳ Waiting for WS connection (%s/20) | connected=%s running=%s",
-            i + 1,
-            ws_manager.connected,
-            ws_manager.running
-        )
-        if ws_manager.connected:
-            break
-        time.sleep(0.5)
-
-    if not ws_manager.connected:
+    # Eligibility only reads ohlc.open + last_price
+    logger.info("🔌 Ensuring WebSocket connection")
+    if not ws_manager.ensure_connected("PradeepApi", state["enctoken"], state["user_id"],
+                                       decode_profile=KiteTicker.PROFILE_OHLC, timeout=10):
         logger.error("❌ WebSocket not connected (timeout)")
         return {"success": False, "error": "WebSocket not connected"}
 
@@ -205,25 +169,16 @@ def run_eligibility(force: bool = False):
     tokens = [int(s["instrument_token"]) for s in stocks]
     logger.info("📡 Subscribing tokens (INT): %s", tokens)
 
-    ws_manager.subscribe(tokens)
+    ws_manager.set_subscriptions(tokens)
 
     # ============================================================
     # 7️⃣ Wait for first tick (deterministic)
     # ============================================================
     logger.info("⏳ Waiting for ticks...")
-    for i in range(20):
-        live_keys = list(state.get("live_data", {}).keys())
-        logger.info("⏳ Tick wait %s/20 | live_data keys=%s", i + 1, live_keys)
-
-        if any(
-            str(s["instrument_token"]) in state["live_data"]
-            or s["instrument_token"] in state["live_data"]
-            for s in stocks
-        ):
-            logger.info("✅ At least one tick received")
-            break
-
-        time.sleep(0.5)
+    if ws_manager.wait_for_ticks(tokens, timeout=10):
+        logger.info("✅ At least one tick received | live_data keys=%s", list(state["live_data"].keys()))
+    else:
+        logger.warning("⚠️ No tick received within 10s")
 
     # ============================================================
     # 8️⃣ Eligibility logic (UNCHANGED)
@@ -301,20 +256,8 @@ def run_eligibility(force: bool = False):
     })
 
     # ============================================================
-    # 🔟 Cleanup (FULL RESET)
+    # 🔟 Connection stays open for the trading phase
     # ============================================================
-    logger.info("🛑 Stopping WebSocket (eligibility cleanup)")
-
-    try:
-        ws_manager.stop()
-    except Exception:
-        logger.exception("WS stop error (eligibility cleanup)")
-
-    ws_manager.kws = None
-    ws_manager.connected = False
-    ws_manager.running = False
-
-    state["websocket_status"] = "Disconnected"
     state["last_eligibility_check"] = datetime.now(timezone.utc)
 
     logger.info("✅ Eligibility completed successfully")
@@ -9,8 +9,47 @@ except ImportError:
     os.system('python -m pip install python-dateutil')
 
 
+import random
+import time
+
 import requests
 import dateutil.parser
+from requests.adapters import HTTPAdapter
+
+from latency import latency
+from logger_config import setup_logger
+
+logger = setup_logger("Kite_Trade")
+
+# Seconds (connect, read) an order POST may take before it is reported as failed
+ORDER_TIMEOUT = (float(os.getenv("KITE_ORDER_CONNECT_TIMEOUT", "1.0")), float(os.getenv("KITE_ORDER_READ_TIMEOUT", "3.0")))
+READ_TIMEOUT = (float(os.getenv("KITE_READ_CONNECT_TIMEOUT", "2.0")), float(os.getenv("KITE_READ_TIMEOUT", "5.0")))
+
+# Per endpoint (connect, read) budgets; anything not listed uses READ_TIMEOUT
+TIMEOUTS = {
+    "orders.place": ORDER_TIMEOUT,
+    "orders.modify": ORDER_TIMEOUT,
+    "orders.cancel": ORDER_TIMEOUT,
+    "user.profile": (2.0, 3.0),
+    "portfolio.holdings": (2.0, 10.0),
+}
+
+# Order and read traffic get separate connection pools, so dashboard reads never hold up an order
+ORDER_POOL_SIZE = int(os.getenv("KITE_ORDER_POOL_SIZE", "8"))
+READ_POOL_SIZE = int(os.getenv("KITE_READ_POOL_SIZE", "4"))
+
+# Only GETs are retried (idempotent); orders are never resent automatically
+READ_RETRIES = int(os.getenv("KITE_READ_RETRIES", "2"))
+RETRY_BACKOFF = 0.2  # seconds, doubled per attempt, +-50% jitter
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _pooled_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0, pool_block=False)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 def get_enctoken(userid, password, twofa):
@@ -68,28 +107,62 @@ class KiteApp:
     def __init__(self, enctoken):
         self.enctoken = enctoken
         self.headers = {"Authorization": f"enctoken {self.enctoken}"}
-        self.session = requests.session()
+        self.session = _pooled_session(READ_POOL_SIZE)         # reads (dashboard, reconcile, margins)
+        self.order_session = _pooled_session(ORDER_POOL_SIZE)  # order placement / modify / cancel
         self.root_url = "https://kite.zerodha.com/oms"
-        self.session.get(self.root_url, headers=self.headers)
 
+    # ---------------------------------------------------------
+    # TRANSPORT
+    # ---------------------------------------------------------
+    def _get(self, endpoint, url, **kwargs):
+        """GET with the endpoint's timeout, retried with jittered backoff on connection errors / 5xx / 429."""
+        timeout = TIMEOUTS.get(endpoint, READ_TIMEOUT)
+        for attempt in range(READ_RETRIES + 1):
+            try:
+                response = self.session.get(url, headers=self.headers, timeout=timeout, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == READ_RETRIES:
+                    return response
+                reason = response.status_code
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == READ_RETRIES:
+                    raise
+                reason = type(e).__name__
+
+            delay = RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+            logger.warning("🔁 %s retry %s/%s in %.2fs (%s)", endpoint, attempt + 1, READ_RETRIES, delay, reason)
+            time.sleep(delay)
+
+    def warm(self):
+        """Open the TLS connections of both pools ahead of the first real request."""
+        for session in (self.order_session, self.session):
+            try:
+                session.head(self.root_url, headers=self.headers, timeout=READ_TIMEOUT)
+            except requests.RequestException:
+                logger.warning("⚠️ Kite warm-up failed", exc_info=True)
+                return False
+        return True
+
+    # ---------------------------------------------------------
+    # READS
+    # ---------------------------------------------------------
     def margins(self):
-        margins = self.session.get(f"{self.root_url}/user/margins", headers=self.headers).json()["data"]
+        margins = self._get("user.margins", f"{self.root_url}/user/margins").json()["data"]
         return margins
 
     def profile(self):
-        profile = self.session.get(f"{self.root_url}/user/profile", headers=self.headers).json()["data"]
+        profile = self._get("user.profile", f"{self.root_url}/user/profile").json()["data"]
         return profile
 
     def orders(self):
-        orders = self.session.get(f"{self.root_url}/orders", headers=self.headers).json()["data"]
+        orders = self._get("orders.list", f"{self.root_url}/orders").json()["data"]
         return orders
 
     def positions(self):
-        positions = self.session.get(f"{self.root_url}/portfolio/positions", headers=self.headers).json()["data"]
+        positions = self._get("portfolio.positions", f"{self.root_url}/portfolio/positions").json()["data"]
         return positions
 
     def holdings(self):
-        holdings = self.session.get(f"{self.root_url}/portfolio/holdings", headers=self.headers).json()["data"]
+        holdings = self._get("portfolio.holdings", f"{self.root_url}/portfolio/holdings").json()["data"]
         return holdings
     
 
@@ -97,14 +170,40 @@ class KiteApp:
 
     def place_order(self, variety, exchange, tradingsymbol, transaction_type, quantity, product, order_type, price=None,
                     validity=None, disclosed_quantity=None, trigger_price=None, squareoff=None, stoploss=None,
-                    trailing_stoploss=None, tag=None):
-        params = locals()
-        del params["self"]
-        for k in list(params.keys()):
-            if params[k] is None:
-                del params[k]
-        order_id = self.session.post(f"{self.root_url}/orders/{variety}",
-                                     data=params, headers=self.headers).json()["data"]["order_id"]
+                    trailing_stoploss=None, tag=None, timeout=ORDER_TIMEOUT):
+        params = {
+            "exchange": exchange,
+            "tradingsymbol": tradingsymbol,
+            "transaction_type": transaction_type,
+            "quantity": quantity,
+            "product": product,
+            "order_type": order_type,
+        }
+        optional = (("price", price), ("validity", validity), ("disclosed_quantity", disclosed_quantity),
+                    ("trigger_price", trigger_price), ("squareoff", squareoff), ("stoploss", stoploss),
+                    ("trailing_stoploss", trailing_stoploss), ("tag", tag))
+        for key, value in optional:
+            if value is not None:
+                params[key] = value
+
+        return self.post_order(variety, params, timeout=timeout)
+
+    def post_order(self, variety, params, timeout=ORDER_TIMEOUT):
+        """
+        Send an already built order form. Raises on timeout; the order may still
+        have reached the exchange, so never resend blindly (order updates tell).
+        """
+        # ⏱ signal → send, send → response
+        sent_ns = time.time_ns()
+        signal_ns = latency.take_signal()
+        if signal_ns is not None:
+            latency.record("signal_to_send", sent_ns - signal_ns)
+
+        response = self.order_session.post(f"{self.root_url}/orders/{variety}",
+                                           data=params, headers=self.headers, timeout=timeout)
+        latency.since("order_rtt", sent_ns)
+
+        order_id = response.json()["data"]["order_id"]
         return order_id
 
     def modify_order(self, variety, order_id, parent_order_id=None, quantity=None, price=None, order_type=None,
@@ -115,15 +214,16 @@ class KiteApp:
             if params[k] is None:
                 del params[k]
 
-        order_id = self.session.put(f"{self.root_url}/orders/{variety}/{order_id}",
-                                    data=params, headers=self.headers).json()["data"][
-            "order_id"]
+        order_id = self.order_session.put(f"{self.root_url}/orders/{variety}/{order_id}",
+                                          data=params, headers=self.headers,
+                                          timeout=TIMEOUTS["orders.modify"]).json()["data"]["order_id"]
         return order_id
 
     def cancel_order(self, variety, order_id, parent_order_id=None):
-        order_id = self.session.delete(f"{self.root_url}/orders/{variety}/{order_id}",
-                                       data={"parent_order_id": parent_order_id} if parent_order_id else {},
-                                       headers=self.headers).json()["data"]["order_id"]
+        order_id = self.order_session.delete(f"{self.root_url}/orders/{variety}/{order_id}",
+                                             data={"parent_order_id": parent_order_id} if parent_order_id else {},
+                                             headers=self.headers,
+                                             timeout=TIMEOUTS["orders.cancel"]).json()["data"]["order_id"]
         return order_id
     
 
@@ -136,7 +236,7 @@ class KiteApp:
         # Use correct absolute LTP URL (do NOT use old root_url)
         url = f"https://api.kite.trade/quote/ltp?{params}"
 
-        response = self.session.get(url, headers=self.headers).json()
+        response = self._get("quote.ltp", url).json()
 
         # Validate
         if response.get("status") != "success":
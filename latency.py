@@ -0,0 +1,131 @@
+# latency.py
+"""
+Tick-to-trade latency histograms.
+
+Stages (nanoseconds, wall clock):
+    exchange_to_receive   exchange timestamp → frame received (full mode ticks only, 1s exchange resolution;
+                          stays empty with the engine's quote mode subscriptions)
+    receive_to_merge      frame received → tick written into the live quote table
+    merge_to_signal       tick merged → trigger callback started
+    signal_to_send        signal → order request sent
+    order_rtt             order request sent → response received
+
+Each histogram has 8 log-linear buckets per power of two (<= 12.5% error)
+and a `record` is a few integer operations, so it can sit on hot paths.
+Counts are not locked; a concurrent increment can very rarely be lost.
+"""
+import threading
+import time
+
+STAGES = (
+    "exchange_to_receive",
+    "receive_to_merge",
+    "merge_to_signal",
+    "signal_to_send",
+    "order_rtt",
+)
+
+# Stages that only fill under some feed setups → shown as notes on /latency
+STAGE_NOTES = {
+    "exchange_to_receive": "Only measured for MODE_FULL ticks decoded with the full profile; "
+                           "empty with the engine's MODE_QUOTE subscriptions (ltp / ohlc profiles).",
+}
+
+_SUB_BITS = 3
+_SUB_BUCKETS = 1 << _SUB_BITS
+
+
+def _bucket(ns):
+    bits = ns.bit_length()
+    if bits <= _SUB_BITS:
+        return ns
+    return (bits - _SUB_BITS) * _SUB_BUCKETS + ((ns >> (bits - _SUB_BITS - 1)) & (_SUB_BUCKETS - 1))
+
+
+def _bucket_bounds(index):
+    if index < _SUB_BUCKETS:
+        return index, index + 1
+    exponent, sub = divmod(index, _SUB_BUCKETS)
+    return (_SUB_BUCKETS + sub) << (exponent - 1), (_SUB_BUCKETS + sub + 1) << (exponent - 1)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (64 * _SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        if ns < 0:
+            ns = 0
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, p):
+        """Approximate `p`-th percentile in ns (bucket midpoint), None when empty."""
+        if not self.count:
+            return None
+
+        rank = max(1, int(round(self.count * p / 100.0)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min((low + high) / 2, self.max)
+        return self.max
+
+    def summary(self):
+        def ms(ns):
+            return None if ns is None else round(ns / 1e6, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count if self.count else None),
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max if self.count else None),
+        }
+
+
+class LatencyRecorder:
+    """One histogram per stage, plus the signal time of the order being placed on this thread."""
+
+    def __init__(self, stages=STAGES):
+        self.histograms = {stage: LatencyHistogram() for stage in stages}
+        self._local = threading.local()
+
+    def record(self, stage, ns):
+        self.histograms[stage].record(int(ns))
+
+    def since(self, stage, start_ns):
+        """Record `now - start_ns` for `stage`."""
+        self.histograms[stage].record(time.time_ns() - start_ns)
+
+    def mark_signal(self):
+        """Remember when the signal for the next order on this thread was detected."""
+        self._local.signal_ns = time.time_ns()
+
+    def take_signal(self):
+        """Signal time marked on this thread (cleared), or None."""
+        signal_ns = getattr(self._local, "signal_ns", None)
+        self._local.signal_ns = None
+        return signal_ns
+
+    def snapshot(self):
+        return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def reset(self):
+        for stage in self.histograms:
+            self.histograms[stage] = LatencyHistogram()
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+latency = LatencyRecorder()
@@ -0,0 +1,307 @@
+# live_quotes.py
+"""
+Columnar table of the latest quote per instrument.
+
+Every token gets a fixed slot in preallocated NumPy columns (last_price,
+open/high/low/close, volume, timestamp, update sequence), so a tick is a
+handful of in-place stores instead of a dict copy + merge. Fields a tick
+does not carry keep their previous value, never seen values are NaN.
+
+The writer (the tick dispatcher thread) and readers (Socket.IO feeds,
+monitors) are kept apart by a seqlock: `version` is odd while a write is in
+progress and readers retry their copy until it was taken between two
+equal, even versions. Ticks are never held up by readers.
+
+The table also behaves like the old `trading_state["live_data"]` dict
+(`live.get(token)`, `token in live`, `live[token]["ohlc"]["open"]`), with
+int or str tokens, returning a small dict per row.
+"""
+import time
+from collections.abc import Mapping
+from datetime import datetime
+
+import numpy as np
+
+SNAPSHOT_DTYPE = np.dtype([
+    ("instrument_token", "i8"),
+    ("last_price", "f8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+    ("timestamp", "f8"),
+    ("seq", "u8"),
+])
+
+_PRICE_COLUMNS = ("last_price", "open", "high", "low", "close", "volume", "timestamp")
+_OHLC = ("open", "high", "low", "close")
+
+
+class LiveQuoteTable(Mapping):
+    """Latest quote per token in NumPy columns. `timestamp` is the exchange time in epoch seconds."""
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.size = 0
+        self.seq = 0  # bumped once per update call
+        self.version = 0  # seqlock, odd while a write is in progress
+        self.read_retries = 0
+
+        self._slots = {}
+        self.tokens = np.zeros(capacity, dtype="i8")
+        self.columns = {name: np.full(capacity, np.nan) for name in _PRICE_COLUMNS}
+        self.updated = np.zeros(capacity, dtype="u8")
+
+    # ---------------------------------------------------------
+    # SLOTS
+    # ---------------------------------------------------------
+    def slot(self, token):
+        """Slot of `token` (int or str), or None if it never ticked."""
+        try:
+            return self._slots.get(int(token))
+        except (TypeError, ValueError):
+            return None
+
+    def slots(self, tokens):
+        """Slots of `tokens` as an int array, -1 for unknown tokens."""
+        get = self._slots.get
+        return np.fromiter((get(int(t), -1) for t in tokens), dtype="i8", count=len(tokens))
+
+    def _slot_for(self, token):
+        slot = self._slots.get(token)
+        if slot is None:
+            if self.size == self.capacity:
+                self._grow()
+            slot = self.size
+            self.size += 1
+            self.tokens[slot] = token
+            self._slots[token] = slot
+        return slot
+
+    def _grow(self):
+        capacity = self.capacity * 2
+
+        tokens = np.zeros(capacity, dtype="i8")
+        tokens[:self.capacity] = self.tokens
+        updated = np.zeros(capacity, dtype="u8")
+        updated[:self.capacity] = self.updated
+
+        columns = {}
+        for name, column in self.columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self.capacity] = column
+            columns[name] = grown
+
+        self.tokens, self.updated, self.columns = tokens, updated, columns
+        self.capacity = capacity
+
+    # ---------------------------------------------------------
+    # WRITES (tick dispatcher thread)
+    # ---------------------------------------------------------
+    def update(self, ticks):
+        """Apply dict / lazy `Tick` ticks in place. Returns the touched slots."""
+        self.version += 1
+        try:
+            return self._update(ticks)
+        finally:
+            self.version += 1
+
+    def _update(self, ticks):
+        self.seq += 1
+        seq = self.seq
+        touched = []
+
+        cols = self.columns
+        last_price, volume, timestamp = cols["last_price"], cols["volume"], cols["timestamp"]
+
+        for tick in ticks:
+            token = tick.get("instrument_token")
+            if not token:
+                continue
+
+            slot = self._slot_for(token)
+            if self.capacity != len(last_price):
+                cols = self.columns
+                last_price, volume, timestamp = cols["last_price"], cols["volume"], cols["timestamp"]
+
+            price = tick.get("last_price")
+            if price is not None:
+                last_price[slot] = price
+
+            if "ohlc" in tick:
+                ohlc = tick["ohlc"]
+                for name in _OHLC:
+                    value = ohlc.get(name)
+                    if value is not None:
+                        cols[name][slot] = value
+
+            # `in` first: a lazy Tick raises (and catches) a KeyError for every missing .get() key
+            if "volume_traded" in tick:
+                volume[slot] = tick["volume_traded"]
+            elif "volume" in tick and tick["volume"] is not None:
+                volume[slot] = tick["volume"]
+
+            ts = None
+            if "exchange_timestamp" in tick:
+                ts = tick["exchange_timestamp"]
+            elif "timestamp" in tick:
+                ts = tick["timestamp"]
+            if ts is not None:
+                timestamp[slot] = ts.timestamp() if isinstance(ts, datetime) else ts
+
+            self.updated[slot] = seq
+            touched.append(slot)
+
+        return touched
+
+    def update_batch(self, batch):
+        """Apply `TICK_FORMAT_ARRAY` ticks (one structured array or a dict of them by packet length)."""
+        self.version += 1
+        try:
+            return self._update_batch(batch)
+        finally:
+            self.version += 1
+
+    def _update_batch(self, batch):
+        arrays = batch.values() if isinstance(batch, dict) else (batch,)
+        self.seq += 1
+        touched = []
+
+        for ticks in arrays:
+            if not len(ticks):
+                continue
+
+            slots = np.fromiter((self._slot_for(int(t)) for t in ticks["instrument_token"]),
+                                dtype="i8", count=len(ticks))
+            names = ticks.dtype.names
+            cols = self.columns
+
+            cols["last_price"][slots] = ticks["last_price"]
+            if "ohlc" in names:
+                for name in _OHLC:
+                    cols[name][slots] = ticks["ohlc"][name]
+            if "volume_traded" in names:
+                cols["volume"][slots] = ticks["volume_traded"]
+            if "exchange_timestamp" in names:
+                cols["timestamp"][slots] = ticks["exchange_timestamp"]
+
+            self.updated[slots] = self.seq
+            touched.append(slots)
+
+        return np.concatenate(touched) if touched else np.empty(0, dtype="i8")
+
+    def clear(self):
+        self.version += 1
+        try:
+            self._slots.clear()
+            self.size = 0
+            self.tokens[:] = 0
+            self.updated[:] = 0
+            for column in self.columns.values():
+                column[:] = np.nan
+        finally:
+            self.version += 1
+
+    # ---------------------------------------------------------
+    # SEQLOCK READ
+    # ---------------------------------------------------------
+    def read(self, fn, *args):
+        """Run the read-only `fn(*args)` until it did not overlap a write, return its result."""
+        while True:
+            version = self.version
+            if version & 1:
+                time.sleep(0)  # writer busy, let it finish
+                continue
+
+            try:
+                result = fn(*args)
+            except (IndexError, KeyError, RuntimeError):
+                # Only a writer growing / clearing the table under us explains it → retry, else a real bug
+                if self.version == version:
+                    raise
+                result = None
+
+            if self.version == version:
+                return result
+            self.read_retries += 1
+
+    # ---------------------------------------------------------
+    # VECTOR READS
+    # ---------------------------------------------------------
+    def snapshot(self, tokens):
+        """Structured array (`SNAPSHOT_DTYPE`) with one row per token, NaN / seq 0 for tokens without ticks."""
+        return self.read(self._snapshot, tokens)
+
+    def _snapshot(self, tokens):
+        slots = self.slots(tokens)
+        known = slots >= 0
+        picked = slots[known]
+
+        out = np.empty(len(slots), dtype=SNAPSHOT_DTYPE)
+        out["instrument_token"] = [int(t) for t in tokens]
+        out["seq"] = 0
+        out["seq"][known] = self.updated[picked]
+
+        for name, column in self.columns.items():
+            out[name] = np.nan
+            out[name][known] = column[picked]
+
+        return out
+
+    def last_prices(self, tokens):
+        """Float array of last prices of `tokens`, NaN where no tick arrived yet."""
+        return self.read(self._last_prices, tokens)
+
+    def _last_prices(self, tokens):
+        slots = self.slots(tokens)
+        prices = np.full(len(slots), np.nan)
+        known = slots >= 0
+        prices[known] = self.columns["last_price"][slots[known]]
+        return prices
+
+    # ---------------------------------------------------------
+    # DICT SHIM (old live_data callers)
+    # ---------------------------------------------------------
+    def row(self, slot):
+        cols = self.columns
+        quote = {"instrument_token": int(self.tokens[slot])}
+
+        price = cols["last_price"][slot]
+        if price == price:
+            quote["last_price"] = float(price)
+
+        if cols["open"][slot] == cols["open"][slot]:
+            quote["ohlc"] = {name: float(cols[name][slot]) for name in _OHLC}
+
+        volume = cols["volume"][slot]
+        if volume == volume:
+            quote["volume"] = int(volume)
+
+        ts = cols["timestamp"][slot]
+        if ts == ts:
+            quote["timestamp"] = datetime.fromtimestamp(ts)
+
+        return quote
+
+    def __getitem__(self, token):
+        quote = self.read(self._get, token)
+        if quote is None:
+            raise KeyError(token)
+        return quote
+
+    def _get(self, token):
+        slot = self.slot(token)
+        return None if slot is None else self.row(slot)
+
+    def __contains__(self, token):
+        return self.slot(token) is not None
+
+    def __iter__(self):
+        return iter(self.read(list, self._slots) or [])
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return "LiveQuoteTable(tokens={}, seq={})".format(self.size, self.seq)
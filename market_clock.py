@@ -0,0 +1,156 @@
+# market_clock.py
+"""
+Central scheduler for wall-clock events (candle closes, square-off, session expiry).
+
+Timers sit in one heap ordered by due time; a single thread sleeps until the
+earliest one is due, so engine loops never poll `datetime.now()`. Callbacks
+run on the clock thread one after another and must be short (set a flag,
+enqueue, wake a loop). Times are epoch ns; `at_time` takes IST wall times.
+"""
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, time as dt_time
+
+from logger_config import IST, setup_logger
+
+logger = setup_logger("Market_Clock")
+
+SECOND_NS = 10**9
+
+
+class Timer:
+    __slots__ = ("due_ns", "interval_ns", "fn", "args", "name", "group", "active")
+
+    def __init__(self, due_ns, interval_ns, fn, args, name, group):
+        self.due_ns = due_ns
+        self.interval_ns = interval_ns  # None for one-shot timers
+        self.fn = fn
+        self.args = args
+        self.name = name or getattr(fn, "__name__", "timer")
+        self.group = group
+        self.active = True
+
+    def __repr__(self):
+        due = datetime.fromtimestamp(self.due_ns / 1e9, IST).strftime("%H:%M:%S.%f")[:-3]
+        return "Timer(%s @ %s)" % (self.name, due)
+
+
+class MarketClock:
+    def __init__(self):
+        self._heap = []  # (due_ns, seq, timer)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    # ---------------------------------------------------------
+    # SCHEDULING
+    # ---------------------------------------------------------
+    def at(self, due_ns, fn, *args, name=None, group=None):
+        """Run `fn(*args)` once at epoch `due_ns` (immediately if already past)."""
+        return self._push(Timer(int(due_ns), None, fn, args, name, group))
+
+    def after(self, seconds, fn, *args, name=None, group=None):
+        return self.at(time.time_ns() + int(seconds * SECOND_NS), fn, *args, name=name, group=group)
+
+    def at_time(self, wall_time, fn, *args, name=None, group=None):
+        """Run `fn(*args)` at today's IST `wall_time` ("HH:MM[:SS]" or `datetime.time`)."""
+        return self.at(today_at(wall_time), fn, *args, name=name, group=group)
+
+    def every(self, seconds, fn, *args, align=False, name=None, group=None):
+        """
+        Run `fn(*args)` every `seconds`. With `align` the runs fall on whole multiples
+        of the interval (e.g. every minute at :00), which are also the 09:15-aligned
+        candle boundaries for whole-minute intervals. Missed runs are skipped, not queued.
+        """
+        interval_ns = int(seconds * SECOND_NS)
+        now = time.time_ns()
+        due = (now // interval_ns + 1) * interval_ns if align else now + interval_ns
+        return self._push(Timer(due, interval_ns, fn, args, name, group))
+
+    def cancel(self, timer):
+        if timer:
+            timer.active = False
+
+    def cancel_group(self, group):
+        with self._cond:
+            removed = 0
+            for _, _, timer in self._heap:
+                if timer.group == group and timer.active:
+                    timer.active = False
+                    removed += 1
+            self._heap = [entry for entry in self._heap if entry[2].active]
+            heapq.heapify(self._heap)
+        if removed:
+            logger.info("🧹 Cancelled %s timers of %s", removed, group)
+        return removed
+
+    def pending(self):
+        with self._cond:
+            return sorted((t for _, _, t in self._heap if t.active), key=lambda t: t.due_ns)
+
+    def _push(self, timer):
+        with self._cond:
+            heapq.heappush(self._heap, (timer.due_ns, next(self._seq), timer))
+            self._cond.notify()
+            self._ensure_thread()
+        return timer
+
+    # ---------------------------------------------------------
+    # CLOCK THREAD
+    # ---------------------------------------------------------
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="market-clock", daemon=True)
+        self._thread.start()
+
+    def _next_due(self):
+        """Pop the next due active timer, sleeping until one is due (called with the lock held)."""
+        while True:
+            while self._heap and not self._heap[0][2].active:
+                heapq.heappop(self._heap)
+
+            if not self._heap:
+                self._cond.wait()
+                continue
+
+            wait_ns = self._heap[0][0] - time.time_ns()
+            if wait_ns > 0:
+                self._cond.wait(wait_ns / 1e9)
+                continue
+
+            _, _, timer = heapq.heappop(self._heap)
+            if timer.interval_ns:
+                now = time.time_ns()
+                timer.due_ns += timer.interval_ns
+                if timer.due_ns <= now:
+                    timer.due_ns += (now - timer.due_ns) // timer.interval_ns * timer.interval_ns + timer.interval_ns
+                heapq.heappush(self._heap, (timer.due_ns, next(self._seq), timer))
+            else:
+                timer.active = False
+            return timer
+
+    def _run(self):
+        while True:
+            with self._cond:
+                timer = self._next_due()
+            try:
+                timer.fn(*timer.args)
+            except Exception:
+                logger.exception("❌ Timer error | %s", timer.name)
+
+
+def today_at(wall_time):
+    """Epoch ns of today's IST `wall_time` ("HH:MM[:SS]" or `datetime.time`)."""
+    if isinstance(wall_time, str):
+        wall_time = dt_time.fromisoformat(wall_time)
+    today = datetime.now(IST).date()
+    return int(IST.localize(datetime.combine(today, wall_time)).timestamp() * SECOND_NS)
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+market_clock = MarketClock()
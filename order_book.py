@@ -0,0 +1,135 @@
+# order_book.py
+"""
+Local order / net position book fed by the websocket order postbacks.
+
+Each order update carries the cumulative `filled_quantity`; the increase
+since the last update of that order is applied to the symbol's net quantity,
+so replayed or out-of-order postbacks never double count. `reconcile`
+resets everything from the REST `positions()` / `orders()` snapshot and runs
+periodically as a safety net for missed postbacks.
+"""
+import threading
+import time
+
+from logger_config import setup_logger
+
+logger = setup_logger("Order_Book")
+
+FINAL_STATUSES = ("COMPLETE", "CANCELLED", "REJECTED")
+
+
+class OrderBook:
+    def __init__(self):
+        self.orders = {}     # order_id -> latest order update
+        self._filled = {}    # order_id -> filled quantity already applied to the net
+        self._net = {}       # tradingsymbol -> signed net quantity
+        self._listeners = ()
+        self._lock = threading.Lock()
+
+        self.updates = 0
+        self.reconciled_at = None  # epoch seconds the last REST reconcile snapshot was requested
+
+    # ---------------------------------------------------------
+    # LISTENERS
+    # ---------------------------------------------------------
+    def add_listener(self, listener):
+        """`listener(order, filled_delta)` runs after every order update (websocket thread)."""
+        with self._lock:
+            self._listeners = self._listeners + (listener,)
+        return listener
+
+    def remove_listener(self, listener):
+        with self._lock:
+            self._listeners = tuple(l for l in self._listeners if l is not listener)
+
+    # ---------------------------------------------------------
+    # WRITES
+    # ---------------------------------------------------------
+    def apply(self, order):
+        """Fold one order postback into the book. Returns the newly filled quantity."""
+        order_id = order.get("order_id")
+        if not order_id:
+            return 0
+
+        with self._lock:
+            filled = int(order.get("filled_quantity") or 0)
+            delta = filled - self._filled.get(order_id, 0)
+            if delta < 0:
+                # Older postback than the one already applied
+                return 0
+
+            self.orders[order_id] = order
+            self.updates += 1
+            if delta:
+                self._filled[order_id] = filled
+                symbol = order.get("tradingsymbol")
+                sign = 1 if order.get("transaction_type") == "BUY" else -1
+                self._net[symbol] = self._net.get(symbol, 0) + sign * delta
+
+        logger.info("🧾 Order %s %s %s %s | filled=%s (+%s) net=%s",
+                    order_id, order.get("status"), order.get("transaction_type"),
+                    order.get("tradingsymbol"), filled, delta, self._net.get(order.get("tradingsymbol")))
+
+        for listener in self._listeners:
+            try:
+                listener(order, delta)
+            except Exception:
+                logger.exception("❌ Order listener error | %s", order_id)
+        return delta
+
+    def reconcile(self, kite, positions=None):
+        """Replace the book with the broker's REST view (blocking; `positions` if already fetched)."""
+        # The snapshot reflects everything the broker knew when it was requested
+        requested_at = time.time()
+        if positions is None:
+            positions = kite.positions()["net"]
+        orders = kite.orders()
+
+        with self._lock:
+            self._net = {p["tradingsymbol"]: int(p["quantity"]) for p in positions}
+            for order in orders:
+                order_id = order.get("order_id")
+                if order_id:
+                    self.orders[order_id] = order
+                    self._filled[order_id] = int(order.get("filled_quantity") or 0)
+            self.reconciled_at = requested_at
+
+        logger.info("🔄 Order book reconciled | positions=%s orders=%s", len(positions), len(orders))
+
+    def clear(self):
+        with self._lock:
+            self.orders.clear()
+            self._filled.clear()
+            self._net.clear()
+            self.reconciled_at = None
+
+    # ---------------------------------------------------------
+    # READS
+    # ---------------------------------------------------------
+    def quantity(self, symbol, default=None):
+        """Signed net quantity of `symbol`, `default` if the book never saw it."""
+        return self._net.get(symbol, default)
+
+    def knows(self, symbol):
+        return symbol in self._net
+
+    def open_orders(self, symbol=None):
+        with self._lock:
+            return [o for o in self.orders.values()
+                    if o.get("status") not in FINAL_STATUSES
+                    and (symbol is None or o.get("tradingsymbol") == symbol)]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "net": dict(self._net),
+                "orders": len(self.orders),
+                "updates": self.updates,
+                "reconciled_at": self.reconciled_at,
+            }
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+order_book = OrderBook()
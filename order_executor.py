@@ -0,0 +1,152 @@
+# order_executor.py
+"""
+Concurrent order submission for baskets (square-off of every position, several exits at once).
+
+Orders run on a bounded thread pool through the order pipeline; a token
+bucket keeps the send rate under the OMS limit. Every order reports its
+queue wait, round trip and outcome; `submit_basket` returns once all of them
+are done so the engine state is updated from complete results.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from latency import latency
+from order_pipeline import order_pipeline
+from logger_config import setup_logger
+
+logger = setup_logger("Order_Executor")
+
+ORDER_WORKERS = int(os.getenv("ORDER_EXECUTOR_WORKERS", "4"))
+ORDERS_PER_SECOND = float(os.getenv("OMS_ORDERS_PER_SECOND", "10"))  # Kite OMS order rate limit
+
+
+class TokenBucket:
+    """`rate` tokens per second, bursts up to `burst`. `acquire` blocks until one is free."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_s = (1 - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+
+class OrderResult:
+    __slots__ = ("symbol", "quantity", "transaction_type", "reason",
+                 "order_id", "error", "queued_ns", "sent_ns", "done_ns")
+
+    def __init__(self, symbol, quantity, transaction_type, reason):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.transaction_type = transaction_type
+        self.reason = reason
+        self.order_id = None
+        self.error = None
+        self.queued_ns = time.time_ns()
+        self.sent_ns = None
+        self.done_ns = None
+
+    @property
+    def ok(self):
+        return self.error is None and self.order_id is not None
+
+    def to_dict(self):
+        def ms(start, end):
+            return None if start is None or end is None else round((end - start) / 1e6, 3)
+
+        return {
+            "symbol": self.symbol,
+            "quantity": self.quantity,
+            "side": self.transaction_type,
+            "reason": self.reason,
+            "order_id": self.order_id,
+            "ok": self.ok,
+            "error": None if self.error is None else repr(self.error),
+            "queue_ms": ms(self.queued_ns, self.sent_ns),
+            "rtt_ms": ms(self.sent_ns, self.done_ns),
+        }
+
+
+class OrderExecutor:
+    def __init__(self, workers=ORDER_WORKERS, orders_per_second=ORDERS_PER_SECOND):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="order")
+        self._bucket = TokenBucket(orders_per_second)
+
+        self.recent = deque(maxlen=200)  # last OrderResults, for the dashboard
+        self.sent = 0
+        self.failed = 0
+
+    def submit(self, symbol, quantity, transaction_type, reason=None, signal_ns=None):
+        """Queue one order; returns a Future of its OrderResult (never raises through the future)."""
+        result = OrderResult(symbol, quantity, transaction_type, reason)
+        signal_ns = signal_ns if signal_ns is not None else latency.take_signal()
+        return self._pool.submit(self._send, result, signal_ns)
+
+    def submit_basket(self, orders, timeout=None, signal_ns=None):
+        """
+        Send `orders` (dicts with symbol, quantity, transaction_type, reason) concurrently.
+        Returns their OrderResults in the same order once all are done (or `timeout` passed).
+        `signal_ns` is when the exits were detected (defaults to the signal marked on this thread).
+        """
+        signal_ns = signal_ns if signal_ns is not None else latency.take_signal()
+        futures = [self.submit(o["symbol"], o["quantity"], o["transaction_type"], o.get("reason"), signal_ns)
+                   for o in orders]
+        wait(futures, timeout=timeout)
+
+        results = []
+        for order, future in zip(orders, futures):
+            if future.done():
+                results.append(future.result())
+            else:
+                pending = OrderResult(order["symbol"], order["quantity"], order["transaction_type"], order.get("reason"))
+                pending.error = TimeoutError("order still in flight")
+                results.append(pending)
+
+        logger.info("🧺 Basket of %s done | ok=%s failed=%s", len(results),
+                    sum(r.ok for r in results), sum(not r.ok for r in results))
+        return results
+
+    def _send(self, result, signal_ns):
+        self._bucket.acquire()
+
+        result.sent_ns = time.time_ns()
+        if signal_ns is not None:
+            latency.record("signal_to_send", result.sent_ns - signal_ns)
+        try:
+            result.order_id = order_pipeline.submit(result.symbol, result.quantity, result.transaction_type)
+            self.sent += 1
+        except Exception as e:
+            result.error = e
+            self.failed += 1
+        result.done_ns = time.time_ns()
+
+        self.recent.append(result)
+        return result
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "recent": [r.to_dict() for r in list(self.recent)[-20:]],
+        }
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+order_executor = OrderExecutor()
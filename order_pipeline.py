@@ -0,0 +1,137 @@
+# order_pipeline.py
+"""
+Order submission hot path.
+
+Between a signal and the wire there is only a dict copy and the HTTP POST:
+  - order forms are prebuilt per symbol (`prepare`), only side and quantity are filled in
+  - the OMS keep-alive connection is opened ahead of time and kept warm by a market clock timer
+  - every POST has a strict (connect, read) timeout
+  - Telegram messages and logging after the order go through the `outbox` thread
+"""
+import os
+import queue
+import threading
+import time
+
+from kite_trade import KiteApp, ORDER_TIMEOUT
+from market_clock import market_clock
+from state_manager import trading_state as state
+from telegram.sender import TelegramSender
+from logger_config import setup_logger
+
+logger = setup_logger("Order_Pipeline")
+
+KEEPALIVE_SECONDS = int(os.getenv("ORDER_KEEPALIVE_SECONDS", "20"))
+ORDER_TAG = "ALGO_TRADE_PRADEEP"
+
+
+class Outbox:
+    """Runs side effects (notifications, logs) one by one on a background thread."""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def post(self, fn, *args, **kwargs):
+        self._queue.put((fn, args, kwargs))
+        self._ensure_thread()
+
+    def notify(self, text, parse_mode="Markdown"):
+        self.post(TelegramSender.send_message, text, parse_mode=parse_mode)
+
+    def log(self, log_fn, msg, *args):
+        """`outbox.log(logger.info, "...", ...)`"""
+        self.post(log_fn, msg, *args)
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            fn, args, kwargs = self._queue.get()
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                logger.exception("❌ Outbox error | %s", getattr(fn, "__name__", fn))
+
+
+class OrderPipeline:
+    def __init__(self):
+        self.templates = {}  # symbol -> prebuilt order form (without side / quantity)
+        self._keepalive = None
+
+    # ---------------------------------------------------------
+    # PREPARATION (off the hot path)
+    # ---------------------------------------------------------
+    def prepare(self, symbols, exchange=KiteApp.EXCHANGE_NSE):
+        """Prebuild the MIS market order form of every symbol."""
+        for symbol in symbols:
+            if symbol not in self.templates:
+                self.templates[symbol] = self._template(symbol, exchange)
+        logger.info("📝 Order templates ready for %s symbols", len(self.templates))
+
+    @staticmethod
+    def _template(symbol, exchange=KiteApp.EXCHANGE_NSE):
+        return {
+            "exchange": exchange,
+            "tradingsymbol": symbol,
+            "product": KiteApp.PRODUCT_MIS,
+            "order_type": KiteApp.ORDER_TYPE_MARKET,
+            "validity": KiteApp.VALIDITY_DAY,
+            "tag": ORDER_TAG,
+        }
+
+    def warm(self):
+        """Open (or refresh) the keep-alive TLS connections to the OMS."""
+        kite = state.get("kite")
+        if not kite:
+            return False
+
+        started = time.perf_counter()
+        if not kite.warm():
+            return False
+        logger.debug("🔥 OMS connection warm (%.1f ms)", (time.perf_counter() - started) * 1000)
+        return True
+
+    def start(self):
+        """Warm now and every KEEPALIVE_SECONDS so the idle connection is never dropped."""
+        self.warm()
+        if not (self._keepalive and self._keepalive.active):
+            self._keepalive = market_clock.every(
+                KEEPALIVE_SECONDS,
+                lambda: threading.Thread(target=self.warm, name="oms-warm", daemon=True).start(),
+                name="oms-keepalive",
+            )
+
+    def stop(self):
+        market_clock.cancel(self._keepalive)
+        self._keepalive = None
+
+    # ---------------------------------------------------------
+    # HOT PATH
+    # ---------------------------------------------------------
+    def submit(self, symbol, quantity, transaction_type, timeout=ORDER_TIMEOUT):
+        """Send a market order for `symbol`; returns the order id, raises on error or timeout."""
+        template = self.templates.get(symbol)
+        if template is None:
+            template = self.templates[symbol] = self._template(symbol)
+
+        params = dict(template)
+        params["transaction_type"] = transaction_type
+        params["quantity"] = quantity
+
+        return state["kite"].post_order(KiteApp.VARIETY_REGULAR, params, timeout=timeout)
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCES
+# ---------------------------------------------------------
+outbox = Outbox()
+order_pipeline = OrderPipeline()
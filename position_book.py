@@ -0,0 +1,119 @@
+# position_book.py
+"""
+Open positions monitored by the position worker.
+
+Each `Position` carries its own target and stop-loss. The book is written by
+the position worker (and the start handler when new positions show up) and
+read by the dashboard, so every access goes through one lock.
+"""
+import threading
+import time
+
+
+class Position:
+    __slots__ = ("token", "symbol", "side", "qty", "entry", "target", "sl",
+                 "opened_ns", "closed", "exit_reason", "exit_price",
+                 "pending_exit", "retry_at_ns", "exit_attempts", "exit_failed_ns", "exit_order_id")
+
+    def __init__(self, token, symbol, side, qty, entry, target, sl=None):
+        self.token = token
+        self.symbol = symbol
+        self.side = side          # "BUY" (long) or "SELL" (short)
+        self.qty = qty            # open quantity, always positive
+        self.entry = entry
+        self.target = target
+        self.sl = sl              # checked against candle closes, None = no stop-loss
+        self.opened_ns = time.time_ns()
+        self.closed = False
+        self.exit_reason = None
+        self.exit_price = None
+        self.pending_exit = None  # (price, kind) of an exit whose order failed, retried at retry_at_ns
+        self.retry_at_ns = 0
+        self.exit_attempts = 0    # failed exit orders so far
+        self.exit_failed_ns = 0   # when the last exit order failed
+        self.exit_order_id = None # order id of the last failed exit, if the broker returned one
+
+    @property
+    def exit_side(self):
+        return "BUY" if self.side == "SELL" else "SELL"
+
+    def target_hit(self, price):
+        return price >= self.target if self.side == "BUY" else price <= self.target
+
+    def stoploss_hit(self, close_price):
+        if self.sl is None:
+            return False
+        return close_price < self.sl if self.side == "BUY" else close_price > self.sl
+
+    def to_dict(self):
+        return {
+            "token": self.token,
+            "symbol": self.symbol,
+            "side": self.side,
+            "qty_remaining": self.qty,
+            "entry": self.entry,
+            "targets": self.target,
+            "sl": self.sl,
+            "closed": self.closed,
+            "exit_reason": self.exit_reason,
+            "exit_price": self.exit_price,
+            "pending_exit": self.pending_exit and self.pending_exit[1],
+            "exit_attempts": self.exit_attempts,
+        }
+
+
+class PositionBook:
+    def __init__(self):
+        self._positions = {}  # token -> open Position
+        self._lock = threading.Lock()
+
+    def add(self, position):
+        """Track `position`; returns False if its token is already tracked."""
+        with self._lock:
+            if position.token in self._positions:
+                return False
+            self._positions[position.token] = position
+            return True
+
+    def get(self, token):
+        with self._lock:
+            return self._positions.get(int(token))
+
+    def close(self, token, reason, price=None):
+        """Stop tracking `token`; returns the closed Position or None."""
+        with self._lock:
+            position = self._positions.pop(int(token), None)
+        if position:
+            position.closed = True
+            position.exit_reason = reason
+            position.exit_price = price
+        return position
+
+    def open_positions(self):
+        with self._lock:
+            return list(self._positions.values())
+
+    def tokens(self):
+        with self._lock:
+            return list(self._positions)
+
+    def snapshot(self):
+        """{symbol: position dict} of the open positions."""
+        with self._lock:
+            return {p.symbol: p.to_dict() for p in self._positions.values()}
+
+    def clear(self):
+        with self._lock:
+            self._positions.clear()
+
+    def __contains__(self, token):
+        return token in self._positions
+
+    def __len__(self):
+        return len(self._positions)
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+position_book = PositionBook()
@@ -1,15 +1,23 @@
 # position_manager.py
-from datetime import datetime, timedelta, time as dt_time
 import time
 import uuid
 from flask import session
-import pytz
+import os
+import queue
 import threading
 
+import requests
+
 from eligible_stocks import load_stocks_for_today
 from state_manager import trading_state as state
 from service_ws import ws_manager
-from telegram.sender import TelegramSender
+from candles import candle_aggregator
+from market_clock import market_clock
+from position_book import Position, position_book
+from order_book import order_book
+from order_pipeline import order_pipeline, outbox
+from order_executor import order_executor
+from ticker import KiteTicker
 
 from logger_config import setup_logger
 from util import get_kite
@@ -20,9 +28,24 @@ logger = setup_logger("position_manager")
 # Globals
 # ----------------------------
 
-_candle_buffers = {}     # { token(int): { ticks: [(ts, price)], current_period_end } }
+_closed_candles = queue.SimpleQueue()   # closed CANDLE_INTERVAL candles of booked tokens
+_candle_listener = None
+_squareoff_due = threading.Event()
+
+POSITION_CLOCK_GROUP = "position"  # market clock timers of the position worker
+
+# Order postbacks keep the order book current, REST only double-checks it
+RECONCILE_SECONDS = int(os.getenv("ORDER_RECONCILE_SECONDS", "60"))
+
+# A failed exit order stays booked and is resent after EXIT_RETRY_SECONDS (doubling per attempt,
+# at most EXIT_RETRY_MAX_DELAY), only once a reconcile shows no exit order of it still working.
+# After EXIT_MAX_ATTEMPTS failures the position is left for manual action.
+EXIT_RETRY_SECONDS = float(os.getenv("EXIT_RETRY_SECONDS", "2"))
+EXIT_RETRY_MAX_DELAY = float(os.getenv("EXIT_RETRY_MAX_DELAY", "30"))
+EXIT_MAX_ATTEMPTS = int(os.getenv("EXIT_MAX_ATTEMPTS", "5"))
+EXIT_GIVEN_UP = 2 ** 63 - 1  # retry_at_ns of exits that are not retried any more
 
-TZ = pytz.timezone("Asia/Kolkata")
+_reconciling = threading.Lock()
 
 
 _monitor_thread = None
@@ -46,54 +69,47 @@ def start_position_monitor_handler():
     
   
 
-    # ============================================================
-    # 🔥 PRODUCTION SAFE WEBSOCKET RESET (UNCHANGED INTENT)
-    # ============================================================
-    if ws_manager.running:
-        logger.info("🧹 Stopping previous WebSocket cleanly")
-        ws_manager.stop()
-        time.sleep(0.5)
-
     # ------------------------------------------------------------
-    # 5️⃣ Setup WebSocket (UNCHANGED FLOW)
+    # 5️⃣ WebSocket (kept open from the entry phase)
     # ------------------------------------------------------------
-    if not ws_manager.setup("PradeepApi", state["enctoken"], state["user_id"]):
+    # Position monitor only reads last_price
+    if not ws_manager.ensure_connected("PradeepApi", state["enctoken"], state["user_id"],
+                                       decode_profile=KiteTicker.PROFILE_LTP, timeout=10):
         state["engine_status"] = "idle"
         state["current_step"] = "idle"
-        return {"success": False, "error": "WebSocket setup failed"}
+        return {"success": False, "error": "WebSocket connection failed"}
+    logger.info("🟢 WS Connected")
 
-    if not ws_manager.start():
+    order_book.reconcile(kite, positions)
+    added = _book_positions(positions)
+    if not position_book:
+        logger.info("❌ No open position to monitor.")
+        state["is_running"] = False
         state["engine_status"] = "idle"
         state["current_step"] = "idle"
-        return {"success": False, "error": "WebSocket start failed"}
+        return {"success": False, "error": "No open position to monitor"}
 
-    # ------------------------------------------------------------
-    # 6️⃣ Wait for WebSocket connection (UNCHANGED)
-    # ------------------------------------------------------------
-    for i in range(20):
-        if ws_manager.connected:
-            logger.info("🟢 WS Connected")
-            break
-        logger.info("⏳ Waiting for WS (%s/20)", i + 1)
-        time.sleep(0.5)
-    else:
-        state["engine_status"] = "idle"
-        state["current_step"] = "idle"
-        return {"success": False, "error": "WebSocket connection failed"}
+    # Only the booked tokens are needed from here on
+    ws_manager.set_subscriptions(position_book.tokens())
+    ws_manager.wait_for_ticks([p.token for p in added], timeout=1)
 
+    # One worker for every open position, started once
+    if _monitor_thread and _monitor_thread.is_alive() and state.get("is_running"):
+        ws_manager.wake()
+        return {"success": True, "message": "Monitor updated", "positions": len(position_book)}
 
-                  
     run_id = uuid.uuid4().hex
     state["is_running"] = True
     state["run_id"] = run_id
     _monitor_thread = threading.Thread(
         target=_monitor_position_loop,
-        args=(positions,run_id,),
+        args=(run_id,),
+        name="position-worker",
         daemon=True
     )
     _monitor_thread.start()
 
-    return {"success": True, "message": "Monitor started"}
+    return {"success": True, "message": "Monitor started", "positions": len(position_book)}
 
 
 
@@ -111,94 +127,144 @@ def _target_for_side(entry, side):
     return round(entry * (1 + sign * percent), 4)
 
 
+def _book_positions(positions):
+    """Add every open broker position that is not booked yet. Returns the added Positions."""
+    stop_losses = {st["instrument_token"]: float(st.get("high")) for st in load_stocks_for_today()}
+
+    added = []
+    for p in positions:
+        quantity = int(p.get("quantity", 0))
+        token = int(p["instrument_token"])
+        if quantity == 0 or token in position_book:
+            continue
+
+        side = "SELL" if quantity < 0 else "BUY"
+        entry = float(p["average_price"])
+        position = Position(token, p["tradingsymbol"], side, abs(quantity), entry,
+                            _target_for_side(entry, side), stop_losses.get(token))
+        position_book.add(position)
+        added.append(position)
+        _announce_position(position)
+
+    _publish_book()
+    return added
+
+
+def _announce_position(position):
+    logger.info("\n=== POSITION MONITOR STARTED ===")
+    logger.info(f"Symbol: {position.symbol} | Side: {position.side}")
+    logger.info(f"Entry: {position.entry} | Qty: {position.qty}")
+    logger.info(f"Targets: {position.target}")
+    logger.info(f"Stop Loss: {position.sl}")
+    logger.info("=" * 50)
+
+    message = (
+        "🎯 *POSITION MONITOR STARTED*\n"
+        "━━━━━━━━━━━━━━━━━━\n"
+        f"🏷 *Symbol*      : `{position.symbol}`\n"
+        f"💰 *Exit Price*  : `{position.entry}`\n"      
+        f"📦 *Quantity*    : `{position.qty}`\n"
+        f"🎯 *Target*      : `{position.target}`\n"        
+        "\n"
+        
+    )
+
+    outbox.notify(message)
+
+
+def _publish_book():
+    state["position_status"] = position_book.snapshot()
+    state["positions"] = len(position_book)
+
+
+def _open_quantity(position):
+    """Open quantity from the order book (memory), the booked quantity if the book never saw it."""
+    net = order_book.quantity(position.symbol)
+    return position.qty if net is None else abs(net)
+
+
+def _sync_with_order_book():
+    """Apply fills seen by the order book; positions flat at the broker are closed."""
+    for position in position_book.open_positions():
+        net = order_book.quantity(position.symbol)
+        if net is None:
+            continue
+        if net == 0:
+            _position_status(position, None, "CLOSED_AT_BROKER")
+        else:
+            position.qty = abs(net)
+
+
+def _reconcile_order_book():
+    # One reconcile at a time, a request while one runs is already covered by it
+    if not _reconciling.acquire(blocking=False):
+        return
+    try:
+        order_book.reconcile(get_kite(state["username"]))
+        ws_manager.wake()
+    except Exception:
+        logger.exception("Order book reconcile failed")
+    finally:
+        _reconciling.release()
+
+
+def _reconcile_async():
+    threading.Thread(target=_reconcile_order_book, daemon=True).start()
+
+
 
 
 # ----------------------------
-# Candle Aggregation
+# Clock / Candle Events
 # ----------------------------
-def _init_candle_buffer(token: int):
+def _watch_clock_events():
     """
-    Initialize candle buffer aligned with market standard intervals.
-    Market opens at 9:15, so candles align to: 9:15, 9:18, 9:21, 9:24, etc.
+    Closed CANDLE_INTERVAL candles of booked tokens and the square-off time reach the
+    worker as events; candles align with market intervals 9:15, 9:18, 9:21 etc.
     """
-    now = datetime.now(TZ)
-    
-    # Calculate minutes since market open (9:15)
-    market_open = now.replace(hour=9, minute=15, second=0, microsecond=0)
-    
-    if now < market_open:
-        # Before market open, align to market open
-        this_start = market_open
-    else:
-        # Calculate minutes elapsed since 9:15
-        minutes_since_open = int((now - market_open).total_seconds() / 60)
-        
-        # Find which candle period we're in
-        candle_number = minutes_since_open // state["CANDLE_INTERVAL"]
-        
-        # Calculate start of current candle
-        minutes_to_add = candle_number * state["CANDLE_INTERVAL"]
-        this_start = market_open + timedelta(minutes=minutes_to_add)
-    
-    this_end = this_start + timedelta(minutes=state["CANDLE_INTERVAL"])
-    
-    _candle_buffers[token] = {
-        "ticks": [],
-        "current_period_end": this_end,
-        "current_period_start": this_start
-    }
-    logger.info(f"[INIT] Candle buffer initialized (market-aligned):")
-    logger.info(f"      Start: {this_start.strftime('%H:%M:%S')}")
-    logger.info(f"      End: {this_end.strftime('%H:%M:%S')}")
-    logger.info(f"      (Aligns with 9:15, 9:18, 9:21... standard market intervals)")
-
-
-def _add_tick_for_candle(token: int, price: float, ts):
-    if token not in _candle_buffers:
-        _init_candle_buffer(token)
-    _candle_buffers[token]["ticks"].append((ts, price))
-
-
-def _compute_and_clear_candle_if_period_finished(token: int):
-    buf = _candle_buffers.get(token)
-    if not buf:
-        return None
+    global _candle_listener
 
-    now = datetime.now(TZ)
-    
-    # Calculate time remaining in current candle
-    time_remaining = (buf["current_period_end"] - now).total_seconds()
-
-    # Check if current period has ended
-    if now >= buf["current_period_end"]:
-        ticks = buf["ticks"]
-
-        if ticks:
-            prices = [p for _, p in ticks]
-            candle = {
-                "period_start": str(buf["current_period_start"]),
-                "period_end": str(buf["current_period_end"]),
-                "open": prices[0],
-                "high": max(prices),
-                "low": min(prices),
-                "close": prices[-1],
-                "tick_count": len(ticks)
-            }            
-        else:            
-            candle = None
-
-        # Move to next candle period
-        old_end = buf["current_period_end"]
-        buf["current_period_start"] = old_end
-        buf["current_period_end"] = old_end + timedelta(minutes=state["CANDLE_INTERVAL"])
-        buf["ticks"] = []
-
-        logger.info(f"➡️ Next candle: start={buf['current_period_start']}, end={buf['current_period_end']}")
-
-        return candle
-    
-    # Return None but provide info about when candle will close
-    return {"status": "building", "closes_in": int(time_remaining), "tick_count": len(buf["ticks"])}
+    interval = state["CANDLE_INTERVAL"]
+    candle_aggregator.add_interval(interval)
+
+    def on_candle(candle):
+        if candle.interval == interval and candle.token in position_book:
+            _closed_candles.put(candle)
+            ws_manager.wake()
+
+    _release_clock_events()
+    _candle_listener = candle_aggregator.add_listener(on_candle)
+
+    _squareoff_due.clear()
+    market_clock.at_time(state["SQUAREOFF_TIME"], _on_squareoff_due, name="squareoff", group=POSITION_CLOCK_GROUP)
+
+    # REST round trips stay off the clock thread and the worker
+    market_clock.every(RECONCILE_SECONDS, _reconcile_async, name="order-reconcile", group=POSITION_CLOCK_GROUP)
+    logger.info(f"[INIT] Watching {interval} min candles (market-aligned) and squareoff at {state['SQUAREOFF_TIME']}")
+
+
+def _release_clock_events():
+    global _candle_listener
+
+    if _candle_listener:
+        candle_aggregator.remove_listener(_candle_listener)
+        _candle_listener = None
+    market_clock.cancel_group(POSITION_CLOCK_GROUP)
+
+
+def _on_squareoff_due():
+    logger.info("⏰ SQUAREOFF_TIME reached")
+    _squareoff_due.set()
+    ws_manager.wake()
+
+
+def _drain_closed_candles():
+    candles = []
+    while True:
+        try:
+            candles.append(_closed_candles.get_nowait())
+        except queue.Empty:
+            return candles
 
 
 # ----------------------------
@@ -219,10 +285,7 @@ def _handle_target_hit(name, symbol, token, qty, price):
         "✅ _Profit booked successfully_"
     )
 
-    TelegramSender.send_message(
-        message,
-        parse_mode="Markdown"
-    )
+    outbox.notify(message)
 
 
 
@@ -244,24 +307,29 @@ def _handle_stoploss(symbol, token, qty, price, sl, side):
         "🔻 _Position exited to control risk_"
     )
 
-    TelegramSender.send_message(
-        message,
-        parse_mode="Markdown"
-    )
+    outbox.notify(message)
 
     state["Monitoring_Background"] = False
 
 
-def _position_status(symbol,  qty_closed, price, reason):
-    logger.info(f"\n🔒 Position Closed: {symbol}")
-    logger.info(f"   Quantity: {qty_closed}")
+def _position_status(position, price, reason):
+    logger.info(f"\n🔒 Position Closed: {position.symbol}")
+    logger.info(f"   Quantity: {position.qty}")
     logger.info(f"   Price: {price}")
     logger.info(f"   Reason: {reason}")
 
-    state["position_status"]["closed"] = True
+    position_book.close(position.token, reason, price)
+    _publish_book()
+
+    if position_book:
+        # Stop streaming the closed token, the others stay monitored
+        ws_manager.set_subscriptions(position_book.tokens())
+        return
+
     state["is_running"] = False
     state["current_step"] = "position_closed"
     state["Monitoring_Background"] = False
+    _release_clock_events()
 
     try:
         ws_manager.stop()
@@ -269,181 +337,184 @@ def _position_status(symbol,  qty_closed, price, reason):
         logger.exception(f"Error stopping WS: {e}")
 
 
-# ----------------------------
-# MAIN POSITION MONITOR LOOP
-def _monitor_position_loop(positions,run_id):
-    active_pos = next((p for p in positions if int(p.get("quantity", 0)) != 0), None)
-    logger.info(f"Active Position: {active_pos}")
-
-    if not active_pos:
-        logger.info("❌ No open position to monitor.")
-        state["is_running"] = False
-        state["engine_status"] = "idle"
-        state["current_step"] = "idle"
-        return
-
-    token = int(active_pos["instrument_token"])
-    symbol = active_pos["tradingsymbol"]
-
-    qty_total = abs(int(active_pos["quantity"]))
-    side = "SELL" if int(active_pos["quantity"]) < 0 else "BUY"
-    entry = float(active_pos["average_price"])
+# Exit kind → (order reason, close reason, current_step, log line)
+EXITS = {
+    "STOPLOSS": ("STOPLOSS HITTED", "STOPLOSS", "STOP_LOSS_TRIGGED", "STOP_LOSS_TRIGGRED"),
+    "TARGET": ("TARGET_HITTED", "TARGET_FILLED", "TARGET_HITTED", "TARGET HIT — POSITION CLOSED"),
+    "SQUAREOFF": ("AUTO SQUARE OFF", "SQUAREOFF_EOD", "AUTO_SQUARE_OFF", "POSITION CLOSE DUE TO AUTO SQUAREOFF_TIME"),
+}
 
-    # 🔒 Targets (dynamic, same math as before)
-    targets = _target_for_side(entry, side)
 
-    # Stop loss (unchanged)
-    stocks = load_stocks_for_today()
-    sl = None
-    for st in stocks:
-        if st["instrument_token"] == token:
-            sl = float(st.get("high"))
-            break
+def _exit_positions(exits, signal_ns=None):
+    """
+    Close `exits` ({token: (position, price, kind)}) with one concurrent basket,
+    then notify and update the book once every order has a result. Positions
+    whose order failed stay booked and subscribed and are retried.
+    `signal_ns` (when the exits were detected) feeds the signal_to_send latency.
+    """
+    exits = list(exits.values())
+    results = order_executor.submit_basket([{
+        "symbol": position.symbol,
+        "quantity": _open_quantity(position),
+        "transaction_type": position.exit_side,
+        "reason": EXITS[kind][0],
+    } for position, price, kind in exits], signal_ns=signal_ns)
+
+    for (position, price, kind), result in zip(exits, results):
+        order_reason, close_reason, step, log_line = EXITS[kind]
+        if result.ok or not position.exit_attempts:
+            # Retries of a failed exit only alert again when they give up
+            _notify_order(result.symbol, result.quantity, result.order_id, order_reason, result.error)
+
+        if not result.ok:
+            _schedule_exit_retry(position, price, kind, result)
+            continue
+
+        position.pending_exit = None
+        if kind == "STOPLOSS":
+            _handle_stoploss(position.symbol, position.token, result.quantity, price, position.sl, position.side)
+        elif kind == "TARGET":
+            _handle_target_hit("T1", position.symbol, position.token, result.quantity, price)
+            position.qty = 0
+
+        _position_status(position, price, close_reason)
+        state["current_step"] = step
+        outbox.log(logger.info, "%s | %s | %s", log_line, position.symbol, result.to_dict())
+
+
+def _schedule_exit_retry(position, price, kind, result):
+    position.pending_exit = (price, kind)
+    position.exit_attempts += 1
+    position.exit_failed_ns = time.time_ns()
+    position.exit_order_id = result.order_id
+    outcome = "status unknown" if _status_unknown(result.error) else "failed"
+
+    if position.exit_attempts >= EXIT_MAX_ATTEMPTS:
+        position.retry_at_ns = EXIT_GIVEN_UP
+        state["current_step"] = "EXIT_FAILED"
+        outbox.log(logger.error, "🚨 %s exit %s, giving up after %s attempts | %s",
+                   position.symbol, outcome, position.exit_attempts, result.to_dict())
+        outbox.notify(
+            "🚨 *EXIT NOT RETRIED ANY MORE*\n"
+            "━━━━━━━━━━━━━━━━━━\n"
+            f"🏷 *Symbol*     : `{position.symbol}`\n"
+            f"📦 *Quantity*  : `{result.quantity}`\n"
+            f"🔁 *Attempts*  : `{position.exit_attempts}`\n"
+            "\n"
+            "🛑 _Position is still open, close it manually_"
+        )
+        return
 
-    logger.info("\n=== POSITION MONITOR STARTED ===")
-    logger.info(f"Symbol: {symbol} | Side: {side}")
-    logger.info(f"Entry: {entry} | Qty: {qty_total}")
-    logger.info(f"Targets: {targets}")
-    logger.info(f"Stop Loss: {sl}")
-    logger.info("=" * 50)
+    delay = min(EXIT_RETRY_SECONDS * 2 ** (position.exit_attempts - 1), EXIT_RETRY_MAX_DELAY)
+    position.retry_at_ns = position.exit_failed_ns + int(delay * 1e9)
+    state["current_step"] = "EXIT_RETRY"
+    outbox.log(logger.error, "❌ %s exit %s (attempt %s), retry in %ss | %s",
+               position.symbol, outcome, position.exit_attempts, delay, result.to_dict())
 
-    message = (
-        "🎯 *POSITION MONITOR STARTED*\n"
-        "━━━━━━━━━━━━━━━━━━\n"
-        f"🏷 *Symbol*      : `{symbol}`\n"
-        f"💰 *Exit Price*  : `{entry}`\n"      
-        f"📦 *Quantity*    : `{qty_total}`\n"
-        f"🎯 *Target*      : `{targets}`\n"        
-        "\n"
-        
-    )
+    # The broker may still have the order (timeouts) → the retry waits for a reconcile after this failure
+    _reconcile_async()
 
-    TelegramSender.send_message(
-        message,
-        parse_mode="Markdown"
-    )
 
-    # 🔒 Position state (clean but equivalent)
-    state["position_status"] = {
-        "targets": targets,
-        "current_target": 0,
-        "qty_remaining": qty_total,
-        "closed": False,
-    }
+def _exit_settled(position):
+    """
+    True when the failed exit of `position` can be resent: a reconcile requested
+    after the failure has landed and no exit order of it is still working.
+    Fills of the earlier order are already applied by then (`_sync_with_order_book`).
+    """
+    reconciled_at = order_book.reconciled_at
+    if reconciled_at is None or reconciled_at * 1e9 < position.exit_failed_ns:
+        return False
+
+    for order in order_book.open_orders(position.symbol):
+        if order.get("order_id") == position.exit_order_id or order.get("transaction_type") == position.exit_side:
+            return False
+    return True
+
+
+def _due_exits(exits, now_ns):
+    """Add pending retries that are due and settled; hold back exits of positions still waiting for a retry."""
+    for position in position_book.open_positions():
+        if position.pending_exit and position.retry_at_ns <= now_ns:
+            if _exit_settled(position):
+                exits.setdefault(position.token, (position, *position.pending_exit))
+            else:
+                # Not settled yet → look again after another reconcile
+                position.retry_at_ns = now_ns + int(EXIT_RETRY_SECONDS * 1e9)
+                _reconcile_async()
+
+    for token, (position, price, kind) in list(exits.items()):
+        if position.retry_at_ns > now_ns:
+            if not position.pending_exit:
+                position.pending_exit = (price, kind)
+            del exits[token]
+    return exits
 
-    # Candle buffer (UNCHANGED)
-    _init_candle_buffer(token)
 
-    ws_manager.subscribe([token])
-    time.sleep(1)
+# ----------------------------
+# MAIN POSITION MONITOR LOOP (ONE WORKER FOR ALL POSITIONS)
+def _monitor_position_loop(run_id):
+    _watch_clock_events()
 
-    last_price = None
-    tick_count = 0
+    last_prices = {}
+    tick_seq = ws_manager.tick_seq
     state["current_step"] = "Position Monitioring Started"
-    while state.get("run_id") == run_id and state.get("is_running"):         
-        tick_count += 1
+    while state.get("run_id") == run_id and state.get("is_running") and position_book:
+        positions = position_book.open_positions()
+        prices = state["live_data"].last_prices([p.token for p in positions])
 
-        tick = state.get("live_data", {}).get(token)
+        for position, price in zip(positions, prices):
+            if price == price:  # NaN until the first tick
+                last_prices[position.token] = float(price)
 
-        if tick:
-            last_price = float(tick.get("last_price") or tick.get("last") or 0)
-            now = datetime.now(TZ)
-            _add_tick_for_candle(token, last_price, now)
-            logger.info(f"[{now.strftime('%H:%M:%S')}] {symbol} = {last_price}")
+        # 🧾 Fills from order postbacks (exits placed outside the engine, partial fills)
+        _sync_with_order_book()
 
         # ==================================================
-        # 🔒 CANDLE LOGIC — NOT TOUCHED
+        # 🔒 CANDLE LOGIC — stop-loss on candle close
         # ==================================================
-        candle = _compute_and_clear_candle_if_period_finished(token)
-
-        if candle and isinstance(candle, dict) and "close" in candle:
-            close_price = float(candle["close"])
-
-            if sl is not None:
-                sl_hit = (
-                    (side == "SELL" and close_price > sl) or
-                    (side == "BUY" and close_price < sl)
-                )
-
-                if sl_hit:
-                    kite =get_kite(state["username"])
-                    positions = kite.positions()["net"]
-                    qty_total = 0
-                    for p in kite.positions()["net"]:
-                        if p["tradingsymbol"] == symbol:
-                            qty_total = abs(p["quantity"])
-                            break
-                    _handle_stoploss(symbol, token, qty_total, close_price, sl, side)
-                    order_place(symbol , qty_total , transaction_type="BUY" , reason="STOPLOSS HITTED")
-                    _position_status(symbol,state["position_status"]["qty_remaining"],close_price,"STOPLOSS",)
-                    state["current_step"] = "STOP_LOSS_TRIGGED"
-                    state["engine_status"] = "idle"
-                    state["is_running"] = False
-                    logger.info("STOP_LOSS_TRIGGRED")
-                    return
+        exits = {}
+        for candle in _drain_closed_candles():
+            position = position_book.get(candle.token)
+            if position and position.stoploss_hit(float(candle.close)):
+                exits.setdefault(position.token, (position, float(candle.close), "STOPLOSS"))
 
         # ==================================================
-        # 🎯 TARGET LOGIC (SINGLE TARGET ONLY)
+        # 🎯 TARGET LOGIC (SINGLE TARGET PER POSITION)
         # ==================================================
-        if last_price is not None:
-            ps = state["position_status"]
-            hit = (
-                (side == "BUY" and last_price >= targets) or
-                (side == "SELL" and last_price <= targets)
-            )
-
-            if hit:
-                kite =get_kite(state["username"])
-                positions = kite.positions()["net"]
-                qty_to_book = 0
-                for p in kite.positions()["net"]:
-                    if p["tradingsymbol"] == symbol:
-                        qty_to_book = abs(p["quantity"])
-                        break
+        for position in position_book.open_positions():
+            price = last_prices.get(position.token)
+            if price is not None and position.target_hit(price):
+                exits.setdefault(position.token, (position, price, "TARGET"))
 
-                _handle_target_hit("T1", symbol, token, qty_to_book, last_price)
-                order_place(symbol,qty_to_book,transaction_type="BUY",reason="TARGET_HITTED")
-                ps["qty_remaining"] = 0
-                state["current_step"] = "TARGET_HITTED"
-                state["engine_state"] = "STOPPED"
-                state["is_running"] = False
-
-                _position_status(symbol,0, last_price, "TARGET_FILLED")
+        # ==================================================
+        # ⏰ EOD SQUAREOFF (fired by the market clock)
+        # ==================================================
+        if _squareoff_due.is_set():
+            for position in position_book.open_positions():
+                exits.setdefault(position.token, (position, last_prices.get(position.token), "SQUAREOFF"))
 
-                logger.info("TARGET HIT — POSITION CLOSED")
-                return
+        # 🧺 Every exit of this wakeup (plus due retries) goes out as one concurrent basket
+        signal_ns = time.time_ns()
+        if _due_exits(exits, signal_ns):
+            _exit_positions(exits, signal_ns)
 
+        # Wake on the next tick or market clock event (candle close, squareoff), sooner while a retry is pending
+        retrying = any(p.pending_exit and p.retry_at_ns != EXIT_GIVEN_UP for p in position_book.open_positions())
+        tick_seq = ws_manager.wait_for_tick(tick_seq, timeout=EXIT_RETRY_SECONDS / 2 if retrying else 5.0)
 
+    if not position_book:
+        state["engine_status"] = "idle"
+        logger.info("✅ All positions closed, position worker done.")
+        return
 
-        # ==================================================
-        # ⏰ EOD SQUAREOFF (UNCHANGED)
-        # ==================================================
-       
-        
-        if datetime.now(TZ).time() >= dt_time.fromisoformat(state["SQUAREOFF_TIME"]):
-            kite =get_kite(state["username"])
-            positions = kite.positions()["net"]
-            qty_total = 0
-            for p in kite.positions()["net"]:
-                if p["tradingsymbol"] == symbol:
-                    qty_total = abs(p["quantity"])
-                    break
-            _position_status(symbol,state["position_status"]["qty_remaining"],last_price,"SQUAREOFF_EOD",)
-            order_place(symbol , qty_total,transaction_type="BUY" , reason="AUTO SQUARE OFF")
-            state["engine_status"] = "idle"
-            state["current_step"] = "AUTO_SQUARE_OFF"
-            logger.info("POSITION CLOSE DUE TO AUTO SQUAREOFF_TIME")
-            return
-        time.sleep(1)
+    if state.get("run_id") != run_id:
+        logger.info("🔁 Position worker replaced by a newer run")
+        return
 
     # Manual stop (UNCHANGED)
     logger.info("🛑 Monitor stopped manually.")
-    _position_status(
-        symbol,
-        state["position_status"]["qty_remaining"],
-        last_price,
-        "MANUAL_STOP",
-    )
+    for position in position_book.open_positions():
+        _position_status(position, last_prices.get(position.token), "MANUAL_STOP")
     
     state["is_running"] = False
     state["engine_status"] = "idle"
@@ -453,29 +524,42 @@ def _monitor_position_loop(positions,run_id):
 
 
 def order_place(symbol, qty ,transaction_type, reason ):
+    """Send the order first; Telegram and logging follow on the outbox thread."""
+    type = "BUY" if transaction_type == 'BUY' else "SELL"
 
-    kite = state.get("kite")
-    if transaction_type == 'BUY':
-        type = kite.TRANSACTION_TYPE_BUY
-    else:
-        type = kite.TRANSACTION_TYPE_SELL
-
+    error = None
     try:
-
-        order_number = kite.place_order(
-                                variety=kite.VARIETY_REGULAR,
-                                exchange=kite.EXCHANGE_NSE,
-                                tradingsymbol=symbol,
-                                transaction_type=type,
-                                quantity=qty,
-                                product=kite.PRODUCT_MIS,
-                                order_type=kite.ORDER_TYPE_MARKET,                            
-                                price=None,
-                                validity=kite.VALIDITY_DAY,
-                                trigger_price=None,
-                                trailing_stoploss=None,
-                                tag="ALGO_TRADE_PRADEEP")
+        order_number = order_pipeline.submit(symbol, qty, type)
     except Exception as e:
+        order_number = None
+        error = e
+        logger.exception("Error In Order Place")
+        if _status_unknown(error):
+            _reconcile_async()
+
+    return _notify_order(symbol, qty, order_number, reason, error)
+
+
+def _status_unknown(error):
+    """No answer after the POST went out: the broker may still have accepted the order."""
+    return isinstance(error, (requests.ReadTimeout, TimeoutError))
+
+
+def _notify_order(symbol, qty, order_number, reason, error=None):
+    if _status_unknown(error):
+        outbox.notify(
+            "⚠️ *ORDER STATUS UNKNOWN*\n"
+            "━━━━━━━━━━━━━━━━━━\n"
+            f"🏷 *Symbol*     : `{symbol}`\n"
+            f"📦 *Quantity*  : `{qty}`\n"
+            f"⏱ *Reason*    : `No response from broker (timeout)`\n"
+            "\n"
+            "🔎 _Order may have reached the exchange, reconciling with the order book_"
+        )
+        outbox.log(logger.warning, f"Order status unknown: {symbol} | Qty: {qty} | {error!r}")
+        return None
+
+    if error is not None:
         order_number = 123454321
         error_message = (
             "❌ *ORDER PLACEMENT FAILED*\n"
@@ -488,21 +572,13 @@ def order_place(symbol, qty ,transaction_type, reason ):
             "🛑 _Order NOT sent to exchange_"
         )
 
-        TelegramSender.send_message(
-            error_message,
-            parse_mode="Markdown"
-        )
-        logger.exception("Error In Order Place")
+        outbox.notify(error_message)
 
     message = format_order_placed_message(symbol, qty, order_number , reason)
 
-    TelegramSender.send_message(
-        message,
-        parse_mode="Markdown"
-    )
-    
-                
-    logger.info(f"Placing order: {symbol} | Qty: {qty} |  | order : {order_number} "   )
+    outbox.notify(message)
+    outbox.log(logger.info, f"Placing order: {symbol} | Qty: {qty} |  | order : {order_number} ")
+    return order_number
 
 
 def format_order_placed_message(symbol, qty, order_id , reason):
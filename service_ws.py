@@ -1,12 +1,29 @@
 # service_ws.py
 from state_manager import trading_state
-from kiteconnect import KiteTicker
+from ticker import KiteTicker
+from aio_ticker import AsyncKiteTicker
+from ticker_pool import KiteTickerPool
+from tick_history import tick_history
+from candles import MINUTE_NS, candle_aggregator
+from market_clock import market_clock
+from order_book import order_book
+from sizing import quantity_table
+from tick_queue import ConflatingTickQueue
+from tick_recorder import tick_recorder
+from tick_replay import ReplayTicker, TickReplay, replay_from_env
+from triggers import triggers
+from latency import latency
 from logger_config import setup_logger
+import os
 import threading
 import time
 
 logger = setup_logger("Web_Socket_Manager")
 
+# "twisted" (one reactor thread for every shard) or "asyncio" (AsyncKiteTicker, an event loop
+# thread per shard: the only backend where shards do not decode on one shared thread)
+TICKER_BACKEND = os.getenv("TICKER_BACKEND", "twisted")
+
 
 class WebSocketManager:
     def __init__(self):
@@ -14,30 +31,115 @@ class WebSocketManager:
         self.running = False
         self.connected = False
         self._lock = threading.Lock()   # 🔒 prevents race conditions
+        self.replay = replay_from_env()  # 📼 offline capture instead of the live feed
+
+        # 🔁 Long-lived connection, engine phases only apply subscription deltas
+        self.subscriptions = {}  # token -> mode currently subscribed
+        self._session = None
+
+        # ⏰ Wakeups for the engine instead of sleep polling
+        self.connected_event = threading.Event()
+        self.tick_seq = 0  # bumped once per tick batch (and by wake())
+        self._tick_cond = threading.Condition()
+
+        # 📥 Ticker thread only conflates into the queue, the dispatcher thread applies the ticks
+        self.tick_queue = ConflatingTickQueue()
+        self._dispatcher = None
+        self._candle_timer = None  # ⏰ closes candles on the minute even without a tick
+        self._replay_flush_ns = 0   # next candle close in replay time
 
     # ---------------------------------------------------------
     # SETUP
     # ---------------------------------------------------------
-    def setup(self, api_key, enctoken, user_id):
+    def setup(self, api_key, enctoken, user_id, decode_profile=KiteTicker.PROFILE_FULL):
         with self._lock:
             try:
-                access_token = f"{enctoken}&user_id={user_id}"
-                logger.info("WS Setup → %s", access_token)
-
-                self.kws = KiteTicker(api_key, access_token)
-                self.kws.on_ticks = self.on_ticks
-                self.kws.on_connect = self.on_connect
-                self.kws.on_close = self.on_close
-                self.kws.on_error = self.on_error
+                if self.replay:
+                    logger.info("WS Setup → replay %s | profile=%s", self.replay.path, decode_profile)
+                    self.kws = ReplayTicker(
+                        self.replay,
+                        tick_format=KiteTicker.TICK_FORMAT_LAZY,
+                        decode_profile=decode_profile,
+                    )
+                else:
+                    access_token = f"{enctoken}&user_id={user_id}"
+                    logger.info("WS Setup → %s | profile=%s backend=%s", access_token, decode_profile, TICKER_BACKEND)
+
+                    ticker_cls = AsyncKiteTicker if TICKER_BACKEND == "asyncio" else KiteTicker
+                    # 🧩 One connection per TICKER_TOKENS_PER_CONNECTION tokens, merged into one feed
+                    self.kws = KiteTickerPool(lambda: ticker_cls(
+                        api_key,
+                        access_token,
+                        tick_format=KiteTicker.TICK_FORMAT_LAZY,
+                        decode_profile=decode_profile,
+                        recorder=tick_recorder,
+                    ))
+
+                    if tick_recorder:
+                        tick_recorder.start()
+
+                self._bind_callbacks()
+                self._ensure_dispatcher()
 
                 self.running = False
                 self.connected = False
+                self.connected_event.clear()
                 return True
             except Exception:
                 logger.exception("WS Setup Error")
                 self.kws = None
                 return False
 
+    def ensure_connected(self, api_key, enctoken, user_id, decode_profile=KiteTicker.PROFILE_FULL, timeout=10):
+        """
+        Reuse the running connection (switching the decode profile if needed) or open a new one.
+        Returns True once connected.
+        """
+        session = (api_key, enctoken, user_id)
+
+        if self.kws and self.running and self._session == session:
+            if self.kws.decode_profile != decode_profile:
+                self.set_decode_profile(decode_profile)
+            if self.wait_connected(timeout):
+                logger.info("♻️ Reusing WebSocket | subscriptions=%s", len(self.subscriptions))
+                return True
+            logger.warning("⚠️ WebSocket not connected, opening a new one")
+
+        self.stop()
+        if not self.setup(api_key, enctoken, user_id, decode_profile=decode_profile):
+            return False
+        if not self.start():
+            return False
+
+        self._session = session
+        return self.wait_connected(timeout)
+
+    def _bind_callbacks(self):
+        self.kws.on_ticks = self.on_ticks
+        self.kws.on_connect = self.on_connect
+        self.kws.on_close = self.on_close
+        self.kws.on_error = self.on_error
+        self.kws.on_order_update = self.on_order_update
+
+    # ---------------------------------------------------------
+    # REPLAY
+    # ---------------------------------------------------------
+    def use_replay(self, path, speed=1.0):
+        """Drive the next setup() from a tick capture file (speed 0 = as fast as possible)."""
+        with self._lock:
+            if self.replay:
+                self.replay.close()
+            self.replay = TickReplay(path, speed=speed)
+            self._replay_flush_ns = 0
+            logger.info("📼 Replay source → %s @ %sx", path, speed or "max")
+
+    def use_live(self):
+        with self._lock:
+            if self.replay:
+                self.replay.close()
+            self.replay = None
+            logger.info("📡 Live source restored")
+
     # ---------------------------------------------------------
     # START
     # ---------------------------------------------------------
@@ -65,25 +167,69 @@ class WebSocketManager:
     # SUBSCRIBE
     # ---------------------------------------------------------
     def subscribe(self, tokens):
+        """Add `tokens` to the subscription set (already subscribed ones are left alone)."""
         with self._lock:
-            if not self.kws or not self.connected:
-                logger.warning(
-                    "⚠️ WS subscribe skipped — connected=%s kws=%s",
-                    self.connected,
-                    bool(self.kws),
-                )
-                return False
+            wanted = dict(self.subscriptions)
+            for token in map(int, tokens):
+                wanted.setdefault(token, KiteTicker.MODE_QUOTE)
+            return self._apply_subscriptions(wanted)
 
-            try:
-                self.kws.subscribe(tokens)
-                self.kws.set_mode(self.kws.MODE_QUOTE, tokens)
-                trading_state["subscribed_tokens"] = tokens
-                logger.info("📡 Subscribed tokens: %s", tokens)
-                return True
-            except Exception:
-                logger.exception("WS Subscribe Error")
+    def set_subscriptions(self, tokens, mode=KiteTicker.MODE_QUOTE):
+        """Make `tokens` (in `mode`) the whole subscription set, sending only the differences."""
+        with self._lock:
+            return self._apply_subscriptions(dict.fromkeys(map(int, tokens), mode))
+
+    def _apply_subscriptions(self, wanted):
+        """Move to `wanted` ({token: mode}): unsubscribe / subscribe / set_mode for the differences only."""
+        if not self.kws or not self.connected:
+            logger.warning(
+                "⚠️ WS subscribe skipped — connected=%s kws=%s",
+                self.connected,
+                bool(self.kws),
+            )
+            return False
+
+        current = self.subscriptions
+
+        removed = [t for t in current if t not in wanted]
+        added = [t for t in wanted if t not in current]
+        changed = [t for t in wanted if t in current and current[t] != wanted[t]]
+
+        by_mode = {}
+        for token in added + changed:
+            by_mode.setdefault(wanted[token], []).append(token)
+
+        try:
+            if removed:
+                self.kws.unsubscribe(removed)
+            if added:
+                self.kws.subscribe(added)
+            for mode, mode_tokens in by_mode.items():
+                self.kws.set_mode(mode, mode_tokens)
+        except Exception:
+            logger.exception("WS Subscribe Error")
+            return False
+
+        self.subscriptions = wanted
+        trading_state["subscribed_tokens"] = list(wanted)
+        tick_history.retain(wanted)
+        candle_aggregator.retain(wanted)
+        logger.info("📡 Subscriptions → %s | +%s -%s ~%s", len(wanted), added, removed, changed)
+        return True
+
+    # ---------------------------------------------------------
+    # DECODE PROFILE
+    # ---------------------------------------------------------
+    def set_decode_profile(self, decode_profile):
+        """Switch the fields decoded from every tick (ltp / ohlc / full) on the live connection."""
+        with self._lock:
+            if not self.kws:
                 return False
 
+            self.kws.decode_profile = decode_profile
+            logger.info("🧬 Decode profile → %s", decode_profile)
+            return True
+
     # ---------------------------------------------------------
     # STOP (SAFE)
     # ---------------------------------------------------------
@@ -104,28 +250,61 @@ class WebSocketManager:
                 # reset state safely
                 self.running = False
                 self.connected = False
+                self.connected_event.clear()
                 self.kws = None
+                self.subscriptions = {}
+                self._session = None
 
                 trading_state["websocket_status"] = "Disconnected"
                 trading_state["subscribed_tokens"] = []
+                self.wake()
 
-                logger.info("🔴 WebSocket fully stopped")
+                logger.info("🔴 WebSocket fully stopped | tick queue=%s", self.tick_queue.stats())
                 return True
             except Exception:
                 logger.exception("WS Stop Error")
                 return False
 
+    # ---------------------------------------------------------
+    # WAITS
+    # ---------------------------------------------------------
+    def wait_connected(self, timeout=10):
+        """Block until the websocket is connected. False on timeout."""
+        return self.connected_event.wait(timeout)
+
+    def wait_for_ticks(self, tokens, timeout=10, require_all=False):
+        """Block until any (or, with `require_all`, every) token in `tokens` has ticked. False on timeout."""
+        live_data = trading_state["live_data"]
+        check = all if require_all else any
+
+        with self._tick_cond:
+            return self._tick_cond.wait_for(lambda: check(t in live_data for t in tokens), timeout)
+
+    def wait_for_tick(self, seq, timeout=1.0):
+        """Block until a tick batch newer than `seq` arrived (or `timeout`). Returns the current tick_seq."""
+        with self._tick_cond:
+            self._tick_cond.wait_for(lambda: self.tick_seq != seq, timeout)
+            return self.tick_seq
+
+    def wake(self):
+        """Release `wait_for_tick` waiters without a tick (market clock events, stop)."""
+        with self._tick_cond:
+            self.tick_seq += 1
+            self._tick_cond.notify_all()
+
     # ---------------------------------------------------------
     # CALLBACKS
     # ---------------------------------------------------------
     def on_connect(self, ws, resp):
         logger.info("🟢 WS CONNECTED")
         self.connected = True
+        self.connected_event.set()
         trading_state["websocket_status"] = "Connected"
 
     def on_close(self, ws, code, reason):
         logger.info("🔴 WS CLOSED | code=%s reason=%s", code, reason)
         self.connected = False
+        self.connected_event.clear()
         self.running = False
         trading_state["websocket_status"] = "Disconnected"
 
@@ -133,51 +312,93 @@ class WebSocketManager:
         # 🔥 FIXED logging crash
         logger.info("⚠️ WS ERROR | code=%s reason=%s", code, reason)
 
+    def on_order_update(self, ws, data):
+        """Order postback → local order book, then wake the engine waiters."""
+        try:
+            order_book.apply(data)
+        except Exception:
+            logger.exception("❌ Order update error | %s", data)
+        self.wake()
+
     # ---------------------------------------------------------
-    # TICKS (UNCHANGED BUSINESS LOGIC)
+    # TICKS
     # ---------------------------------------------------------
     def on_ticks(self, ws, ticks):
         """
         Zerodha tick callback.
-        Deep-merge logic preserved EXACTLY as your original.
+        Only hands the ticks to the conflating queue, nothing slow runs on the ticker thread.
         """
 
         if not ticks:
             return
 
-        for tick in ticks:
-            token = tick.get("instrument_token")
-            if not token:
-                continue
+        if self.replay:
+            # Replays apply every tick in order on the replay thread: no conflation, same result every run
+            self._apply_ticks(ticks)
+        else:
+            self.tick_queue.put(ticks)
 
-            prev = trading_state["live_data"].get(token, {})
-            merged = prev.copy()
+    def _ensure_dispatcher(self):
+        if not self._candle_timer:
+            # Candle periods are whole minutes from 09:15, so every minute boundary is a close
+            self._candle_timer = market_clock.every(60, self._flush_candles, align=True, name="candle-close")
 
-            if tick.get("last_price") is not None:
-                merged["last_price"] = tick["last_price"]
-
-            if tick.get("last") is not None:
-                merged["last"] = tick["last"]
-
-            if "ohlc" in tick and isinstance(tick["ohlc"], dict):
-                merged.setdefault("ohlc", {})
-                for k, v in tick["ohlc"].items():
-                    if v is not None:
-                        merged["ohlc"][k] = v
-
-            if tick.get("volume") is not None:
-                merged["volume"] = tick["volume"]
+        if self._dispatcher and self._dispatcher.is_alive():
+            return
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="tick-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def _flush_candles(self):
+        # Replays close candles from the capture's clock (_advance_replay_clock)
+        if not self.replay:
+            candle_aggregator.flush()
+
+    def _advance_replay_clock(self, ticks):
+        """Close candles on the minute boundaries of the replayed timestamps."""
+        replay_ns = max((getattr(t, "received_ns", None) or 0) for t in ticks)
+        if replay_ns < self._replay_flush_ns:
+            return
+        if self._replay_flush_ns:
+            candle_aggregator.flush(replay_ns)
+        self._replay_flush_ns = (replay_ns // MINUTE_NS + 1) * MINUTE_NS
 
-            if "depth" in tick and isinstance(tick["depth"], dict):
-                merged.setdefault("depth", {})
-                for side in ("buy", "sell"):
-                    if side in tick["depth"]:
-                        merged["depth"][side] = tick["depth"][side]
+    def _dispatch_loop(self):
+        while True:
+            ticks = self.tick_queue.drain()
+            try:
+                self._apply_ticks(ticks)
+            except Exception:
+                logger.exception("❌ Tick dispatch error")
 
-            if tick.get("timestamp") is not None:
-                merged["timestamp"] = tick["timestamp"]
+    def _apply_ticks(self, ticks):
+        """
+        Writes the ticks in place into the live quote table (trading_state["live_data"]),
+        reprices the entry quantities, checks the price triggers of the tokens in this batch, appends them to the tick
+        history, folds them into the running candles and wakes the waiters.
+        """
+        live_data = trading_state["live_data"]
+        slots = live_data.update(ticks)
+        merged_ns = time.time_ns()
 
-            trading_state["live_data"][token] = merged
+        # ⏱ exchange → receive → merge (not measured on replays, ticks carry the captured receive time)
+        for tick in ticks:
+            received_ns = getattr(tick, "received_ns", None)
+            if received_ns is None or self.replay:
+                continue
+            latency.record("receive_to_merge", merged_ns - received_ns)
+            if "exchange_timestamp" in tick and tick["exchange_timestamp"]:
+                latency.record("exchange_to_receive", received_ns - tick["exchange_timestamp"].timestamp() * 1e9)
+
+        quantity_table.update(live_data, slots)
+        triggers.evaluate(ticks, live_data, slots, merged_ns)
+        tick_history.record(ticks, merged_ns)
+        candle_aggregator.update(ticks, merged_ns)
+        if self.replay:
+            self._advance_replay_clock(ticks)
+
+        with self._tick_cond:
+            self.tick_seq += 1
+            self._tick_cond.notify_all()
 
 
 # ---------------------------------------------------------
@@ -0,0 +1,161 @@
+# sizing.py
+"""
+Order sizing without REST calls on the entry path.
+
+`MarginCache` holds the account's equity margin, refreshed in the background
+(market clock timer) and after every fill seen in the order book.
+`QuantityTable` keeps the entry quantity of every eligible stock, recomputed
+by the tick dispatcher for the tokens that moved and for all tokens when the
+margin changes, so an entry signal only has to look it up.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from market_clock import market_clock
+from order_book import order_book
+from state_manager import trading_state as state
+from logger_config import setup_logger
+
+logger = setup_logger("Sizing")
+
+LEVERAGE = 5         # MIS exposure per rupee of margin
+MARGIN_BUFFER = 500  # kept free for charges
+MARGIN_REFRESH_SECONDS = int(os.getenv("MARGIN_REFRESH_SECONDS", "30"))
+
+
+def quantity_for(capital, price):
+    """Same sizing as always: 5x capital / price, at least 1, rounded up to odd."""
+    return max(int((capital * LEVERAGE) / price), 1) | 1
+
+
+class MarginCache:
+    def __init__(self):
+        self.net = None           # kite.margins()["equity"]["net"]
+        self.refreshed_at = None  # epoch seconds
+        self._refreshing = threading.Lock()
+        self._timer = None
+        self._listener = None
+
+    def capital(self):
+        """Capital used for sizing, None until the first refresh."""
+        if self.net is None:
+            return None
+        return min(self.net, state["max_margin"]) - MARGIN_BUFFER
+
+    def refresh(self, kite=None):
+        """Fetch the margin now (blocking). Concurrent refreshes collapse into one."""
+        if not self._refreshing.acquire(blocking=False):
+            return self.net
+
+        try:
+            kite = kite or state.get("kite")
+            if not kite:
+                return self.net
+            self.net = kite.margins()["equity"]["net"]
+            self.refreshed_at = time.time()
+        except Exception:
+            logger.exception("❌ Margin refresh failed")
+            return self.net
+        finally:
+            self._refreshing.release()
+
+        logger.info("💰 Margin → %s (capital %s)", self.net, self.capital())
+        quantity_table.recompute()
+        return self.net
+
+    def refresh_async(self):
+        threading.Thread(target=self.refresh, name="margin-refresh", daemon=True).start()
+
+    # ---------------------------------------------------------
+    # BACKGROUND REFRESH
+    # ---------------------------------------------------------
+    def start(self):
+        """Refresh every MARGIN_REFRESH_SECONDS and after every fill until `stop()`."""
+        if self._timer and self._timer.active:
+            return
+        self._timer = market_clock.every(MARGIN_REFRESH_SECONDS, self.refresh_async, name="margin-refresh")
+        self._listener = order_book.add_listener(self._on_order_update)
+
+    def stop(self):
+        market_clock.cancel(self._timer)
+        self._timer = None
+        if self._listener:
+            order_book.remove_listener(self._listener)
+            self._listener = None
+
+    def _on_order_update(self, order, filled):
+        if filled:
+            self.refresh_async()
+
+
+class QuantityTable:
+    """Entry quantity per eligible token, in token-sorted arrays."""
+
+    def __init__(self):
+        self._arrays = self._empty()
+
+    @staticmethod
+    def _empty():
+        return np.empty(0, dtype="i8"), np.empty(0), np.empty(0, dtype="i8")
+
+    def build(self, tokens, quotes):
+        """New table for `tokens`, priced from the live quote table."""
+        tokens = np.unique(np.asarray([int(t) for t in tokens], dtype="i8"))
+        prices = quotes.last_prices(tokens) if len(tokens) else np.empty(0)
+        self._arrays = (tokens, prices, np.zeros(len(tokens), dtype="i8"))
+        self.recompute()
+        logger.info("📐 Quantity table built for %s tokens", len(tokens))
+
+    def clear(self):
+        self._arrays = self._empty()
+
+    def recompute(self, positions=None):
+        """Recompute the quantities at `positions` (all when None) from their last prices."""
+        tokens, prices, qty = self._arrays
+        capital = margin_cache.capital()
+        if not len(tokens) or capital is None:
+            return
+
+        if positions is None:
+            positions = slice(None)
+        p = prices[positions]
+        known = p > 0
+        raw = np.zeros(len(p), dtype="i8")
+        raw[known] = np.maximum((capital * LEVERAGE / p[known]).astype("i8"), 1) | 1
+        qty[positions] = raw
+
+    def update(self, quotes, slots):
+        """Reprice the tokens behind the quote table rows `slots` (tick dispatcher thread)."""
+        tokens, prices, _ = self._arrays
+        if not len(tokens) or not len(slots):
+            return
+
+        slots = np.asarray(slots, dtype="i8")
+        batch_tokens = quotes.tokens[slots]
+        pos = np.searchsorted(tokens, batch_tokens)
+        pos[pos == len(tokens)] = 0
+        match = tokens[pos] == batch_tokens
+        if not match.any():
+            return
+
+        pos = pos[match]
+        prices[pos] = quotes.columns["last_price"][slots[match]]
+        self.recompute(pos)
+
+    def quantity(self, token):
+        """Precomputed quantity of `token`, None if not in the table or not priced yet."""
+        tokens, _, qty = self._arrays
+        i = np.searchsorted(tokens, int(token))
+        if i < len(tokens) and tokens[i] == int(token) and qty[i] > 0:
+            return int(qty[i])
+        return None
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCES
+# ---------------------------------------------------------
+margin_cache = MarginCache()
+quantity_table = QuantityTable()
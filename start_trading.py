@@ -1,18 +1,22 @@
 # start_trading.py (REST-ONLY, PRODUCTION SAFE ENGINE VERSION)
 
-from datetime import datetime
-
 from flask import session
 from state_manager import trading_state as state
 from service_ws import ws_manager
+from ticker import KiteTicker
+import functools
 import time
 import uuid
 from threading import Thread
 from position_manager import order_place, start_position_monitor_handler
 from eligible_stocks import format_eligible_stocks_message, run_eligibility
-from telegram.sender import TelegramSender
 from logger_config import setup_logger
 from util import get_kite
+from triggers import ThresholdIndex, triggers
+from latency import latency
+from market_clock import market_clock
+from sizing import margin_cache, quantity_for, quantity_table
+from order_pipeline import order_pipeline, outbox
 
 logger = setup_logger("state_trading")
 
@@ -67,65 +71,58 @@ def start_trading_handler():
 
     
 
-    # ============================================================
-    # 🔥 PRODUCTION SAFE WEBSOCKET RESET (UNCHANGED INTENT)
-    # ============================================================
-    if ws_manager.running:
-        logger.info("🧹 Stopping previous WebSocket cleanly")
-        ws_manager.stop()
-        time.sleep(0.5)
-
     # ------------------------------------------------------------
-    # 5️⃣ Setup WebSocket (UNCHANGED FLOW)
+    # 5️⃣ WebSocket (kept open from eligibility, only the profile switches)
     # ------------------------------------------------------------
-    if not ws_manager.setup("PradeepApi", state["enctoken"], state["user_id"]):
-        state["engine_status"] = "idle"
-        state["current_step"] = "idle"
-        return {"success": False, "error": "WebSocket setup failed"}
-
-    if not ws_manager.start():
-        state["engine_status"] = "idle"
-        state["current_step"] = "idle"
-        return {"success": False, "error": "WebSocket start failed"}
-
-    # ------------------------------------------------------------
-    # 6️⃣ Wait for WebSocket connection (UNCHANGED)
-    # ------------------------------------------------------------
-    for i in range(20):
-        if ws_manager.connected:
-            logger.info("🟢 WS Connected")
-            break
-        logger.info("⏳ Waiting for WS (%s/20)", i + 1)
-        time.sleep(0.5)
-    else:
+    # Entry monitor only reads last_price
+    if not ws_manager.ensure_connected("PradeepApi", state["enctoken"], state["user_id"],
+                                       decode_profile=KiteTicker.PROFILE_LTP, timeout=10):
         state["engine_status"] = "idle"
         state["current_step"] = "idle"
         return {"success": False, "error": "WebSocket connection failed"}
+    logger.info("🟢 WS Connected")
 
     # ------------------------------------------------------------
-    # 7️⃣ Subscribe tokens (UNCHANGED)
+    # 7️⃣ Subscribe tokens (deltas only)
     # ------------------------------------------------------------
+    # Only the eligible stocks stay subscribed
     tokens = [int(s["instrument_token"]) for s in eligible]
     if tokens:
-        ws_manager.subscribe(tokens)
-        time.sleep(1)
+        ws_manager.set_subscriptions(tokens)
+        ws_manager.wait_for_ticks(tokens, timeout=1)
 
     # ------------------------------------------------------------
     # 8️⃣ Start trading monitor thread (UNCHANGED)
     # ------------------------------------------------------------
-    run_id = uuid.uuid4().hex
-
-    state.update({
-        "run_id": run_id,
-        "is_running": True,          # 🔑 OWNED by trading monitor
-        "engine_status": "running",
-        "current_step": "Order Monitoring Started",
-        "session_start_time": time.time(),
-        "order_placed": False,
-        "remaining_seconds": state.get("max_session_seconds", 4 * 60 * 60),
-    })
-
-    Thread(target=_monitor_trades, args=(run_id,), daemon=True).start()
+    # ------------------------------------------------------------
+    # 💰 Margin + quantities ready before any signal (no REST on the entry path)
+    # ------------------------------------------------------------
+    try:
+        margin_cache.refresh(kite)
+        margin_cache.start()
+        quantity_table.build(tokens, state["live_data"])
+        order_pipeline.prepare([s["symbol"] for s in eligible])
+        order_pipeline.start()
+
+        run_id = uuid.uuid4().hex
+
+        state.update({
+            "run_id": run_id,
+            "is_running": True,          # 🔑 OWNED by trading monitor
+            "engine_status": "running",
+            "current_step": "Order Monitoring Started",
+            "session_start_time": time.time(),
+            "order_placed": False,
+            "remaining_seconds": state.get("max_session_seconds", 4 * 60 * 60),
+        })
+
+        _start_session_clock(state["session_start_time"])
+        _monitor_trades(run_id)
+    except Exception:
+        # Half started → cancel the timers / triggers that already run
+        logger.exception("Trading setup failed")
+        stop_trading_handler()
+        return {"success": False, "error": "Trading setup failed"}
 
     return {
         "success": True,
@@ -144,6 +141,11 @@ def stop_trading_handler():
     state["is_running"] = False
     state["engine_status"] = "stopped"
     state["current_step"] = "stopped"
+    triggers.cancel_group(ENTRY_GROUP)
+    market_clock.cancel_group(SESSION_CLOCK_GROUP)
+    margin_cache.stop()
+    quantity_table.clear()
+    order_pipeline.stop()
 
     try:
         ws_manager.stop()
@@ -160,56 +162,123 @@ def stop_trading_handler():
 
 
 # ============================================================
-# BACKGROUND MONITOR LOOP (FIXED – NO LOGIC CHANGE)
+# SESSION CLOCK (COUNTDOWN + TIMEOUT)
 # ============================================================
 
+SESSION_CLOCK_GROUP = "session"
+
+
+def _start_session_clock(session_start_time):
+    market_clock.cancel_group(SESSION_CLOCK_GROUP)
+    expires_ns = int((session_start_time + state.get("max_session_seconds", 4 * 60 * 60)) * 1e9)
+
+    market_clock.every(1, _tick_session_countdown, session_start_time, expires_ns,
+                       align=True, name="session-countdown", group=SESSION_CLOCK_GROUP)
+    market_clock.at(expires_ns, _on_session_timeout, session_start_time,
+                    name="session-timeout", group=SESSION_CLOCK_GROUP)
+
+
+def _tick_session_countdown(session_start_time, expires_ns):
+    if state.get("session_start_time") != session_start_time:
+        return
+    state["remaining_seconds"] = max(0, round((expires_ns - time.time_ns()) / 1e9))
+
+
+def _on_session_timeout(session_start_time):
+    if state.get("session_start_time") != session_start_time:
+        return
+
+    market_clock.cancel_group(SESSION_CLOCK_GROUP)
+    state["remaining_seconds"] = 0
+
+    if state.get("order_placed"):
+        logger.info("⏰ Session time over, position stays monitored until square-off")
+        return
+
+    logger.info("⏰ Session time over without an entry, stopping")
+    # Stopping tears down the websocket (blocking) → keep it off the market clock thread
+    Thread(target=stop_trading_handler, name="session-timeout-stop", daemon=True).start()
+
+
+# ============================================================
+# ENTRY MONITOR (TICK-DRIVEN TRIGGERS)
+# ============================================================
+
+ENTRY_GROUP = "entry"
+
+
 def _monitor_trades(run_id: str):
+    """Notify the eligible list and arm the entry triggers (the tokens are already subscribed)."""
     logger.info("===== MONITOR STARTED =====")
 
+    eligible_list = state.get("eligible_stocks", []).copy()
+    outbox.notify(format_eligible_stocks_message(eligible_list))
+    _arm_entry(run_id, eligible_list)
+
+
+def _arm_entry(run_id, eligible_list):
+    # 🎯 price >= high of every eligible stock in one sorted index, checked per tick batch
+    triggers.cancel_group(ENTRY_GROUP)
+    triggers.add_index(ThresholdIndex(
+        [int(s["instrument_token"]) for s in eligible_list],
+        [float(s["high"]) for s in eligible_list],
+        functools.partial(_on_entry_signal, run_id, eligible_list),
+        group=ENTRY_GROUP,
+        exclusive=True,  # only one entry per run
+    ))
+    logger.info("🎯 Entry triggers armed for %s stocks", len(eligible_list))
+
+
+def _on_entry_signal(run_id, eligible_list, crossed):
+    if state.get("run_id") != run_id or not state.get("is_running"):
+        return
+
+    latency.mark_signal()
+
+    # Several stocks can cross in one batch → take the first in eligibility order
+    token, price = crossed[0]
+    stock = next(s for s in eligible_list if int(s["instrument_token"]) == token)
+
     try:
-        kite =get_kite(state["username"])
-        eligible_list = state.get("eligible_stocks", []).copy()
-        eligible = state.get("eligible_stocks", [])
-        TelegramSender.send_message(
-                                    format_eligible_stocks_message(eligible),
-                                    parse_mode="Markdown"
-                                    )
-
-        # Safety subscribe (UNCHANGED)
-        tokens = [int(s["instrument_token"]) for s in eligible_list]
-        if tokens:
-            ws_manager.subscribe(tokens)
-
-        while state.get("run_id") == run_id and state.get("is_running"): 
-            live_data = state.get("live_data", {})
-
-            for stock in eligible_list:
-                token = int(stock["instrument_token"])
-                high = float(stock["high"])
-                price = (live_data.get(token) or {}).get("last_price")
-
-                if price and price >= high:
-                    logger.info("🔥 ENTRY SIGNAL for %s", stock["symbol"])
-                    qty = _calculate_quantity(price)
-                    order_place(stock["symbol"], qty,transaction_type="SELL" ,reason= "ORDER PLACE SUCCESSFULLY")
-                    state["order_placed"] = True
-                    state["current_step"] = "Order Placed"
-                    start_position_monitor_handler()
-                    return
-                logger.info("SYMBOL:- %s | Last Price:- %s", stock["symbol"],price)
-            time.sleep(1)
+        qty = _calculate_quantity(token, price)
+    except Exception:
+        # Nothing was sent → keep watching the other stocks
+        logger.exception("Entry sizing failed | %s", stock["symbol"])
+        remaining = [s for s in eligible_list if int(s["instrument_token"]) != token]
+        if remaining:
+            _arm_entry(run_id, remaining)
+        else:
+            logger.info("⚠️ No entry candidates left, stopping")
+            Thread(target=stop_trading_handler, name="entry-stop", daemon=True).start()
+        return
 
+    try:
+        order_place(stock["symbol"], qty,transaction_type="SELL" ,reason= "ORDER PLACE SUCCESSFULLY")
+        outbox.log(logger.info, "🔥 ENTRY SIGNAL for %s | price=%s | crossed=%s", stock["symbol"], price, len(crossed))
+        state["order_placed"] = True
+        state["current_step"] = "Order Placed"
+        start_position_monitor_handler()
     except Exception:
-        logger.exception(f"Monitor crashed is runinng execption block {state["is_running"] }  and {state.get("is_running")}")
-        
-        
+        # The order may be at the broker → no second entry, a human has to look
+        logger.exception("Entry failed | %s", stock["symbol"])
+        state["is_running"] = False
+        state["engine_status"] = "error"
+        state["current_step"] = "ENTRY_FAILED"
+        outbox.notify(f"🚨 *ENTRY FAILED* for `{stock['symbol']}`, engine stopped. Check positions manually.")
+
+
 # ============================================================
-# QUANTITY CALCULATION (UNCHANGED)
+# QUANTITY CALCULATION (PRECOMPUTED)
 # ============================================================
 
-def _calculate_quantity(last_price):
-    kite =get_kite(state["username"])
-    net = kite.margins()["equity"]["net"]
-    capital = min(net, state["max_margin"]) - 500
-    qty = max(int((capital * 5) / last_price), 1)
-    return qty | 1
+def _calculate_quantity(token, last_price):
+    qty = quantity_table.quantity(token)
+    if qty:
+        return qty
+
+    capital = margin_cache.capital()
+    if capital is None:
+        # Cache never filled (margin refresh failed) → one REST call as before
+        margin_cache.refresh(get_kite(state["username"]))
+        capital = margin_cache.capital()
+    return quantity_for(capital, last_price)
@@ -1,5 +1,6 @@
 # state_manager.py
 from datetime import time as dt_time
+from live_quotes import LiveQuoteTable
 trading_state = {
 
     # ==================================================
@@ -23,7 +24,7 @@ trading_state = {
     # ==================================================
     # 📡 LIVE MARKET DATA
     # ==================================================
-    "live_data": {},               # token -> tick data
+    "live_data": LiveQuoteTable(),  # token -> latest quote (columnar, dict-like)
     "subscribed_tokens": [],       # list of subscribed instrument tokens
 
     # ==================================================
@@ -0,0 +1,172 @@
+# tests/test_aio_ticker.py
+"""
+AsyncKiteTicker against a local stand-in for the Kite websocket.
+
+The stand-in speaks plain ws:// through wsproto: it accepts the handshake,
+answers pings, records text messages and replies to every subscribe with one
+binary LTP frame per token. `drop_first` cuts the first connection right
+after the handshake to exercise the reconnect path, `reset_first` resets it
+(TCP RST) so the client read fails with an error instead of a clean EOF.
+"""
+import asyncio
+import json
+import socket
+import struct
+import threading
+import unittest
+
+from wsproto import ConnectionType, WSConnection
+from wsproto.events import AcceptConnection, BytesMessage, CloseConnection, Ping, Request, TextMessage
+
+from aio_ticker import AsyncKiteTicker
+
+TOKEN = 408065     # NSE equity segment → prices in paise
+LTP_PAISE = 123456
+WAIT = 5
+
+
+def ltp_frame(tokens, ltp=LTP_PAISE):
+    packets = [struct.pack(">II", token, ltp) for token in tokens]
+    return struct.pack(">H", len(packets)) + b"".join(struct.pack(">H", len(p)) + p for p in packets)
+
+
+class StandInServer:
+    def __init__(self, drop_first=False, reset_first=False):
+        self.drop_first = drop_first
+        self.reset_first = reset_first
+        self.connections = 0
+        self.messages = []
+        self.port = None
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait(WAIT)
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(WAIT)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._serve, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self.loop.run_forever()
+        server.close()
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        connection = WSConnection(ConnectionType.SERVER)
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                connection.receive_data(data)
+
+                for event in connection.events():
+                    if isinstance(event, Request):
+                        writer.write(connection.send(AcceptConnection()))
+                        if self.drop_first and self.connections == 1:
+                            await writer.drain()
+                            return
+                        if self.reset_first and self.connections == 1:
+                            await writer.drain()
+                            sock = writer.get_extra_info("socket")
+                            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                            writer.transport.abort()
+                            return
+                    elif isinstance(event, TextMessage):
+                        message = json.loads(event.data)
+                        self.messages.append(message)
+                        if message["a"] == "subscribe":
+                            writer.write(connection.send(BytesMessage(data=ltp_frame(message["v"]))))
+                    elif isinstance(event, Ping):
+                        writer.write(connection.send(event.response()))
+                    elif isinstance(event, CloseConnection):
+                        writer.write(connection.send(event.response()))
+                        await writer.drain()
+                        return
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+class AsyncKiteTickerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = None
+        self.ticker = None
+        self.ticks = []
+        self.got_ticks = threading.Event()
+
+    def tearDown(self):
+        if self.ticker:
+            self.ticker.stop()
+            if self.ticker.websocket_thread:
+                self.ticker.websocket_thread.join(WAIT)
+        if self.server:
+            self.server.stop()
+
+    def connect(self, reconnect=True, drop_first=False, reset_first=False, **callbacks):
+        self.server = StandInServer(drop_first=drop_first, reset_first=reset_first).start()
+        # Positional like KiteTicker: api_key, access_token, debug, root, reconnect
+        self.ticker = AsyncKiteTicker("api_key", "token", False, f"ws://127.0.0.1:{self.server.port}/", reconnect)
+        self.ticker._initial_delay = 0.05
+
+        self.ticker.on_connect = lambda ws, response: ws.subscribe([TOKEN])
+        self.ticker.on_ticks = self._on_ticks
+        for name, callback in callbacks.items():
+            setattr(self.ticker, name, callback)
+        self.ticker.connect(threaded=True)
+        return self.ticker
+
+    def _on_ticks(self, ws, ticks):
+        self.ticks.extend(ticks)
+        self.got_ticks.set()
+
+    def test_subscribe_receives_ticks(self):
+        self.connect()
+
+        self.assertTrue(self.got_ticks.wait(WAIT), "no ticks from the stand-in server")
+        self.assertEqual(self.server.messages[0], {"a": "subscribe", "v": [TOKEN]})
+        self.assertEqual(self.ticks[0]["instrument_token"], TOKEN)
+        self.assertEqual(self.ticks[0]["last_price"], LTP_PAISE / 100)
+        self.assertTrue(self.ticker.is_connected())
+
+    def test_reconnects_after_drop(self):
+        attempts = []
+        self.connect(drop_first=True, on_reconnect=lambda ws, count: attempts.append(count))
+
+        self.assertTrue(self.got_ticks.wait(WAIT), "no ticks after reconnecting")
+        self.assertEqual(attempts, [1])
+        self.assertEqual(self.server.connections, 2)
+
+    def test_connection_error_reports_close(self):
+        closes = []
+        self.connect(reset_first=True, on_close=lambda ws, code, reason: closes.append(code))
+
+        self.assertTrue(self.got_ticks.wait(WAIT), "no ticks after reconnecting")
+        self.assertEqual(closes, [1006])
+        self.assertEqual(self.server.connections, 2)
+
+    def test_reconnect_disabled_positionally(self):
+        closed = threading.Event()
+        reconnects = []
+        ticker = self.connect(reconnect=False, drop_first=True,
+                              on_close=lambda ws, code, reason: closed.set(),
+                              on_reconnect=lambda ws, count: reconnects.append(count))
+
+        self.assertFalse(ticker.reconnect)
+        self.assertTrue(closed.wait(WAIT))
+        ticker.websocket_thread.join(WAIT)
+        self.assertFalse(ticker.websocket_thread.is_alive())
+        self.assertEqual(reconnects, [])
+        self.assertEqual(self.server.connections, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# tests/test_candles.py
+"""
+Candle periods aligned to the 09:15 IST session start, and the aggregator
+closing candles on a later tick or on flush.
+"""
+import unittest
+from datetime import datetime
+
+from candles import MINUTE_NS, CandleAggregator, period_bounds
+from logger_config import IST
+
+TOKEN = 408065
+
+
+def ist_ns(hour, minute, second=0):
+    return int(IST.localize(datetime(2026, 1, 2, hour, minute, second)).timestamp()) * 10**9
+
+
+def hhmm(ns):
+    return datetime.fromtimestamp(ns / 1e9, IST).strftime("%H:%M")
+
+
+class PeriodBoundsTest(unittest.TestCase):
+    def bounds(self, ts_ns, minutes):
+        return tuple(hhmm(ns) for ns in period_bounds(ts_ns, minutes * MINUTE_NS))
+
+    def test_aligned_to_session_start(self):
+        self.assertEqual(self.bounds(ist_ns(9, 15), 3), ("09:15", "09:18"))
+        self.assertEqual(self.bounds(ist_ns(9, 17, 59), 3), ("09:15", "09:18"))
+        self.assertEqual(self.bounds(ist_ns(9, 18), 3), ("09:18", "09:21"))
+        self.assertEqual(self.bounds(ist_ns(10, 1), 5), ("10:00", "10:05"))
+        self.assertEqual(self.bounds(ist_ns(10, 1), 15), ("10:00", "10:15"))
+        self.assertEqual(self.bounds(ist_ns(15, 29), 7), ("15:26", "15:33"))  # 09:15 + 53 × 7 min
+
+    def test_before_session_start(self):
+        self.assertEqual(self.bounds(ist_ns(9, 14), 3), ("09:12", "09:15"))
+        self.assertEqual(self.bounds(ist_ns(0, 5), 15), ("00:00", "00:15"))
+
+
+class CandleAggregatorTest(unittest.TestCase):
+    def setUp(self):
+        self.aggregator = CandleAggregator(intervals=(3, 5))
+        self.closed = []
+        self.aggregator.add_listener(self.closed.append)
+
+    def tick(self, price, at_ns, volume=None):
+        tick = {"instrument_token": TOKEN, "last_price": price}
+        if volume is not None:
+            tick["volume_traded"] = volume
+        self.aggregator.update([tick], now_ns=at_ns)
+
+    def test_ohlcv_and_close_on_later_tick(self):
+        self.tick(100.0, ist_ns(9, 15, 1), volume=1000)
+        self.tick(102.0, ist_ns(9, 16), volume=1200)
+        self.tick(99.0, ist_ns(9, 17), volume=1500)
+        self.tick(101.0, ist_ns(9, 17, 59), volume=1600)
+
+        running = self.aggregator.current(TOKEN, 3)
+        self.assertEqual((running["open"], running["high"], running["low"], running["close"]), (100.0, 102.0, 99.0, 101.0))
+        self.assertEqual(running["volume"], 600)
+        self.assertEqual(running["tick_count"], 4)
+        self.assertEqual(self.closed, [])
+
+        self.tick(103.0, ist_ns(9, 18), volume=1700)
+        self.assertEqual([(c.interval, hhmm(c.start_ns), c.close) for c in self.closed], [(3, "09:15", 101.0)])
+
+        running = self.aggregator.current(TOKEN, 3)
+        self.assertEqual(running["open"], 103.0)
+        self.assertEqual(running["volume"], 100)  # counted from the last volume of the previous period
+        self.assertEqual(self.aggregator.current(TOKEN, 5)["tick_count"], 5)
+
+    def test_flush_closes_ended_periods(self):
+        self.tick(100.0, ist_ns(9, 15, 1))
+
+        self.assertEqual(self.aggregator.flush(ist_ns(9, 17)), [])
+        self.assertEqual([c.interval for c in self.aggregator.flush(ist_ns(9, 18))], [3])
+        self.assertIsNone(self.aggregator.current(TOKEN, 3))
+        self.assertEqual([c.interval for c in self.closed], [3])
+
+    def test_received_ns_wins_over_now(self):
+        class Tick(dict):
+            received_ns = ist_ns(9, 20)
+
+        self.aggregator.update([Tick(instrument_token=TOKEN, last_price=100.0)], now_ns=ist_ns(9, 15))
+        self.assertTrue(self.aggregator.current(TOKEN, 5)["period_start"].startswith("2026-01-02 09:20"))
+
+
+if __name__ == "__main__":
+    unittest.main()
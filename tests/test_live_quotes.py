@@ -0,0 +1,123 @@
+# tests/test_live_quotes.py
+"""
+LiveQuoteTable: in-place tick updates, vector reads, the seqlock read retry
+and the old live_data dict shim.
+
+Overlapping writes are simulated by updating the table from inside the read
+function, so the retry paths run deterministically on one thread.
+"""
+import math
+import threading
+import unittest
+
+from live_quotes import SNAPSHOT_DTYPE, LiveQuoteTable
+
+TOKEN = 408065
+OTHER = 738561
+
+
+def quote(token, price, **fields):
+    return dict(instrument_token=token, last_price=price, **fields)
+
+
+class LiveQuoteTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = LiveQuoteTable(capacity=1)
+
+    def test_update_keeps_fields_a_tick_does_not_carry(self):
+        self.table.update([quote(TOKEN, 100.0, ohlc={"open": 99.0, "high": 101.0, "low": 98.0, "close": 97.0},
+                                 volume_traded=500)])
+        self.table.update([quote(TOKEN, 100.5)])
+
+        row = self.table[TOKEN]
+        self.assertEqual(row["last_price"], 100.5)
+        self.assertEqual(row["ohlc"], {"open": 99.0, "high": 101.0, "low": 98.0, "close": 97.0})
+        self.assertEqual(row["volume"], 500)
+        self.assertEqual(self.table[str(TOKEN)], row)
+
+    def test_grows_and_returns_slots(self):
+        slots = self.table.update([quote(TOKEN, 1.0), quote(OTHER, 2.0), quote(TOKEN, 3.0)])
+
+        self.assertEqual(slots, [0, 1, 0])
+        self.assertEqual(self.table.capacity, 2)
+        self.assertEqual(self.table.slots([OTHER, 1, TOKEN]).tolist(), [1, -1, 0])
+
+    def test_snapshot_and_last_prices(self):
+        self.table.update([quote(TOKEN, 1.0)])
+        self.table.update([quote(OTHER, 2.0)])
+
+        snapshot = self.table.snapshot([OTHER, 1, TOKEN])
+        self.assertEqual(snapshot.dtype, SNAPSHOT_DTYPE)
+        self.assertEqual(snapshot["instrument_token"].tolist(), [OTHER, 1, TOKEN])
+        self.assertEqual(snapshot["seq"].tolist(), [2, 0, 1])
+        self.assertTrue(math.isnan(snapshot["last_price"][1]))
+
+        prices = self.table.last_prices([TOKEN, 1])
+        self.assertEqual(prices[0], 1.0)
+        self.assertTrue(math.isnan(prices[1]))
+
+    def test_clear(self):
+        self.table.update([quote(TOKEN, 1.0)])
+        self.table.clear()
+
+        self.assertNotIn(TOKEN, self.table)
+        self.assertEqual(len(self.table), 0)
+        self.assertIsNone(self.table.get(TOKEN))
+
+
+class SeqlockReadTest(unittest.TestCase):
+    def setUp(self):
+        self.table = LiveQuoteTable()
+        self.table.update([quote(TOKEN, 1.0)])
+
+    def test_retries_a_read_that_overlapped_a_write(self):
+        calls = []
+
+        def read_price():
+            calls.append(self.table.columns["last_price"][0])
+            if len(calls) == 1:
+                self.table.update([quote(TOKEN, 2.0)])
+            return calls[-1]
+
+        self.assertEqual(self.table.read(read_price), 2.0)
+        self.assertEqual(calls, [1.0, 2.0])
+        self.assertEqual(self.table.read_retries, 1)
+
+    def test_retries_an_error_a_write_explains(self):
+        calls = []
+
+        def read_after_clear():
+            calls.append(None)
+            if len(calls) == 1:
+                self.table.clear()
+                raise IndexError("slot gone")
+            return len(self.table)
+
+        self.assertEqual(self.table.read(read_after_clear), 0)
+        self.assertEqual(self.table.read_retries, 1)
+
+    def test_reraises_an_error_no_write_explains(self):
+        def broken():
+            raise KeyError("bug")
+
+        with self.assertRaises(KeyError):
+            self.table.read(broken)
+        self.assertEqual(self.table.read_retries, 0)
+
+    def test_waits_while_a_write_is_in_progress(self):
+        self.table.version += 1  # writer in the middle of an update
+        calls = []
+
+        def finish_write():
+            self.table.version += 1
+
+        writer = threading.Timer(0.05, finish_write)
+        writer.start()
+        self.assertEqual(self.table.read(lambda: calls.append(self.table.version) or "read"), "read")
+        writer.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0] & 1, 0)
+
+if __name__ == "__main__":
+    unittest.main()
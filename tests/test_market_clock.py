@@ -0,0 +1,92 @@
+# tests/test_market_clock.py
+"""
+MarketClock timers on a private clock instance with millisecond due times:
+ordering, repeats, alignment, cancel / cancel_group and callback errors.
+"""
+import threading
+import time
+import unittest
+from datetime import datetime
+
+from logger_config import IST
+from market_clock import SECOND_NS, MarketClock, today_at
+
+WAIT = 5
+MS_NS = 10**6
+
+
+class MarketClockTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = MarketClock()
+        self.events = []
+        self.done = threading.Event()
+
+    def record(self, name):
+        self.events.append(name)
+
+    def finish(self):
+        self.done.set()
+
+    def test_one_shots_run_in_due_order(self):
+        now = time.time_ns()
+        self.clock.at(now + 60 * MS_NS, self.finish)
+        self.clock.at(now + 40 * MS_NS, self.record, "second")
+        self.clock.at(now + 20 * MS_NS, self.record, "first")
+        self.clock.at(now - SECOND_NS, self.record, "overdue")
+
+        self.assertTrue(self.done.wait(WAIT))
+        self.assertEqual(self.events, ["overdue", "first", "second"])
+        self.assertEqual(self.clock.pending(), [])
+
+    def test_every_repeats_until_cancelled(self):
+        def tick():
+            self.events.append(time.time_ns())
+            if len(self.events) == 3:
+                self.clock.cancel(timer)
+                self.clock.after(0.05, self.finish)
+
+        timer = self.clock.every(0.01, tick, name="tick")
+
+        self.assertTrue(self.done.wait(WAIT))
+        self.assertEqual(len(self.events), 3)
+        self.assertFalse(timer.active)
+
+    def test_every_aligned_falls_on_interval_multiples(self):
+        timer = self.clock.every(0.25, self.record, "aligned", align=True, group="test")
+
+        self.assertEqual(timer.due_ns % (SECOND_NS // 4), 0)
+        self.assertGreater(timer.due_ns, time.time_ns() - SECOND_NS // 4)
+        self.clock.cancel_group("test")
+
+    def test_cancel_group(self):
+        now = time.time_ns()
+        kept = self.clock.at(now + 50 * MS_NS, self.finish, name="kept")
+        self.clock.at(now + 10 * MS_NS, self.record, "cancelled", group="session")
+        self.clock.every(0.01, self.record, "cancelled", group="session")
+
+        self.assertEqual(self.clock.cancel_group("session"), 2)
+        self.assertEqual(self.clock.cancel_group("session"), 0)
+        self.assertEqual(self.clock.pending(), [kept])
+
+        self.assertTrue(self.done.wait(WAIT))
+        self.assertEqual(self.events, [])
+
+    def test_callback_error_does_not_stop_the_clock(self):
+        def broken():
+            raise RuntimeError("boom")
+
+        now = time.time_ns()
+        self.clock.at(now, broken)
+        self.clock.at(now + 10 * MS_NS, self.finish)
+        self.assertTrue(self.done.wait(WAIT))
+
+
+class TodayAtTest(unittest.TestCase):
+    def test_ist_wall_time(self):
+        due = datetime.fromtimestamp(today_at("15:10") / SECOND_NS, IST)
+        self.assertEqual((due.hour, due.minute, due.second), (15, 10, 0))
+        self.assertEqual(due.date(), datetime.now(IST).date())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+# tests/test_order_book.py
+"""
+OrderBook: net quantity from the filled-quantity deltas of order postbacks,
+replays and stale postbacks not counted twice, REST reconcile.
+"""
+import unittest
+
+from order_book import OrderBook
+
+SYMBOL = "SBIN"
+
+
+def postback(order_id, filled, status="OPEN", side="SELL", symbol=SYMBOL):
+    return {"order_id": order_id, "filled_quantity": filled, "status": status,
+            "transaction_type": side, "tradingsymbol": symbol}
+
+
+class FakeKite:
+    def __init__(self, positions, orders):
+        self._positions, self._orders = positions, orders
+
+    def positions(self):
+        return {"net": self._positions}
+
+    def orders(self):
+        return self._orders
+
+
+class OrderBookTest(unittest.TestCase):
+    def setUp(self):
+        self.book = OrderBook()
+
+    def test_applies_filled_deltas(self):
+        self.assertEqual(self.book.apply(postback("1", 0)), 0)
+        self.assertEqual(self.book.apply(postback("1", 40)), 40)
+        self.assertEqual(self.book.apply(postback("1", 100, "COMPLETE")), 60)
+
+        self.assertEqual(self.book.quantity(SYMBOL), -100)
+        self.assertEqual(self.book.open_orders(SYMBOL), [])
+
+    def test_replayed_and_stale_postbacks_count_once(self):
+        self.book.apply(postback("1", 40))
+        self.assertEqual(self.book.apply(postback("1", 40)), 0)   # same postback from another shard
+        self.book.apply(postback("1", 100, "COMPLETE"))
+        self.assertEqual(self.book.apply(postback("1", 40)), 0)   # arrives late
+
+        self.assertEqual(self.book.quantity(SYMBOL), -100)
+        self.assertEqual(self.book.orders["1"]["status"], "COMPLETE")
+
+    def test_orders_net_per_symbol(self):
+        self.book.apply(postback("1", 10, "COMPLETE", side="BUY"))
+        self.book.apply(postback("2", 4, side="SELL"))
+        self.book.apply(postback("3", 7, "COMPLETE", side="BUY", symbol="INFY"))
+
+        self.assertEqual(self.book.quantity(SYMBOL), 6)
+        self.assertEqual(self.book.quantity("INFY"), 7)
+        self.assertIsNone(self.book.quantity("TCS"))
+        self.assertEqual([o["order_id"] for o in self.book.open_orders()], ["2"])
+
+    def test_listeners_get_the_delta(self):
+        seen = []
+        self.book.add_listener(lambda order, delta: seen.append((order["order_id"], delta)))
+        self.book.apply(postback("1", 5))
+        self.book.apply(postback("1", 5))
+
+        self.assertEqual(seen, [("1", 5), ("1", 0)])
+
+    def test_reconcile_replaces_the_book(self):
+        self.book.apply(postback("1", 40))
+        kite = FakeKite([{"tradingsymbol": SYMBOL, "quantity": -100}],
+                        [postback("1", 100, "COMPLETE")])
+        self.book.reconcile(kite)
+
+        self.assertEqual(self.book.quantity(SYMBOL), -100)
+        self.assertIsNotNone(self.book.reconciled_at)
+        # The fill the snapshot already counted is not applied again
+        self.assertEqual(self.book.apply(postback("1", 100, "COMPLETE")), 0)
+        self.assertEqual(self.book.quantity(SYMBOL), -100)
+
+
+if __name__ == "__main__":
+    unittest.main()
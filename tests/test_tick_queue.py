@@ -0,0 +1,56 @@
+# tests/test_tick_queue.py
+"""
+ConflatingTickQueue: newest tick per token, bounded pending set and its counters.
+"""
+import threading
+import unittest
+
+from tick_queue import ConflatingTickQueue
+
+WAIT = 5
+
+
+def tick(token, price):
+    return {"instrument_token": token, "last_price": price}
+
+
+class ConflatingTickQueueTest(unittest.TestCase):
+    def test_keeps_newest_tick_per_token(self):
+        q = ConflatingTickQueue()
+        q.put([tick(1, 10.0), tick(2, 20.0)])
+        q.put([tick(1, 11.0), tick(1, 12.0)])
+
+        self.assertEqual(q.drain(), [tick(1, 12.0), tick(2, 20.0)])
+        self.assertEqual(q.stats(), {"pending": 0, "received": 4, "conflated": 2, "dropped": 0, "drained": 2})
+
+    def test_drops_new_tokens_when_full(self):
+        q = ConflatingTickQueue(max_tokens=2)
+        q.put([tick(1, 10.0), tick(2, 20.0), tick(3, 30.0)])
+        q.put([tick(2, 21.0)])  # pending tokens still conflate when full
+
+        self.assertEqual(q.stats()["dropped"], 1)
+        self.assertEqual(q.stats()["conflated"], 1)
+        self.assertEqual(q.drain(), [tick(1, 10.0), tick(2, 21.0)])
+
+        q.put([tick(3, 31.0)])
+        self.assertEqual(q.drain(), [tick(3, 31.0)])
+        self.assertEqual(q.stats(), {"pending": 0, "received": 5, "conflated": 1, "dropped": 1, "drained": 3})
+
+    def test_drain_times_out_empty(self):
+        q = ConflatingTickQueue()
+        self.assertEqual(q.drain(timeout=0.01), [])
+        self.assertEqual(q.stats()["drained"], 0)
+
+    def test_put_wakes_a_waiting_consumer(self):
+        q = ConflatingTickQueue()
+        drained = []
+        consumer = threading.Thread(target=lambda: drained.extend(q.drain(timeout=WAIT)))
+        consumer.start()
+
+        q.put([tick(1, 10.0)])
+        consumer.join(WAIT)
+        self.assertEqual(drained, [tick(1, 10.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+# tests/test_ticker_decode.py
+"""
+Ticker packet decoding.
+
+Frames are built by hand for every packet length (8, 28, 32, 44, 184) and
+for the segments with their own price divisor (cds, bcd) next to a plain NSE
+stock and an index. `_parse_binary` is checked against the wire values,
+the batch and lazy decoders are checked against `_parse_binary`, and the
+ltp / ohlc decode profiles against the full decode.
+"""
+import struct
+import unittest
+from datetime import datetime
+
+from ticker import TICK_DTYPES, KiteTicker, Tick
+
+NSE = 408065                 # segment 1 → paise
+INDEX = 256265               # segment 9 → not tradable
+CDS = (12345 << 8) | 3       # divisor 1e7
+BCD = (54321 << 8) | 6       # divisor 1e4
+
+DIVISORS = {NSE: 100.0, INDEX: 100.0, CDS: 10000000.0, BCD: 10000.0}
+TOKENS = (NSE, INDEX, CDS, BCD)
+LENGTHS = (8, 28, 32, 44, 184)
+EPOCH = 1767225600           # exchange / last trade timestamps in the packets
+
+
+def raw_values(length, token):
+    """Distinct non-zero wire values for every field of a packet of `length`."""
+    base = token % 1000 + 1
+    if length == 8:
+        return [token, base * 1000]
+    if length in (28, 32):
+        values = [token, base * 1000, base * 1100, base * 900, base * 950, base * 980, 7]
+        return values + [EPOCH] if length == 32 else values
+    values = [token, base * 1000, 25, base * 990, 123456, 5000, 6000, base * 950, base * 1100, base * 900, base * 980]
+    if length == 44:
+        return values
+    values += [EPOCH - 5, 700, 800, 600, EPOCH]
+    for level in range(10):
+        values += [10 + level, base * 1000 + level, level + 1]
+    return values
+
+
+def packet(length, token):
+    fmt = {8: ">2I", 28: ">7I", 32: ">8I", 44: ">11I", 184: ">16I" + "IIH2x" * 10}[length]
+    return struct.pack(fmt, *raw_values(length, token))
+
+
+def frame(packets):
+    return struct.pack(">H", len(packets)) + b"".join(struct.pack(">H", len(p)) + p for p in packets)
+
+
+def mixed_frame():
+    """Every length for every token, lengths interleaved so the decoders take their slow paths too."""
+    return frame([packet(length, token) for token in TOKENS for length in LENGTHS])
+
+
+def ticker(profile=KiteTicker.PROFILE_FULL, tick_format=KiteTicker.TICK_FORMAT_DICT):
+    return KiteTicker("api_key", "token", tick_format=tick_format, decode_profile=profile)
+
+
+class ParseBinaryTest(unittest.TestCase):
+    def test_fields_and_divisors(self):
+        ticks = ticker()._parse_binary(mixed_frame())
+        self.assertEqual(len(ticks), len(TOKENS) * len(LENGTHS))
+
+        for tick, (token, length) in zip(ticks, [(t, l) for t in TOKENS for l in LENGTHS]):
+            with self.subTest(token=token, length=length):
+                raw = raw_values(length, token)
+                divisor = DIVISORS[token]
+
+                self.assertEqual(tick["instrument_token"], token)
+                self.assertEqual(tick["tradable"], token != INDEX)
+                self.assertEqual(tick["last_price"], raw[1] / divisor)
+
+                if length == 8:
+                    self.assertEqual(tick["mode"], KiteTicker.MODE_LTP)
+                    self.assertNotIn("ohlc", tick)
+                    continue
+
+                if length in (28, 32):
+                    # Index packets: high, low, open, close
+                    expected = dict(zip(("high", "low", "open", "close"), raw[2:6]))
+                else:
+                    # Quote packets: open, high, low, close
+                    expected = dict(zip(("open", "high", "low", "close"), raw[7:11]))
+                    self.assertEqual(tick["volume_traded"], raw[4])
+                    self.assertEqual(tick["average_traded_price"], raw[3] / divisor)
+
+                self.assertEqual(tick["ohlc"], {k: v / divisor for k, v in expected.items()})
+                close = expected["close"] / divisor
+                self.assertAlmostEqual(tick["change"], (raw[1] / divisor - close) * 100 / close)
+                self.assertEqual(tick["mode"], KiteTicker.MODE_QUOTE if length in (28, 44) else KiteTicker.MODE_FULL)
+
+                if length in (32, 184):
+                    self.assertEqual(tick["exchange_timestamp"].timestamp(), EPOCH)
+
+                if length == 184:
+                    self.assertEqual(tick["oi"], 700)
+                    self.assertEqual(tick["last_trade_time"].timestamp(), EPOCH - 5)
+                    self.assertEqual(len(tick["depth"]["buy"]), 5)
+                    self.assertEqual(tick["depth"]["sell"][4],
+                                     {"quantity": 19, "price": raw[1 + 16 + 27] / divisor, "orders": 10})
+
+    def test_skips_unknown_lengths_and_heartbeats(self):
+        kws = ticker()
+        self.assertEqual(kws._parse_binary(b"\x00"), [])
+        ticks = kws._parse_binary(frame([b"\x00" * 12, packet(8, NSE)]))
+        self.assertEqual([t["instrument_token"] for t in ticks], [NSE])
+
+
+class ParseBinaryBatchTest(unittest.TestCase):
+    def assert_row_matches(self, row, expected):
+        """Compare one structured array row with the dict tick of the same packet."""
+        for name in row.dtype.names:
+            value, want = row[name], expected[name]
+            if name == "depth":
+                for side in ("buy", "sell"):
+                    self.assertEqual([dict(zip(level.dtype.names, level.tolist())) for level in value[side]], want[side])
+            elif name == "ohlc":
+                self.assertEqual(dict(zip(value.dtype.names, value.tolist())), want)
+            elif isinstance(want, datetime):
+                self.assertEqual(value, want.timestamp())
+            elif isinstance(want, float):
+                self.assertAlmostEqual(float(value), want)
+            else:
+                self.assertEqual(value, want)
+
+    def test_matches_parse_binary(self):
+        batch = ticker(tick_format=KiteTicker.TICK_FORMAT_ARRAY)._parse_binary_batch(mixed_frame())
+        self.assertEqual(sorted(batch), list(LENGTHS))
+
+        for length, rows in batch.items():
+            with self.subTest(length=length):
+                self.assertEqual(rows.dtype, TICK_DTYPES[length])
+                self.assertEqual(rows["instrument_token"].tolist(), list(TOKENS))
+                expected = ticker()._parse_binary(frame([packet(length, token) for token in TOKENS]))
+                for row, tick in zip(rows, expected):
+                    self.assert_row_matches(row, tick)
+
+class ParseBinaryLazyTest(unittest.TestCase):
+    def test_matches_parse_binary(self):
+        bin = mixed_frame()
+        ticks = ticker(tick_format=KiteTicker.TICK_FORMAT_LAZY)._parse_binary_lazy(bin, received_ns=42)
+
+        for tick, expected in zip(ticks, ticker()._parse_binary(bin)):
+            with self.subTest(token=tick.instrument_token, length=len(tick.packet)):
+                self.assertIsInstance(tick, Tick)
+                self.assertEqual(tick.received_ns, 42)
+                self.assertEqual(tick.to_dict(), expected)
+                self.assertEqual(list(tick), list(expected))
+
+    def test_covers(self):
+        ltp, quote, full = ticker()._parse_binary_lazy(frame([packet(8, NSE), packet(44, NSE), packet(184, NSE)]))
+        self.assertTrue(full.covers(quote))
+        self.assertTrue(quote.covers(ltp))
+        self.assertFalse(ltp.covers(quote))
+        self.assertFalse(quote.covers(full.to_dict()))
+
+
+class DecodeProfileTest(unittest.TestCase):
+    PROFILE_KEYS = {
+        KiteTicker.PROFILE_LTP: {"tradable", "mode", "instrument_token", "last_price"},
+        KiteTicker.PROFILE_OHLC: {"tradable", "mode", "instrument_token", "last_price", "ohlc", "change"},
+    }
+
+    def test_profiles_are_a_subset_of_full(self):
+        bin = mixed_frame()
+        full = ticker()._parse_binary(bin)
+
+        for profile, keys in self.PROFILE_KEYS.items():
+            ticks = ticker(profile)._parse_binary(bin)
+            lazy = ticker(profile)._parse_binary_lazy(bin)
+            self.assertEqual(len(ticks), len(full))
+
+            for tick, lazy_tick, expected in zip(ticks, lazy, full):
+                with self.subTest(profile=profile, token=tick["instrument_token"], mode=expected["mode"]):
+                    wanted = {key: value for key, value in expected.items() if key in keys}
+                    self.assertEqual(tick, wanted)
+                    self.assertEqual(lazy_tick.to_dict(), wanted)
+                    self.assertNotIn("volume_traded", lazy_tick)
+
+    def test_batch_profiles(self):
+        bin = mixed_frame()
+        full = ticker(tick_format=KiteTicker.TICK_FORMAT_ARRAY)._parse_binary_batch(bin)
+
+        ltp = ticker(KiteTicker.PROFILE_LTP)._parse_binary_batch(bin)
+        ohlc = ticker(KiteTicker.PROFILE_OHLC)._parse_binary_batch(bin)
+        for length in LENGTHS:
+            with self.subTest(length=length):
+                self.assertEqual(ltp[length].dtype, TICK_DTYPES[8])
+                self.assertEqual(ltp[length]["last_price"].tolist(), full[length]["last_price"].tolist())
+
+                self.assertEqual(ohlc[length].dtype, TICK_DTYPES[8 if length == 8 else 28])
+                if length > 8:
+                    self.assertEqual(ohlc[length]["ohlc"].tolist(), full[length]["ohlc"].tolist())
+                    self.assertEqual(ohlc[length]["change"].tolist(), full[length]["change"].tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
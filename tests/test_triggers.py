@@ -0,0 +1,95 @@
+# tests/test_triggers.py
+"""
+ThresholdIndex crossing against the live quote table, and index firing
+through a TriggerRegistry (callbacks run on its worker thread).
+"""
+import threading
+import unittest
+
+import numpy as np
+
+from live_quotes import LiveQuoteTable
+from triggers import BELOW, ThresholdIndex, TriggerRegistry
+
+A, B, C = 738561, 408065, 2953217  # unsorted on purpose, the index sorts by token
+WAIT = 5
+
+
+def ticks(*prices):
+    return [{"instrument_token": token, "last_price": price} for token, price in prices]
+
+
+class ThresholdIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.quotes = LiveQuoteTable()
+        self.index = ThresholdIndex([A, B, C], [100.0, 200.0, 300.0], callback=None)
+
+    def crossed(self, *prices, index=None):
+        # Slots as an array, like TriggerRegistry.evaluate hands them over
+        slots = np.asarray(self.quotes.update(ticks(*prices)), dtype="i8")
+        return (index or self.index).crossed(self.quotes, slots)
+
+    def test_reports_crossed_tokens_in_given_order(self):
+        self.assertEqual(self.crossed((C, 299.0), (B, 199.9)), [])
+        self.assertEqual(self.crossed((C, 300.0), (B, 250.0), (A, 99.0)), [(B, 250.0), (C, 300.0)])
+
+    def test_each_token_fires_once(self):
+        # Both ticks land in one slot → reported once, at the table's latest price
+        self.assertEqual(self.crossed((A, 101.0), (A, 102.0)), [(A, 102.0)])
+        self.assertEqual(self.crossed((A, 103.0)), [])
+        self.assertEqual(self.index.armed.tolist(), [True, False, True])  # sorted: B, A, C
+
+    def test_ignores_tokens_outside_the_index(self):
+        self.assertEqual(self.crossed((1, 1e9), (999999999, 1e9)), [])
+
+    def test_below(self):
+        index = ThresholdIndex([A, B], [100.0, 200.0], callback=None, direction=BELOW)
+        self.assertEqual(self.crossed((A, 100.5), (B, 200.0), index=index), [(B, 200.0)])
+
+    def test_exclusive_disarms_after_first_cross(self):
+        index = ThresholdIndex([A, B], [100.0, 200.0], callback=None, exclusive=True)
+        self.assertEqual(self.crossed((A, 100.0), index=index), [(A, 100.0)])
+
+        self.assertFalse(index.active)
+        self.assertEqual(self.crossed((B, 200.0), index=index), [])
+
+
+class RegistryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = TriggerRegistry()
+        self.quotes = LiveQuoteTable()
+        self.calls = []
+        self.fired = threading.Event()
+
+    def callback(self, crossed):
+        self.calls.append(crossed)
+        self.fired.set()
+
+    def evaluate(self, *prices):
+        batch = ticks(*prices)
+        self.registry.evaluate(batch, self.quotes, self.quotes.update(batch))
+
+    def test_exclusive_index_fires_once_and_is_removed(self):
+        self.registry.add_index(ThresholdIndex([A, B], [100.0, 200.0], self.callback, group="entry", exclusive=True))
+
+        self.evaluate((A, 100.0), (B, 200.0))
+        self.assertTrue(self.fired.wait(WAIT))
+        self.evaluate((A, 101.0), (B, 201.0))
+
+        self.fired.clear()
+        self.registry._queue.put((self.fired.set, None))  # runs after anything the second batch queued
+        self.assertTrue(self.fired.wait(WAIT))
+        self.assertEqual(self.calls, [[(A, 100.0), (B, 200.0)]])
+        self.assertEqual(len(self.registry), 0)
+
+    def test_cancel_group(self):
+        index = self.registry.add_index(ThresholdIndex([A], [100.0], self.callback, group="entry"))
+
+        self.assertEqual(self.registry.cancel_group("entry"), 1)
+        self.assertFalse(index.active)
+        self.evaluate((A, 150.0))
+        self.assertEqual(self.registry._queue.qsize(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
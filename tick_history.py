@@ -0,0 +1,151 @@
+# tick_history.py
+"""
+Recent tick history per token in fixed-size NumPy ring buffers.
+
+Every subscribed token keeps its last `capacity` ticks as (receive time in
+epoch ns, last price, volume traded). Appends write into preallocated
+arrays, so memory per token is capped at `capacity * 24` bytes (24 KB with
+the default 1024 ticks, about 15 minutes of a busy stock). Window
+queries (last N seconds, since T, OHLC of a period) are answered with
+`searchsorted` on the time column.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+HISTORY_CAPACITY = int(os.getenv("TICK_HISTORY_CAPACITY", "1024"))
+
+
+class TickRing:
+    """Ring buffer of one token. Timestamps must be appended in non-decreasing order."""
+
+    def __init__(self, capacity=HISTORY_CAPACITY):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype="i8")
+        self.price = np.full(capacity, np.nan)
+        self.volume = np.full(capacity, np.nan)
+        self.head = 0    # next write position
+        self.count = 0   # ticks ever appended
+
+    def append(self, ts_ns, price, volume=np.nan):
+        i = self.head
+        self.ts[i] = ts_ns
+        self.price[i] = price
+        self.volume[i] = volume
+        self.head = (i + 1) % self.capacity
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _segments(self):
+        """Stored positions as (older, newer) slices, each in time order."""
+        if self.count <= self.capacity:
+            return (slice(0, self.head),)
+        return slice(self.head, self.capacity), slice(0, self.head)
+
+    def window(self, start_ns, end_ns=None):
+        """`(ts, price, volume)` arrays of ticks with start_ns <= ts < end_ns (copies, time ordered)."""
+        parts = []
+        for seg in self._segments():
+            ts = self.ts[seg]
+            lo = np.searchsorted(ts, start_ns, side="left")
+            hi = len(ts) if end_ns is None else np.searchsorted(ts, end_ns, side="left")
+            if hi > lo:
+                base = seg.start
+                parts.append(slice(base + lo, base + hi))
+
+        if not parts:
+            empty = np.empty(0)
+            return np.empty(0, dtype="i8"), empty, empty
+        if len(parts) == 1:
+            p = parts[0]
+            return self.ts[p].copy(), self.price[p].copy(), self.volume[p].copy()
+        return tuple(np.concatenate([column[p] for p in parts]) for column in (self.ts, self.price, self.volume))
+
+
+class TickHistory:
+    """`TickRing` per token. Written by the tick dispatcher, read from any thread."""
+
+    def __init__(self, capacity=HISTORY_CAPACITY):
+        self.capacity = capacity
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # WRITES (tick dispatcher thread)
+    # ---------------------------------------------------------
+    def record(self, ticks, now_ns=None):
+        now_ns = now_ns or time.time_ns()
+
+        with self._lock:
+            rings = self._rings
+            for tick in ticks:
+                token = tick.get("instrument_token")
+                price = tick.get("last_price")
+                if not token or price is None:
+                    continue
+
+                ring = rings.get(token)
+                if ring is None:
+                    ring = rings[token] = TickRing(self.capacity)
+
+                ts = getattr(tick, "received_ns", None) or now_ns
+                volume = tick["volume_traded"] if "volume_traded" in tick else np.nan
+                ring.append(ts, price, volume)
+
+    def retain(self, tokens):
+        """Free the history of tokens not in `tokens` (e.g. after unsubscribing them)."""
+        keep = {int(t) for t in tokens}
+        with self._lock:
+            for token in [t for t in self._rings if t not in keep]:
+                del self._rings[token]
+
+    def clear(self):
+        with self._lock:
+            self._rings.clear()
+
+    # ---------------------------------------------------------
+    # WINDOW QUERIES
+    # ---------------------------------------------------------
+    def window(self, token, start_ns, end_ns=None):
+        """`(ts_ns, price, volume)` arrays of `token` with start_ns <= ts < end_ns."""
+        with self._lock:
+            ring = self._rings.get(int(token))
+            if ring is None:
+                empty = np.empty(0)
+                return np.empty(0, dtype="i8"), empty, empty
+            return ring.window(start_ns, end_ns)
+
+    def since(self, token, ts_ns):
+        return self.window(token, ts_ns)
+
+    def last_seconds(self, token, seconds, now_ns=None):
+        now_ns = now_ns or time.time_ns()
+        return self.window(token, now_ns - int(seconds * 1e9))
+
+    def ohlc(self, token, start_ns, end_ns):
+        """OHLC + tick count of the ticks in [start_ns, end_ns), None if there were none."""
+        _, prices, _ = self.window(token, start_ns, end_ns)
+        if not len(prices):
+            return None
+
+        return {
+            "open": float(prices[0]),
+            "high": float(prices.max()),
+            "low": float(prices.min()),
+            "close": float(prices[-1]),
+            "tick_count": len(prices),
+        }
+
+    def count(self, token, start_ns, end_ns=None):
+        ts, _, _ = self.window(token, start_ns, end_ns)
+        return len(ts)
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+tick_history = TickHistory()
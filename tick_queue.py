@@ -0,0 +1,71 @@
+# tick_queue.py
+"""
+Conflating handoff between the ticker thread and tick consumers.
+
+The ticker thread only stores the newest tick per token; a consumer drains
+whatever is pending at its own pace and always gets the latest price, never a
+backlog. Memory is bounded by `max_tokens` pending entries.
+"""
+import threading
+
+
+class ConflatingTickQueue:
+    """Latest pending tick per token. `put` never blocks on consumers."""
+
+    def __init__(self, max_tokens=5000):
+        self.max_tokens = max_tokens
+
+        self.received = 0     # ticks handed in by the ticker
+        self.conflated = 0    # older pending ticks replaced by a newer one of the same token
+        self.dropped = 0      # ticks refused because max_tokens were already pending
+        self.drained = 0      # ticks handed to consumers
+
+        self._pending = {}
+        self._cond = threading.Condition()
+
+    # ---------------------------------------------------------
+    # PRODUCER (ticker thread)
+    # ---------------------------------------------------------
+    def put(self, ticks):
+        with self._cond:
+            pending = self._pending
+            was_empty = not pending
+
+            for tick in ticks:
+                token = tick.get("instrument_token")
+                if token in pending:
+                    self.conflated += 1
+                elif len(pending) >= self.max_tokens:
+                    self.dropped += 1
+                    continue
+                pending[token] = tick
+
+            self.received += len(ticks)
+            if was_empty and pending:
+                self._cond.notify()
+
+    # ---------------------------------------------------------
+    # CONSUMER
+    # ---------------------------------------------------------
+    def drain(self, timeout=None):
+        """Pending ticks (one per token, newest) or [] on timeout."""
+        with self._cond:
+            if not self._pending and not self._cond.wait_for(lambda: self._pending, timeout):
+                return []
+
+            ticks = list(self._pending.values())
+            self._pending = {}
+            self.drained += len(ticks)
+            return ticks
+
+    def __len__(self):
+        return len(self._pending)
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "received": self.received,
+            "conflated": self.conflated,
+            "dropped": self.dropped,
+            "drained": self.drained,
+        }
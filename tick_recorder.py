@@ -0,0 +1,272 @@
+# tick_recorder.py
+"""
+Append-only capture of raw ticker frames.
+
+File layout (little-endian):
+    b"KTCAP001"                                  once, at the start of a new file
+    <q monotonic_ns><I length><payload>          one record per binary frame
+    <q monotonic_ns><I 0xFFFFFFFF><q wall_ns>    clock anchor, written every time the file is opened
+
+The monotonic receive time of every frame can be mapped to wall clock time
+through the last anchor before it (a process restart writes a new anchor).
+"""
+import collections
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+from logger_config import IST, setup_logger
+
+logger = setup_logger("Tick_Recorder")
+
+# Raw frame capture for offline replay, off unless TICK_CAPTURE=1. Costs about 50 bytes of disk
+# per tick (a few hundred quote mode tokens → a few hundred MB per trading day), and
+# TICK_CAPTURE_KEEP_DAYS daily files are kept.
+CAPTURE_ENABLED = os.getenv("TICK_CAPTURE", "0") == "1"
+CAPTURE_DIR = os.getenv("TICK_CAPTURE_DIR", "captures")
+CAPTURE_KEEP_DAYS = int(os.getenv("TICK_CAPTURE_KEEP_DAYS", "30"))
+MAX_PENDING_FRAMES = int(os.getenv("TICK_CAPTURE_MAX_PENDING", "100000"))  # frames waiting for the writer
+
+FILE_MAGIC = b"KTCAP001"
+RECORD_HEADER = struct.Struct("<qI")
+ANCHOR_MARKER = 0xFFFFFFFF
+ANCHOR_BODY = struct.Struct("<q")
+
+CapturedFrame = collections.namedtuple("CapturedFrame", ["monotonic_ns", "wall_ns", "payload"])
+
+
+def capture_path(day, directory=CAPTURE_DIR):
+    """Capture file of a trading day (`datetime.date`)."""
+    return os.path.join(directory, f"ticks-{day.strftime('%Y-%m-%d')}.bin")
+
+
+class TickRecorder:
+    """
+    Records every raw binary frame with its monotonic receive time.
+
+    `record` is called on the ticker thread and only appends to a deque. A
+    background thread drains it through a buffered file every `flush_interval`
+    seconds and rolls over to a new file when the IST date changes, keeping the
+    newest `backup_count` files.
+
+    At most `max_pending` frames wait for the writer; beyond that (slow disk)
+    frames are dropped and counted. If the writer dies, capture stops until the
+    next `start()`.
+    """
+
+    def __init__(self, directory=CAPTURE_DIR, backup_count=CAPTURE_KEEP_DAYS, flush_interval=0.25, buffer_size=1024 * 1024,
+                 max_pending=MAX_PENDING_FRAMES):
+        self.directory = directory
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.max_pending = max_pending
+
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.frames_dropped = 0
+        self.failed = False
+        self._dropped_logged = 0
+
+        self._pending = collections.deque()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._day = None
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # HOT PATH (ticker thread)
+    # ---------------------------------------------------------
+    def record(self, payload):
+        pending = self._pending
+        if self.failed or len(pending) >= self.max_pending:
+            self.frames_dropped += 1
+            return
+        pending.append((time.monotonic_ns(), payload))
+
+    # ---------------------------------------------------------
+    # LIFECYCLE
+    # ---------------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+
+            self._stop.clear()
+            self.failed = False
+            self._thread = threading.Thread(target=self._run, name="tick-recorder", daemon=True)
+            self._thread.start()
+            logger.info("🎙 Tick recorder started → %s", self.directory)
+
+    def stop(self):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+
+        if not thread:
+            return
+
+        self._stop.set()
+        thread.join()
+        logger.info("🛑 Tick recorder stopped | frames=%s bytes=%s dropped=%s",
+                    self.frames_written, self.bytes_written, self.frames_dropped)
+
+    # ---------------------------------------------------------
+    # WRITER (background thread)
+    # ---------------------------------------------------------
+    def _run(self):
+        try:
+            while not self._stop.wait(self.flush_interval):
+                self._drain()
+            self._drain()
+        except Exception:
+            # Nothing drains the queue any more → stop buffering frames in memory
+            self.failed = True
+            self._pending.clear()
+            logger.exception("❌ Tick recorder crashed, capture disabled until restart")
+        finally:
+            self._close_file()
+
+    def _drain(self):
+        if self.frames_dropped != self._dropped_logged:
+            logger.warning("⚠️ Tick capture behind, %s frames dropped so far", self.frames_dropped)
+            self._dropped_logged = self.frames_dropped
+
+        if not self._pending:
+            return
+
+        self._roll_if_needed()
+
+        pending = self._pending
+        write = self._file.write
+        count = 0
+        size = 0
+
+        while pending:
+            received_ns, payload = pending.popleft()
+            write(RECORD_HEADER.pack(received_ns, len(payload)))
+            write(payload)
+            count += 1
+            size += RECORD_HEADER.size + len(payload)
+
+        self._file.flush()
+        self.frames_written += count
+        self.bytes_written += size
+
+    def _roll_if_needed(self):
+        today = datetime.now(IST).date()
+        if self._file and today == self._day:
+            return
+
+        self._close_file()
+        os.makedirs(self.directory, exist_ok=True)
+
+        path = capture_path(today, self.directory)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+
+        self._file = open(path, "ab", buffering=self.buffer_size)
+        self._day = today
+
+        if is_new:
+            self._file.write(FILE_MAGIC)
+
+        self._file.write(RECORD_HEADER.pack(time.monotonic_ns(), ANCHOR_MARKER))
+        self._file.write(ANCHOR_BODY.pack(time.time_ns()))
+
+        logger.info("📼 Capturing ticks → %s", path)
+        self._prune()
+
+    def _close_file(self):
+        if self._file:
+            try:
+                self._file.close()
+            except Exception:
+                logger.exception("Tick capture close error")
+        self._file = None
+        self._day = None
+
+    def _prune(self):
+        if not self.backup_count:
+            return
+
+        files = sorted(
+            f for f in os.listdir(self.directory)
+            if f.startswith("ticks-") and f.endswith(".bin")
+        )
+        for name in files[:-self.backup_count]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                logger.exception("Could not prune %s", name)
+
+
+class TickCaptureReader:
+    """
+    Iterates a capture file from an `mmap` without copying payloads.
+
+    Every item is a `CapturedFrame` whose `payload` is a memoryview into the
+    map. Views must be released (or dropped) before `close()`. A truncated last
+    record (file still being written) is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        if self._map is not None and self._map[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise ValueError(f"Not a tick capture file: {path}")
+
+    def __iter__(self):
+        if self._map is None:
+            return
+
+        view = memoryview(self._map)
+        size = len(view)
+        offset = len(FILE_MAGIC)
+        anchor_mono, anchor_wall = None, None
+
+        try:
+            while offset + RECORD_HEADER.size <= size:
+                received_ns, length = RECORD_HEADER.unpack_from(view, offset)
+                offset += RECORD_HEADER.size
+
+                if length == ANCHOR_MARKER:
+                    if offset + ANCHOR_BODY.size > size:
+                        break
+                    anchor_mono, anchor_wall = received_ns, ANCHOR_BODY.unpack_from(view, offset)[0]
+                    offset += ANCHOR_BODY.size
+                    continue
+
+                if offset + length > size:
+                    break
+
+                wall_ns = anchor_wall + (received_ns - anchor_mono) if anchor_mono is not None else None
+                yield CapturedFrame(received_ns, wall_ns, view[offset:offset + length])
+                offset += length
+        finally:
+            view.release()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+tick_recorder = TickRecorder() if CAPTURE_ENABLED else None
@@ -0,0 +1,184 @@
+# tick_replay.py
+"""
+Offline replay of captured ticker frames (see tick_recorder).
+
+`TickReplay` is the cursor over one capture file, `ReplayTicker` is a
+drop-in for `KiteTicker` that feeds frames from it through the normal
+parse path into the same callbacks. A new `ReplayTicker` (every engine
+phase builds one) continues from where the previous one stopped.
+"""
+import os
+import threading
+import time
+
+from logger_config import setup_logger
+from ticker import KiteTicker
+from tick_recorder import TickCaptureReader
+
+logger = setup_logger("Tick_Replay")
+
+REPLAY_FILE = os.getenv("TICK_REPLAY_FILE")
+REPLAY_SPEED = os.getenv("TICK_REPLAY_SPEED", "1")
+
+# Speed value meaning "as fast as possible"
+SPEED_MAX = 0
+
+
+def parse_speed(value):
+    """`"10"` → 10.0, `"max"` / `"0"` → SPEED_MAX."""
+    if str(value).lower() in ("max", "0", ""):
+        return SPEED_MAX
+    return float(value)
+
+
+class TickReplay:
+    """Shared cursor over a capture file, with the replay speed (1 = real time, SPEED_MAX = no waits)."""
+
+    def __init__(self, path, speed=1.0, max_gap=5.0):
+        self.path = path
+        self.speed = speed
+        # Longest real wait between two frames, idle stretches (lunch, restarts) are compressed to this.
+        self.max_gap = max_gap
+
+        self.frames_replayed = 0
+        self.finished = False
+
+        self._reader = TickCaptureReader(path)
+        self._frames = iter(self._reader)
+        self._lock = threading.Lock()
+
+    def next_frame(self):
+        """
+        Next `(timestamp_ns, wall_ns, payload bytes)` or None when the capture is exhausted.
+        `wall_ns` is the captured epoch receive time (None for files without a clock anchor).
+        """
+        with self._lock:
+            if self.finished:
+                return None
+
+            try:
+                frame = next(self._frames)
+            except StopIteration:
+                self.finished = True
+                logger.info("🏁 Replay finished | frames=%s", self.frames_replayed)
+                return None
+
+            self.frames_replayed += 1
+            ts = frame.wall_ns if frame.wall_ns is not None else frame.monotonic_ns
+            return ts, frame.wall_ns, bytes(frame.payload)
+
+    def close(self):
+        with self._lock:
+            self.finished = True
+            self._frames.close()
+            self._reader.close()
+
+
+class ReplayTicker(KiteTicker):
+    """
+    `KiteTicker` fed from a `TickReplay` instead of a websocket.
+
+    `connect` fires `on_connect` straight away and starts streaming once the
+    first `subscribe` arrives, like the live feed which sends nothing before it.
+    `on_close` fires when the capture is exhausted or `close()` is called.
+    """
+
+    def __init__(self, replay, tick_format=KiteTicker.TICK_FORMAT_DICT, decode_profile=KiteTicker.PROFILE_FULL):
+        super(ReplayTicker, self).__init__("replay", "replay", tick_format=tick_format,
+                                           decode_profile=decode_profile, reconnect=False)
+        self.replay = replay
+        self.factory = None
+
+        self._connected = False
+        self._stop = threading.Event()
+        self._subscribed = threading.Event()
+        self.websocket_thread = None
+
+    def connect(self, threaded=False, disable_ssl_verification=False, proxy=None):
+        self._stop.clear()
+
+        if threaded:
+            self.websocket_thread = threading.Thread(target=self._run, name="tick-replay", daemon=True)
+            self.websocket_thread.start()
+        else:
+            self._run()
+
+    def is_connected(self):
+        return self._connected
+
+    def _close(self, code=None, reason=None):
+        self._stop.set()
+
+    def stop(self):
+        self._stop.set()
+
+    def stop_retry(self):
+        pass
+
+    def subscribe(self, instrument_tokens):
+        for token in instrument_tokens:
+            self.subscribed_tokens[token] = self.MODE_QUOTE
+        self._subscribed.set()
+        return True
+
+    def unsubscribe(self, instrument_tokens):
+        for token in instrument_tokens:
+            self.subscribed_tokens.pop(token, None)
+        return True
+
+    def set_mode(self, mode, instrument_tokens):
+        for token in instrument_tokens:
+            self.subscribed_tokens[token] = mode
+        return True
+
+    def _run(self):
+        self._connected = True
+        self._on_connect(self, {"replay": self.replay.path, "speed": self.replay.speed})
+
+        # Nothing streams before the first subscription
+        while not self._subscribed.wait(0.1):
+            if self._stop.is_set():
+                return self._finish("Replay stopped")
+
+        speed = self.replay.speed
+        base_clock = base_ts = None
+
+        while not self._stop.is_set():
+            frame = self.replay.next_frame()
+            if frame is None:
+                return self._finish("Replay finished")
+
+            ts, wall_ns, payload = frame
+
+            if speed != SPEED_MAX:
+                if base_ts is None:
+                    base_clock, base_ts = time.monotonic(), ts
+
+                delay = base_clock + (ts - base_ts) / 1e9 / speed - time.monotonic()
+                if delay > self.replay.max_gap:
+                    base_clock -= delay - self.replay.max_gap
+                    delay = self.replay.max_gap
+
+                if delay > 0 and self._stop.wait(delay):
+                    break
+
+            try:
+                # Ticks carry the captured receive time, so candles / history follow the capture
+                self._on_message(self, payload, True, received_ns=wall_ns)
+            except Exception:
+                logger.exception("❌ Replay tick callback error")
+
+        self._finish("Replay stopped")
+
+    def _finish(self, reason):
+        self._connected = False
+        self._on_close(self, 1000, reason)
+
+
+def replay_from_env():
+    """`TickReplay` configured by TICK_REPLAY_FILE / TICK_REPLAY_SPEED, or None for the live feed."""
+    if not REPLAY_FILE:
+        return None
+
+    logger.info("📼 Replay mode → %s @ %sx", REPLAY_FILE, REPLAY_SPEED)
+    return TickReplay(REPLAY_FILE, speed=parse_speed(REPLAY_SPEED))
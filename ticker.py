@@ -14,6 +14,8 @@ import json
 import struct
 import logging
 import threading
+import numpy as np
+from collections.abc import Mapping
 from datetime import datetime
 from twisted.internet import reactor, ssl
 from twisted.python import log as twisted_log
@@ -21,7 +23,7 @@ from twisted.internet.protocol import ReconnectingClientFactory
 from autobahn.twisted.websocket import WebSocketClientProtocol, \
     WebSocketClientFactory, connectWS
 
-from .__version__ import __version__, __title__
+from kiteconnect.__version__ import __version__, __title__
 
 log = logging.getLogger(__name__)
 
@@ -204,6 +206,197 @@ class KiteTickerClientFactory(WebSocketClientFactory, ReconnectingClientFactory)
                 self.on_noreconnect()
 
 
+"""
+Precompiled packet layouts, keyed by packet length.
+
+Every layout unpacks a whole packet with a single `unpack_from` call at an
+offset into the frame, so no per-packet or per-field slices are made.
+"""
+_PACKET_HEADER = struct.Struct(">H")
+
+_PACKET_STRUCTS = {
+    # instrument_token, last_price
+    8: struct.Struct(">2I"),
+    # + high, low, open, close, price change
+    28: struct.Struct(">7I"),
+    # + exchange timestamp
+    32: struct.Struct(">8I"),
+    # instrument_token, last_price, last_traded_quantity, average_traded_price, volume_traded,
+    # total_buy_quantity, total_sell_quantity, open, high, low, close
+    44: struct.Struct(">11I"),
+    # + last_trade_time, oi, oi_day_high, oi_day_low, exchange_timestamp, 10 x (quantity, price, orders, padding)
+    184: struct.Struct(">16I" + "IIH2x" * 10),
+}
+
+# Decode profiles, fields outside the profile are skipped with pad bytes and never unpacked.
+_LTP_PACKET_STRUCT = struct.Struct(">2I")
+_INDEX_OHLC_PACKET_STRUCT = struct.Struct(">6I")  # instrument_token, last_price, high, low, open, close
+_QUOTE_OHLC_PACKET_STRUCT = struct.Struct(">2I20x4I")  # instrument_token, last_price, open, high, low, close
+
+_PROFILE_PACKET_STRUCTS = {
+    "ltp": {length: _LTP_PACKET_STRUCT for length in _PACKET_STRUCTS},
+    "ohlc": {
+        8: _LTP_PACKET_STRUCT,
+        28: _INDEX_OHLC_PACKET_STRUCT,
+        32: _INDEX_OHLC_PACKET_STRUCT,
+        44: _QUOTE_OHLC_PACKET_STRUCT,
+        184: _QUOTE_OHLC_PACKET_STRUCT,
+    },
+    "full": _PACKET_STRUCTS,
+}
+
+# Streaming mode of a packet by its length.
+_PACKET_MODES = {
+    8: "ltp",
+    28: "quote",
+    32: "full",
+    44: "quote",
+    184: "full",
+}
+
+# Price divisors by segment, every other segment uses 100.
+_SEGMENT_DIVISORS = {
+    3: 10000000.0,  # cds
+    6: 10000.0,  # bcd
+}
+
+"""
+Structured dtypes used by the batch decoder.
+
+Raw layouts mirror the wire format (big-endian) including the 2 byte
+length prefix of every packet, so a run of equal sized packets can be
+viewed straight out of the frame with a single `np.frombuffer` call.
+"""
+_PACKET_LENGTH_FIELD = [("packet_length", ">u2")]
+
+_RAW_LTP_FIELDS = [
+    ("instrument_token", ">u4"),
+    ("last_price", ">u4"),
+]
+
+_RAW_INDEX_QUOTE_FIELDS = _RAW_LTP_FIELDS + [
+    ("high", ">u4"),
+    ("low", ">u4"),
+    ("open", ">u4"),
+    ("close", ">u4"),
+    ("price_change", ">u4"),
+]
+
+_RAW_QUOTE_FIELDS = _RAW_LTP_FIELDS + [
+    ("last_traded_quantity", ">u4"),
+    ("average_traded_price", ">u4"),
+    ("volume_traded", ">u4"),
+    ("total_buy_quantity", ">u4"),
+    ("total_sell_quantity", ">u4"),
+    ("open", ">u4"),
+    ("high", ">u4"),
+    ("low", ">u4"),
+    ("close", ">u4"),
+]
+
+_RAW_DEPTH_ENTRY = np.dtype([
+    ("quantity", ">u4"),
+    ("price", ">u4"),
+    ("orders", ">u2"),
+    ("padding", ">u2"),
+])
+
+_RAW_PACKET_DTYPES = {
+    8: np.dtype(_PACKET_LENGTH_FIELD + _RAW_LTP_FIELDS),
+    28: np.dtype(_PACKET_LENGTH_FIELD + _RAW_INDEX_QUOTE_FIELDS),
+    32: np.dtype(_PACKET_LENGTH_FIELD + _RAW_INDEX_QUOTE_FIELDS + [("exchange_timestamp", ">u4")]),
+    44: np.dtype(_PACKET_LENGTH_FIELD + _RAW_QUOTE_FIELDS),
+    184: np.dtype(_PACKET_LENGTH_FIELD + _RAW_QUOTE_FIELDS + [
+        ("last_trade_time", ">u4"),
+        ("oi", ">u4"),
+        ("oi_day_high", ">u4"),
+        ("oi_day_low", ">u4"),
+        ("exchange_timestamp", ">u4"),
+        ("depth", _RAW_DEPTH_ENTRY, (10,)),
+    ]),
+}
+
+_OHLC_DTYPE = np.dtype([
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+])
+
+_DEPTH_ENTRY_DTYPE = np.dtype([
+    ("quantity", "u4"),
+    ("price", "f8"),
+    ("orders", "u2"),
+])
+
+_LTP_TICK_FIELDS = [
+    ("instrument_token", "u4"),
+    ("tradable", "?"),
+    ("last_price", "f8"),
+]
+
+_INDEX_QUOTE_TICK_FIELDS = _LTP_TICK_FIELDS + [
+    ("ohlc", _OHLC_DTYPE),
+    ("change", "f8"),
+]
+
+_QUOTE_TICK_FIELDS = _INDEX_QUOTE_TICK_FIELDS + [
+    ("last_traded_quantity", "u4"),
+    ("average_traded_price", "f8"),
+    ("volume_traded", "u4"),
+    ("total_buy_quantity", "u4"),
+    ("total_sell_quantity", "u4"),
+]
+
+# Decoded tick dtypes keyed by packet length. Timestamps are epoch seconds.
+TICK_DTYPES = {
+    8: np.dtype(_LTP_TICK_FIELDS),
+    28: np.dtype(_INDEX_QUOTE_TICK_FIELDS),
+    32: np.dtype(_INDEX_QUOTE_TICK_FIELDS + [("exchange_timestamp", "i8")]),
+    44: np.dtype(_QUOTE_TICK_FIELDS),
+    184: np.dtype(_QUOTE_TICK_FIELDS + [
+        ("last_trade_time", "i8"),
+        ("oi", "u4"),
+        ("oi_day_high", "u4"),
+        ("oi_day_low", "u4"),
+        ("exchange_timestamp", "i8"),
+        ("depth", [("buy", _DEPTH_ENTRY_DTYPE, (5,)), ("sell", _DEPTH_ENTRY_DTYPE, (5,))]),
+    ]),
+}
+
+
+def _profile_raw_dtype(length, names):
+    """Raw packet dtype which only exposes `names`, the other fields are skipped over by offset."""
+    full = _RAW_PACKET_DTYPES[length]
+    return np.dtype({
+        "names": names,
+        "formats": [full.fields[name][0] for name in names],
+        "offsets": [full.fields[name][1] for name in names],
+        "itemsize": full.itemsize,
+    })
+
+
+_LTP_RAW_NAMES = ["packet_length", "instrument_token", "last_price"]
+_OHLC_RAW_NAMES = _LTP_RAW_NAMES + ["open", "high", "low", "close"]
+
+# (raw dtype, decoded dtype) by decode profile and packet length.
+_PROFILE_BATCH_DTYPES = {
+    "ltp": {
+        length: (_profile_raw_dtype(length, _LTP_RAW_NAMES), TICK_DTYPES[8])
+        for length in _RAW_PACKET_DTYPES
+    },
+    "ohlc": {
+        length: (_profile_raw_dtype(length, _OHLC_RAW_NAMES if length > 8 else _LTP_RAW_NAMES),
+                 TICK_DTYPES[28] if length > 8 else TICK_DTYPES[8])
+        for length in _RAW_PACKET_DTYPES
+    },
+    "full": {
+        length: (_RAW_PACKET_DTYPES[length], TICK_DTYPES[length])
+        for length in _RAW_PACKET_DTYPES
+    },
+}
+
+
 class KiteTicker(object):
     """
     The WebSocket client for connecting to Kite Connect's streaming quotes service.
@@ -340,6 +533,38 @@ class KiteTicker(object):
         ...,
         ...]
 
+    Lazy ticks
+    ----------
+
+    With `tick_format=KiteTicker.TICK_FORMAT_LAZY` every tick is a `Tick` which only keeps the raw packet bytes and
+    decodes a field the first time it is read. `Tick` is a read-only mapping with the same keys as the dict above, so
+    `tick["last_price"]`, `tick.get("ohlc", {})` and `"depth" in tick` keep working. Use `tick.to_dict()` for a plain dict.
+
+    Batch decoding
+    --------------
+
+    Pass `tick_format=KiteTicker.TICK_FORMAT_ARRAY` while initialising `KiteTicker` to receive ticks as NumPy
+    structured arrays instead of a list of dicts. Packets of a frame are grouped by packet length and every group is
+    decoded with a single `np.frombuffer` call, so `on_ticks` gets a dict keyed by packet length (8, 28, 32, 44, 184)
+    where each value is an array of `TICK_DTYPES[length]`.
+
+        #!python
+        def on_ticks(ws, batch):
+            quotes = batch.get(44)
+            if quotes is not None:
+                tokens, prices = quotes["instrument_token"], quotes["last_price"]
+                opens = quotes["ohlc"]["open"]
+
+    Field names follow the dict structure above. `exchange_timestamp` and `last_trade_time` are epoch seconds.
+
+    Decode profiles
+    ---------------
+
+    `decode_profile` limits which fields are decoded, whatever the subscription mode is. `PROFILE_LTP` only decodes
+    `last_price`, `PROFILE_OHLC` adds `ohlc` and `change`, and `PROFILE_FULL` (default) decodes every field of the packet.
+    Skipped fields are not unpacked at all and are absent from the tick (for every `tick_format`). The profile can be
+    changed at any time by setting `decode_profile`, it is read for every message.
+
     Auto reconnection
     -----------------
 
@@ -389,6 +614,16 @@ class KiteTicker(object):
     MODE_QUOTE = "quote"
     MODE_LTP = "ltp"
 
+    # Formats in which ticks can be delivered to `on_ticks`.
+    TICK_FORMAT_DICT = "dict"
+    TICK_FORMAT_ARRAY = "array"
+    TICK_FORMAT_LAZY = "lazy"
+
+    # Decode profiles, fields decoded from every packet.
+    PROFILE_LTP = "ltp"
+    PROFILE_OHLC = "ohlc"
+    PROFILE_FULL = "full"
+
     # Flag to set if its first connect
     _is_first_connect = True
 
@@ -405,7 +640,8 @@ class KiteTicker(object):
 
     def __init__(self, api_key, access_token, debug=False, root=None,
                  reconnect=True, reconnect_max_tries=RECONNECT_MAX_TRIES, reconnect_max_delay=RECONNECT_MAX_DELAY,
-                 connect_timeout=CONNECT_TIMEOUT):
+                 connect_timeout=CONNECT_TIMEOUT, tick_format=TICK_FORMAT_DICT, decode_profile=PROFILE_FULL,
+                 recorder=None):
         """
         Initialise websocket client instance.
 
@@ -422,6 +658,13 @@ class KiteTicker(object):
         - `reconnect_max_delay` in seconds is the maximum delay after which subsequent reconnection interval will become constant. Defaults to 60s and minimum acceptable value is 5s.
         - `reconnect_max_tries` is maximum number reconnection attempts. Defaults to 50 attempts and maximum up to 300 attempts.
         - `connect_timeout` in seconds is the maximum interval after which connection is considered as timeout. Defaults to 30s.
+        - `tick_format` is the shape of ticks passed to `on_ticks`. `TICK_FORMAT_DICT` (default) gives a list of dicts,
+            `TICK_FORMAT_ARRAY` gives NumPy structured arrays grouped by packet length and `TICK_FORMAT_LAZY` gives a
+            list of `Tick` objects which decode fields on first access.
+        - `decode_profile` is the set of fields decoded from every packet, one of `PROFILE_LTP`, `PROFILE_OHLC` or
+            `PROFILE_FULL` (default).
+        - `recorder` is an optional object with a `record(payload)` method (see `tick_recorder.TickRecorder`) which
+            receives every raw binary frame before it is parsed.
         """
         self.root = root or self.ROOT_URI
 
@@ -442,6 +685,15 @@ class KiteTicker(object):
             self.reconnect_max_delay = reconnect_max_delay
 
         self.connect_timeout = connect_timeout
+        self.tick_format = tick_format
+
+        if decode_profile not in _PROFILE_PACKET_STRUCTS:
+            raise ValueError("Invalid decode_profile: {}".format(decode_profile))
+        self.decode_profile = decode_profile
+
+        # Raw frame capture
+        self.recorder = recorder
+        self.last_received_ns = None
 
         self.socket_url = "{root}?api_key={api_key}"\
             "&access_token={access_token}".format(
@@ -673,14 +925,25 @@ class KiteTicker(object):
         if self.on_error:
             self.on_error(self, code, reason)
 
-    def _on_message(self, ws, payload, is_binary):
+    def _on_message(self, ws, payload, is_binary, received_ns=None):
         """Call `on_message` callback when text message is received."""
+        # Wall clock receive time (or the captured one on replay), carried by lazy ticks
+        self.last_received_ns = received_ns or time.time_ns()
+
+        if is_binary and self.recorder is not None:
+            self.recorder.record(payload)
+
         if self.on_message:
             self.on_message(self, payload, is_binary)
 
         # If the message is binary, parse it and send it to the callback.
         if self.on_ticks and is_binary and len(payload) > 4:
-            self.on_ticks(self, self._parse_binary(payload))
+            if self.tick_format == self.TICK_FORMAT_ARRAY:
+                self.on_ticks(self, self._parse_binary_batch(payload))
+            elif self.tick_format == self.TICK_FORMAT_LAZY:
+                self.on_ticks(self, self._parse_binary_lazy(payload, self.last_received_ns))
+            else:
+                self.on_ticks(self, self._parse_binary(payload))
 
         # Parse text messages
         if not is_binary:
@@ -726,46 +989,49 @@ class KiteTicker(object):
 
     def _parse_binary(self, bin):
         """Parse binary data to a (list of) ticks structure."""
-        packets = self._split_packets(bin)  # split data to individual ticks packet
         data = []
+        profile = self.decode_profile
+        layouts = _PROFILE_PACKET_STRUCTS[profile]
+
+        for offset, packet_length in self._packet_offsets(bin):
+            layout = layouts.get(packet_length)
+            if layout is None:
+                continue
 
-        for packet in packets:
-            instrument_token = self._unpack_int(packet, 0, 4)
+            # Unpack every field of the packet in one call straight from the frame
+            values = layout.unpack_from(bin, offset)
+
+            instrument_token = values[0]
             segment = instrument_token & 0xff  # Retrive segment constant from instrument_token
 
             # Add price divisor based on segment
-            if segment == self.EXCHANGE_MAP["cds"]:
-                divisor = 10000000.0
-            elif segment == self.EXCHANGE_MAP["bcd"]:
-                divisor = 10000.0
-            else:
-                divisor = 100.0
+            divisor = _SEGMENT_DIVISORS.get(segment, 100.0)
 
             # All indices are not tradable
             tradable = False if segment == self.EXCHANGE_MAP["indices"] else True
 
-            # LTP packets
-            if len(packet) == 8:
+            # LTP packets (or only LTP asked for)
+            if packet_length == 8 or profile == self.PROFILE_LTP:
                 data.append({
                     "tradable": tradable,
-                    "mode": self.MODE_LTP,
+                    "mode": _PACKET_MODES[packet_length],
                     "instrument_token": instrument_token,
-                    "last_price": self._unpack_int(packet, 4, 8) / divisor
+                    "last_price": values[1] / divisor
                 })
             # Indices quote and full mode
-            elif len(packet) == 28 or len(packet) == 32:
-                mode = self.MODE_QUOTE if len(packet) == 28 else self.MODE_FULL
+            elif packet_length == 28 or packet_length == 32:
+                mode = self.MODE_QUOTE if packet_length == 28 else self.MODE_FULL
 
                 d = {
                     "tradable": tradable,
                     "mode": mode,
                     "instrument_token": instrument_token,
-                    "last_price": self._unpack_int(packet, 4, 8) / divisor,
+                    "last_price": values[1] / divisor,
                     "ohlc": {
-                        "high": self._unpack_int(packet, 8, 12) / divisor,
-                        "low": self._unpack_int(packet, 12, 16) / divisor,
-                        "open": self._unpack_int(packet, 16, 20) / divisor,
-                        "close": self._unpack_int(packet, 20, 24) / divisor
+                        "high": values[2] / divisor,
+                        "low": values[3] / divisor,
+                        "open": values[4] / divisor,
+                        "close": values[5] / divisor
                     }
                 }
 
@@ -775,34 +1041,55 @@ class KiteTicker(object):
                     d["change"] = (d["last_price"] - d["ohlc"]["close"]) * 100 / d["ohlc"]["close"]
 
                 # Full mode with timestamp
-                if len(packet) == 32:
+                if packet_length == 32 and profile == self.PROFILE_FULL:
                     try:
-                        timestamp = datetime.fromtimestamp(self._unpack_int(packet, 28, 32))
+                        timestamp = datetime.fromtimestamp(values[7])
                     except Exception:
                         timestamp = None
 
                     d["exchange_timestamp"] = timestamp
 
+                data.append(d)
+            # Quote and full mode, only ohlc asked for
+            elif profile == self.PROFILE_OHLC:
+                d = {
+                    "tradable": tradable,
+                    "mode": _PACKET_MODES[packet_length],
+                    "instrument_token": instrument_token,
+                    "last_price": values[1] / divisor,
+                    "ohlc": {
+                        "open": values[2] / divisor,
+                        "high": values[3] / divisor,
+                        "low": values[4] / divisor,
+                        "close": values[5] / divisor
+                    }
+                }
+
+                # Compute the change price using close price and last price
+                d["change"] = 0
+                if (d["ohlc"]["close"] != 0):
+                    d["change"] = (d["last_price"] - d["ohlc"]["close"]) * 100 / d["ohlc"]["close"]
+
                 data.append(d)
             # Quote and full mode
-            elif len(packet) == 44 or len(packet) == 184:
-                mode = self.MODE_QUOTE if len(packet) == 44 else self.MODE_FULL
+            else:
+                mode = self.MODE_QUOTE if packet_length == 44 else self.MODE_FULL
 
                 d = {
                     "tradable": tradable,
                     "mode": mode,
                     "instrument_token": instrument_token,
-                    "last_price": self._unpack_int(packet, 4, 8) / divisor,
-                    "last_traded_quantity": self._unpack_int(packet, 8, 12),
-                    "average_traded_price": self._unpack_int(packet, 12, 16) / divisor,
-                    "volume_traded": self._unpack_int(packet, 16, 20),
-                    "total_buy_quantity": self._unpack_int(packet, 20, 24),
-                    "total_sell_quantity": self._unpack_int(packet, 24, 28),
+                    "last_price": values[1] / divisor,
+                    "last_traded_quantity": values[2],
+                    "average_traded_price": values[3] / divisor,
+                    "volume_traded": values[4],
+                    "total_buy_quantity": values[5],
+                    "total_sell_quantity": values[6],
                     "ohlc": {
-                        "open": self._unpack_int(packet, 28, 32) / divisor,
-                        "high": self._unpack_int(packet, 32, 36) / divisor,
-                        "low": self._unpack_int(packet, 36, 40) / divisor,
-                        "close": self._unpack_int(packet, 40, 44) / divisor
+                        "open": values[7] / divisor,
+                        "high": values[8] / divisor,
+                        "low": values[9] / divisor,
+                        "close": values[10] / divisor
                     }
                 }
 
@@ -812,21 +1099,21 @@ class KiteTicker(object):
                     d["change"] = (d["last_price"] - d["ohlc"]["close"]) * 100 / d["ohlc"]["close"]
 
                 # Parse full mode
-                if len(packet) == 184:
+                if packet_length == 184:
                     try:
-                        last_trade_time = datetime.fromtimestamp(self._unpack_int(packet, 44, 48))
+                        last_trade_time = datetime.fromtimestamp(values[11])
                     except Exception:
                         last_trade_time = None
 
                     try:
-                        timestamp = datetime.fromtimestamp(self._unpack_int(packet, 60, 64))
+                        timestamp = datetime.fromtimestamp(values[15])
                     except Exception:
                         timestamp = None
 
                     d["last_trade_time"] = last_trade_time
-                    d["oi"] = self._unpack_int(packet, 48, 52)
-                    d["oi_day_high"] = self._unpack_int(packet, 52, 56)
-                    d["oi_day_low"] = self._unpack_int(packet, 56, 60)
+                    d["oi"] = values[12]
+                    d["oi_day_high"] = values[13]
+                    d["oi_day_low"] = values[14]
                     d["exchange_timestamp"] = timestamp
 
                     # Market depth entries.
@@ -835,12 +1122,12 @@ class KiteTicker(object):
                         "sell": []
                     }
 
-                    # Compile the market depth lists.
-                    for i, p in enumerate(range(64, len(packet), 12)):
+                    # Compile the market depth lists, (quantity, price, orders) per entry.
+                    for i, p in enumerate(range(16, len(values), 3)):
                         depth["sell" if i >= 5 else "buy"].append({
-                            "quantity": self._unpack_int(packet, p, p + 4),
-                            "price": self._unpack_int(packet, p + 4, p + 8) / divisor,
-                            "orders": self._unpack_int(packet, p + 8, p + 10, byte_format="H")
+                            "quantity": values[p],
+                            "price": values[p + 1] / divisor,
+                            "orders": values[p + 2]
                         })
 
                     d["depth"] = depth
@@ -849,23 +1136,324 @@ class KiteTicker(object):
 
         return data
 
+    def _parse_binary_lazy(self, bin, received_ns=None):
+        """Parse binary data to a list of lazily decoded `Tick` objects."""
+        profile = self.decode_profile
+        return [Tick(bytes(packet), profile, received_ns)
+                for packet in self._split_packets(bin) if len(packet) in _PACKET_STRUCTS]
+
+    def _parse_binary_batch(self, bin):
+        """Parse binary data to structured arrays of ticks grouped by packet length."""
+        layouts = _PROFILE_BATCH_DTYPES[self.decode_profile]
+        groups = {}
+
+        for length, raw in self._split_packet_runs(bin, layouts):
+            groups.setdefault(length, []).append(raw)
+
+        data = {}
+        for length, runs in groups.items():
+            raw = runs[0] if len(runs) == 1 else np.concatenate(runs)
+            data[length] = self._decode_batch(raw, layouts[length][1])
+
+        return data
+
+    def _decode_batch(self, raw, dtype):
+        """Convert raw wire records of a single packet length to an array of `dtype` (fields present in `raw`)."""
+        ticks = np.empty(len(raw), dtype=dtype)
+        fields = raw.dtype.names
+
+        instrument_token = raw["instrument_token"]
+        segment = instrument_token & 0xff
+
+        # Add price divisor based on segment
+        divisor = np.full(len(raw), 100.0)
+        divisor[segment == self.EXCHANGE_MAP["cds"]] = 10000000.0
+        divisor[segment == self.EXCHANGE_MAP["bcd"]] = 10000.0
+
+        ticks["instrument_token"] = instrument_token
+        ticks["tradable"] = segment != self.EXCHANGE_MAP["indices"]
+        ticks["last_price"] = raw["last_price"] / divisor
+
+        if "open" not in fields:
+            return ticks
+
+        ohlc = ticks["ohlc"]
+        for field in ("open", "high", "low", "close"):
+            ohlc[field] = raw[field] / divisor
+
+        # Compute the change price using close price and last price
+        close = ohlc["close"]
+        ticks["change"] = np.divide((ticks["last_price"] - close) * 100, close,
+                                    out=np.zeros(len(raw)), where=close != 0)
+
+        if "exchange_timestamp" in fields:
+            ticks["exchange_timestamp"] = raw["exchange_timestamp"]
+
+        if "volume_traded" in fields:
+            ticks["last_traded_quantity"] = raw["last_traded_quantity"]
+            ticks["average_traded_price"] = raw["average_traded_price"] / divisor
+            ticks["volume_traded"] = raw["volume_traded"]
+            ticks["total_buy_quantity"] = raw["total_buy_quantity"]
+            ticks["total_sell_quantity"] = raw["total_sell_quantity"]
+
+        if "depth" in fields:
+            for field in ("last_trade_time", "oi", "oi_day_high", "oi_day_low"):
+                ticks[field] = raw[field]
+
+            # First five depth entries are bids, the rest are offers.
+            depth = raw["depth"]
+            for side, entries in (("buy", depth[:, :5]), ("sell", depth[:, 5:])):
+                ticks["depth"][side]["quantity"] = entries["quantity"]
+                ticks["depth"][side]["price"] = entries["price"] / divisor[:, None]
+                ticks["depth"][side]["orders"] = entries["orders"]
+
+        return ticks
+
+    def _split_packet_runs(self, bin, layouts=None):
+        """
+        Split the data to runs of consecutive packets with the same length.
+
+        Yields `(packet_length, raw)` where `raw` is a zero-copy structured view over the frame.
+        `layouts` maps packet length to `(raw dtype, decoded dtype)`, packets of unknown length are skipped.
+        """
+        if layouts is None:
+            layouts = _PROFILE_BATCH_DTYPES[self.PROFILE_FULL]
+
+        # Ignore heartbeat data.
+        if len(bin) < 4:
+            return
+
+        number_of_packets = _PACKET_HEADER.unpack_from(bin, 0)[0]
+        first_length = _PACKET_HEADER.unpack_from(bin, 2)[0]
+
+        # Fast path, every packet in the frame has the same length (one subscription mode).
+        if first_length in layouts and len(bin) == 2 + number_of_packets * (first_length + 2):
+            raw = np.frombuffer(bin, dtype=layouts[first_length][0], count=number_of_packets, offset=2)
+            if (raw["packet_length"] == first_length).all():
+                yield first_length, raw
+                return
+
+        run_start, run_length, run_count = 2, None, 0
+
+        j = 2
+        for i in range(number_of_packets):
+            packet_length = _PACKET_HEADER.unpack_from(bin, j)[0]
+
+            if packet_length != run_length:
+                if run_count and run_length in layouts:
+                    yield run_length, np.frombuffer(bin, dtype=layouts[run_length][0],
+                                                    count=run_count, offset=run_start)
+                run_start, run_length, run_count = j, packet_length, 0
+
+            run_count += 1
+            j = j + 2 + packet_length
+
+        if run_count and run_length in layouts:
+            yield run_length, np.frombuffer(bin, dtype=layouts[run_length][0],
+                                            count=run_count, offset=run_start)
+
     def _unpack_int(self, bin, start, end, byte_format="I"):
         """Unpack binary data as unsgined interger."""
         return struct.unpack(">" + byte_format, bin[start:end])[0]
 
     def _split_packets(self, bin):
-        """Split the data to individual packets of ticks."""
+        """Split the data to individual packets of ticks (zero-copy views over the frame)."""
+        view = memoryview(bin)
+        return [view[offset: offset + packet_length] for offset, packet_length in self._packet_offsets(bin)]
+
+    def _packet_offsets(self, bin):
+        """Walk the frame and yield `(offset, packet_length)` of every packet without copying it."""
         # Ignore heartbeat data.
         if len(bin) < 2:
-            return []
+            return
 
-        number_of_packets = self._unpack_int(bin, 0, 2, byte_format="H")
-        packets = []
+        number_of_packets = _PACKET_HEADER.unpack_from(bin, 0)[0]
 
         j = 2
         for i in range(number_of_packets):
-            packet_length = self._unpack_int(bin, j, j + 2, byte_format="H")
-            packets.append(bin[j + 2: j + 2 + packet_length])
+            packet_length = _PACKET_HEADER.unpack_from(bin, j)[0]
+            yield j + 2, packet_length
             j = j + 2 + packet_length
 
-        return packets
+
+"""
+Lazily decoded tick.
+"""
+_TOKEN_AND_PRICE = struct.Struct(">2I")
+_UINT32 = struct.Struct(">I")
+
+# Keys of a decoded tick by packet length, in the same order as `KiteTicker._parse_binary` builds them.
+_LTP_TICK_KEYS = ("tradable", "mode", "instrument_token", "last_price")
+_INDEX_TICK_KEYS = _LTP_TICK_KEYS + ("ohlc", "change")
+_QUOTE_TICK_KEYS = _LTP_TICK_KEYS + ("last_traded_quantity", "average_traded_price", "volume_traded",
+                                     "total_buy_quantity", "total_sell_quantity", "ohlc", "change")
+_TICK_KEYS = {
+    8: _LTP_TICK_KEYS,
+    28: _INDEX_TICK_KEYS,
+    32: _INDEX_TICK_KEYS + ("exchange_timestamp",),
+    44: _QUOTE_TICK_KEYS,
+    184: _QUOTE_TICK_KEYS + ("last_trade_time", "oi", "oi_day_high", "oi_day_low", "exchange_timestamp", "depth"),
+}
+
+# (keys, key set) of a tick by decode profile and packet length.
+_PROFILE_TICK_KEYS = {
+    "ltp": {length: _LTP_TICK_KEYS for length in _TICK_KEYS},
+    "ohlc": {length: _LTP_TICK_KEYS if length == 8 else _INDEX_TICK_KEYS for length in _TICK_KEYS},
+    "full": _TICK_KEYS,
+}
+_PROFILE_TICK_KEYS = {
+    profile: {length: (keys, frozenset(keys)) for length, keys in by_length.items()}
+    for profile, by_length in _PROFILE_TICK_KEYS.items()
+}
+
+# Position of plain fields in the unpacked packet and whether they are prices.
+_TICK_VALUE_FIELDS = {
+    "last_traded_quantity": (2, False),
+    "average_traded_price": (3, True),
+    "volume_traded": (4, False),
+    "total_buy_quantity": (5, False),
+    "total_sell_quantity": (6, False),
+    "oi": (12, False),
+    "oi_day_high": (13, False),
+    "oi_day_low": (14, False),
+}
+
+# Offsets of the ohlc fields in the packet.
+_INDEX_OHLC_OFFSETS = (("high", 8), ("low", 12), ("open", 16), ("close", 20))
+_QUOTE_OHLC_OFFSETS = (("open", 28), ("high", 32), ("low", 36), ("close", 40))
+
+
+class Tick(Mapping):
+    """
+    A tick which holds the raw packet bytes and decodes fields only on first access.
+
+    Only `instrument_token` is decoded up front. `last_price` is a single 4 byte read, `ohlc` and `depth`
+    are built and cached when first read. Fields can be read as attributes (`tick.last_price`) or as
+    mapping keys (`tick["ohlc"]["open"]`) so callers written against the dict ticks keep working.
+    Keys outside the decode `profile` are not exposed. `received_ns` is the wall clock time
+    (`time.time_ns()`) its frame arrived, when known.
+    """
+
+    __slots__ = ("packet", "instrument_token", "received_ns", "_keys", "_divisor", "_values", "_ohlc", "_depth")
+
+    def __init__(self, packet, profile=KiteTicker.PROFILE_FULL, received_ns=None):
+        self.packet = packet
+        self.received_ns = received_ns
+        self._keys = _PROFILE_TICK_KEYS[profile][len(packet)]
+        self.instrument_token = _UINT32.unpack_from(packet, 0)[0]
+        self._divisor = _SEGMENT_DIVISORS.get(self.instrument_token & 0xff, 100.0)
+        self._values = None
+        self._ohlc = None
+        self._depth = None
+
+    @property
+    def mode(self):
+        length = len(self.packet)
+        if length == 8:
+            return KiteTicker.MODE_LTP
+        return KiteTicker.MODE_QUOTE if length in (28, 44) else KiteTicker.MODE_FULL
+
+    @property
+    def tradable(self):
+        # All indices are not tradable
+        return (self.instrument_token & 0xff) != KiteTicker.EXCHANGE_MAP["indices"]
+
+    @property
+    def last_price(self):
+        return _TOKEN_AND_PRICE.unpack_from(self.packet, 0)[1] / self._divisor
+
+    @property
+    def ohlc(self):
+        if self._ohlc is None:
+            offsets = _INDEX_OHLC_OFFSETS if len(self.packet) < 44 else _QUOTE_OHLC_OFFSETS
+            divisor = self._divisor
+            self._ohlc = {
+                key: _UINT32.unpack_from(self.packet, offset)[0] / divisor
+                for key, offset in offsets
+            }
+        return self._ohlc
+
+    @property
+    def change(self):
+        close = self.ohlc["close"]
+        if close == 0:
+            return 0
+        return (self.last_price - close) * 100 / close
+
+    @property
+    def exchange_timestamp(self):
+        return self._timestamp(28 if len(self.packet) == 32 else 60)
+
+    @property
+    def last_trade_time(self):
+        return self._timestamp(44)
+
+    @property
+    def depth(self):
+        if self._depth is None:
+            values = self._unpacked()
+            depth = {
+                "buy": [],
+                "sell": []
+            }
+
+            for i, p in enumerate(range(16, len(values), 3)):
+                depth["sell" if i >= 5 else "buy"].append({
+                    "quantity": values[p],
+                    "price": values[p + 1] / self._divisor,
+                    "orders": values[p + 2]
+                })
+
+            self._depth = depth
+        return self._depth
+
+    def __getattr__(self, name):
+        """Plain numeric fields (volumes, quantities, OI) straight from the unpacked packet."""
+        field = _TICK_VALUE_FIELDS.get(name)
+        if field is None or name not in self._keys[1]:
+            raise AttributeError(name)
+
+        index, is_price = field
+        value = self._unpacked()[index]
+        return value / self._divisor if is_price else value
+
+    def _unpacked(self):
+        if self._values is None:
+            self._values = _PACKET_STRUCTS[len(self.packet)].unpack_from(self.packet)
+        return self._values
+
+    def _timestamp(self, offset):
+        try:
+            return datetime.fromtimestamp(_UINT32.unpack_from(self.packet, offset)[0])
+        except Exception:
+            return None
+
+    def __getitem__(self, key):
+        if key not in self._keys[1]:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._keys[1]
+
+    def __iter__(self):
+        return iter(self._keys[0])
+
+    def __len__(self):
+        return len(self._keys[0])
+
+    def covers(self, other):
+        """True if this tick carries at least every field of `other` (a previous tick of the same token)."""
+        if isinstance(other, Tick):
+            return other._keys[1] <= self._keys[1]
+        return all(key in self for key in other)
+
+    def to_dict(self):
+        """Fully decoded plain dict, same structure as the `TICK_FORMAT_DICT` ticks."""
+        return {key: self[key] for key in self}
+
+    def copy(self):
+        return self.to_dict()
+
+    def __repr__(self):
+        return "Tick({!r})".format(self.to_dict())
@@ -0,0 +1,330 @@
+# ticker_pool.py
+"""
+Pool of ticker connections that looks like a single KiteTicker.
+
+Kite caps instruments per websocket connection, so subscriptions are
+sharded over up to `max_connections` tickers built by `ticker_factory`.
+New tokens go to the least loaded shard that has room (opening a new
+connection when all are full). When tokens are removed and the rest fits
+into fewer connections, the emptiest extra shard is drained into the others
+and closed. Ticks of all shards are merged into one `on_ticks` feed and
+delivered one batch at a time.
+
+Twisted shards (`KiteTicker`) all run on the one reactor thread, so their
+frames are still read and decoded one after another; only asyncio shards
+(`TICKER_BACKEND=asyncio`, `AsyncKiteTicker`) read and decode on a thread
+each.
+"""
+import collections
+import os
+import threading
+
+from twisted.internet import reactor
+from twisted.python import threadable
+
+from logger_config import setup_logger
+from ticker import KiteTicker
+
+logger = setup_logger("Ticker_Pool")
+
+TOKENS_PER_CONNECTION = int(os.getenv("TICKER_TOKENS_PER_CONNECTION", "3000"))
+MAX_CONNECTIONS = int(os.getenv("TICKER_MAX_CONNECTIONS", "3"))
+RECENT_UPDATES = 256  # order postbacks remembered to drop the copies of the other shards
+
+
+class _Shard:
+    """One ticker connection and the tokens (token → mode) assigned to it."""
+
+    def __init__(self, index, ticker):
+        self.index = index
+        self.ticker = ticker
+        self.tokens = {}
+        self.pending = {}  # assigned but not yet sent (connection not open)
+        self.connected = False
+
+
+class KiteTickerPool:
+    MODE_FULL = KiteTicker.MODE_FULL
+    MODE_QUOTE = KiteTicker.MODE_QUOTE
+    MODE_LTP = KiteTicker.MODE_LTP
+
+    def __init__(self, ticker_factory, tokens_per_connection=TOKENS_PER_CONNECTION, max_connections=MAX_CONNECTIONS):
+        self.ticker_factory = ticker_factory
+        self.tokens_per_connection = tokens_per_connection
+        self.max_connections = max_connections
+
+        self.shards = []
+        self.subscribed_tokens = {}
+        self._decode_profile = None
+
+        # Same callbacks as KiteTicker
+        self.on_ticks = None
+        self.on_connect = None
+        self.on_close = None
+        self.on_error = None
+        self.on_reconnect = None
+        self.on_noreconnect = None
+        self.on_order_update = None
+
+        self._connect_kwargs = None
+        self._lock = threading.RLock()
+        self._tick_lock = threading.Lock()
+        self._recent_updates = collections.OrderedDict()  # postbacks already passed on (bounded)
+
+    # ---------------------------------------------------------
+    # CONNECTION
+    # ---------------------------------------------------------
+    def connect(self, threaded=True, **kwargs):
+        """Open the primary connection, more are opened as subscriptions need them."""
+        with self._lock:
+            self._connect_kwargs = dict(kwargs, threaded=threaded)
+            if not self.shards:
+                self._open_shard()
+
+    def is_connected(self):
+        return any(shard.connected for shard in self.shards)
+
+    def close(self, code=None, reason=None):
+        with self._lock:
+            for shard in self.shards:
+                try:
+                    shard.ticker.close(code, reason)
+                except Exception:
+                    logger.exception("Shard %s close error", shard.index)
+
+    def stop(self):
+        with self._lock:
+            for shard in self.shards:
+                try:
+                    shard.ticker.stop()
+                except Exception:
+                    # twisted shards share one reactor, only the first stop() succeeds
+                    pass
+
+    def stop_retry(self):
+        with self._lock:
+            for shard in self.shards:
+                shard.ticker.stop_retry()
+
+    @property
+    def decode_profile(self):
+        return self._decode_profile
+
+    @decode_profile.setter
+    def decode_profile(self, profile):
+        self._decode_profile = profile
+        for shard in self.shards:
+            shard.ticker.decode_profile = profile
+
+    # ---------------------------------------------------------
+    # SUBSCRIPTIONS
+    # ---------------------------------------------------------
+    def subscribe(self, instrument_tokens):
+        with self._lock:
+            new = [t for t in instrument_tokens if t not in self.subscribed_tokens]
+            assigned = self._assign(new, self.MODE_QUOTE)
+            self._send_subscribe(assigned)
+            return sum(len(tokens) for tokens in assigned.values()) == len(new)
+
+    def unsubscribe(self, instrument_tokens):
+        with self._lock:
+            by_shard = {}
+            for token in instrument_tokens:
+                if self.subscribed_tokens.pop(token, None) is None:
+                    continue
+                shard = self._shard_of(token)
+                if shard:
+                    shard.tokens.pop(token, None)
+                    if shard.pending.pop(token, None) is None:
+                        by_shard.setdefault(shard, []).append(token)
+
+            for shard, tokens in by_shard.items():
+                if shard.connected:
+                    shard.ticker.unsubscribe(tokens)
+
+            self._consolidate()
+            return True
+
+    def set_mode(self, mode, instrument_tokens):
+        with self._lock:
+            by_shard = {}
+            for token in instrument_tokens:
+                shard = self._shard_of(token)
+                if not shard:
+                    continue
+                self.subscribed_tokens[token] = mode
+                shard.tokens[token] = mode
+                if token in shard.pending:
+                    shard.pending[token] = mode
+                else:
+                    by_shard.setdefault(shard, []).append(token)
+
+            for shard, tokens in by_shard.items():
+                if shard.connected:
+                    shard.ticker.set_mode(mode, tokens)
+            return True
+
+    def _assign(self, tokens, mode):
+        """Place tokens on the least loaded shards, opening connections while under the cap."""
+        assigned = {}
+        for token in tokens:
+            shard = self._least_loaded()
+            if shard is None:
+                logger.error("❌ Ticker pool full (%s x %s) — %s not subscribed",
+                             self.max_connections, self.tokens_per_connection, token)
+                continue
+
+            shard.tokens[token] = mode
+            self.subscribed_tokens[token] = mode
+            assigned.setdefault(shard, []).append(token)
+        return assigned
+
+    def _least_loaded(self):
+        open_shards = [s for s in self.shards if len(s.tokens) < self.tokens_per_connection]
+        if open_shards:
+            return min(open_shards, key=lambda s: len(s.tokens))
+        if len(self.shards) < self.max_connections:
+            return self._open_shard()
+        return None
+
+    def _send_subscribe(self, assigned):
+        for shard, tokens in assigned.items():
+            if not shard.connected:
+                for token in tokens:
+                    shard.pending[token] = shard.tokens[token]
+                continue
+
+            try:
+                shard.ticker.subscribe(tokens)
+            except Exception:
+                logger.exception("Shard %s subscribe error", shard.index)
+                for token in tokens:
+                    shard.pending[token] = shard.tokens[token]
+
+    def _consolidate(self):
+        """Drain and close the emptiest extra shard while the remaining ones can hold its tokens."""
+        while len(self.shards) > 1:
+            victim = min(self.shards[1:], key=lambda s: len(s.tokens))
+            others = [s for s in self.shards if s is not victim]
+            room = sum(self.tokens_per_connection - len(s.tokens) for s in others)
+            if len(victim.tokens) > room:
+                return
+
+            moving = dict(victim.tokens)
+            logger.info("♻️ Rebalancing %s tokens off shard %s", len(moving), victim.index)
+
+            self.shards.remove(victim)
+            try:
+                victim.ticker.close(1000, "rebalanced")
+            except Exception:
+                logger.exception("Shard %s close error", victim.index)
+
+            for token in moving:
+                self.subscribed_tokens.pop(token, None)
+
+            by_mode = {}
+            for token, mode in moving.items():
+                by_mode.setdefault(mode, []).append(token)
+
+            for mode, tokens in by_mode.items():
+                assigned = self._assign(tokens, mode)
+                self._send_subscribe(assigned)
+                for shard, shard_tokens in assigned.items():
+                    if shard.connected and mode != self.MODE_QUOTE:
+                        shard.ticker.set_mode(mode, shard_tokens)
+
+    def _shard_of(self, token):
+        for shard in self.shards:
+            if token in shard.tokens:
+                return shard
+        return None
+
+    # ---------------------------------------------------------
+    # SHARDS
+    # ---------------------------------------------------------
+    def _open_shard(self):
+        index = max((s.index for s in self.shards), default=-1) + 1
+        ticker = self.ticker_factory()
+        if self._decode_profile is not None:
+            ticker.decode_profile = self._decode_profile
+        else:
+            self._decode_profile = ticker.decode_profile
+
+        shard = _Shard(index, ticker)
+        ticker.on_ticks = self._on_ticks
+        ticker.on_connect = lambda ws, response: self._on_shard_connect(shard, response)
+        ticker.on_close = lambda ws, code, reason: self._on_shard_close(shard, code, reason)
+        ticker.on_error = lambda ws, code, reason: self._on_shard_error(shard, code, reason)
+        ticker.on_reconnect = lambda ws, attempts: self.on_reconnect and self.on_reconnect(self, attempts)
+        ticker.on_noreconnect = lambda ws: self.on_noreconnect and self.on_noreconnect(self)
+        ticker.on_order_update = lambda ws, data: self._on_shard_order_update(shard, data)
+
+        self.shards.append(shard)
+        logger.info("🔌 Opening ticker shard %s (%s/%s)", index, len(self.shards), self.max_connections)
+
+        if self._connect_kwargs is not None:
+            self._connect(ticker)
+        return shard
+
+    def _connect(self, ticker):
+        # Twisted tickers share the reactor: once it runs, connecting must happen on its thread
+        twisted_ticker = type(ticker).connect is KiteTicker.connect
+        if twisted_ticker and reactor.running and not threadable.isInIOThread():
+            reactor.callFromThread(ticker.connect, **self._connect_kwargs)
+        else:
+            ticker.connect(**self._connect_kwargs)
+
+    def _on_ticks(self, ws, ticks):
+        if self.on_ticks:
+            with self._tick_lock:
+                self.on_ticks(self, ticks)
+
+    def _on_shard_connect(self, shard, response):
+        with self._lock:
+            shard.connected = True
+            pending, shard.pending = shard.pending, {}
+
+            by_mode = {}
+            for token, mode in pending.items():
+                by_mode.setdefault(mode, []).append(token)
+
+            try:
+                if pending:
+                    shard.ticker.subscribe(list(pending))
+                for mode, tokens in by_mode.items():
+                    if mode != self.MODE_QUOTE:
+                        shard.ticker.set_mode(mode, tokens)
+            except Exception:
+                logger.exception("Shard %s pending subscribe error", shard.index)
+                shard.pending.update(pending)
+
+        logger.info("🟢 Ticker shard %s connected | tokens=%s", shard.index, len(shard.tokens))
+        if self.on_connect:
+            self.on_connect(self, response)
+
+    def _on_shard_close(self, shard, code, reason):
+        shard.connected = False
+        logger.info("🔴 Ticker shard %s closed | code=%s reason=%s", shard.index, code, reason)
+
+        # Only report the pool as closed when no shard is left open
+        if self.on_close and not self.is_connected():
+            self.on_close(self, code, reason)
+
+    def _on_shard_error(self, shard, code, reason):
+        if self.on_error:
+            self.on_error(self, code, reason)
+
+    def _on_shard_order_update(self, shard, data):
+        # Every connection of the user gets the same postback: pass on the first copy from whichever
+        # shard is up (the order book also ignores stale fills, this only saves the duplicate work)
+        if not self.on_order_update:
+            return
+
+        key = (data.get("order_id"), data.get("status"), data.get("filled_quantity"), data.get("exchange_update_timestamp"))
+        with self._tick_lock:
+            if key in self._recent_updates:
+                return
+            self._recent_updates[key] = None
+            if len(self._recent_updates) > RECENT_UPDATES:
+                self._recent_updates.popitem(last=False)
+            self.on_order_update(self, data)
@@ -0,0 +1,256 @@
+# triggers.py
+"""
+Tick-driven price triggers.
+
+Consumers register a threshold per token; `WebSocketManager.on_ticks`
+calls `evaluate` with every incoming batch and only the tokens in that
+batch are looked at. Fired callbacks run one after another on a worker
+thread, so order placement never blocks the ticker; their logging goes
+through the order pipeline's outbox so it never delays the order.
+
+For large watch lists a `ThresholdIndex` keeps all tokens and thresholds
+in sorted NumPy arrays; a batch is matched with one `searchsorted` and one
+vectorized compare against the live quote table, and every token that
+crossed is reported in a single callback.
+"""
+import itertools
+import queue
+import threading
+
+import numpy as np
+
+from latency import latency
+from order_pipeline import outbox
+from logger_config import setup_logger
+
+logger = setup_logger("Triggers")
+
+ABOVE = "above"   # fires when last_price >= threshold
+BELOW = "below"   # fires when last_price <= threshold
+
+
+class Trigger:
+    __slots__ = ("id", "token", "threshold", "direction", "callback", "group", "active")
+
+    def __init__(self, trigger_id, token, threshold, direction, callback, group):
+        self.id = trigger_id
+        self.token = token
+        self.threshold = threshold
+        self.direction = direction
+        self.callback = callback
+        self.group = group
+        self.active = True
+
+    def hit(self, price):
+        return price >= self.threshold if self.direction == ABOVE else price <= self.threshold
+
+
+class ThresholdIndex:
+    """
+    Thresholds of many tokens in sorted arrays, built once (e.g. from the eligibility result).
+
+    `callback(crossed)` gets a list of `(token, price)` of every token that
+    crossed in a batch, in the order the tokens were given. Each token fires
+    once; with `exclusive` the whole index disarms after the first callback.
+    """
+
+    def __init__(self, tokens, thresholds, callback, direction=ABOVE, group=None, exclusive=False):
+        tokens = np.asarray([int(t) for t in tokens], dtype="i8")
+        thresholds = np.asarray(thresholds, dtype="f8")
+
+        order = np.argsort(tokens, kind="stable")
+        self.tokens = tokens[order]
+        self.thresholds = thresholds[order]
+        self.position = order  # index in the original list, for reporting order
+        self.armed = np.ones(len(tokens), dtype=bool)
+
+        self.callback = callback
+        self.direction = direction
+        self.group = group
+        self.exclusive = exclusive
+        self.active = True
+
+    def crossed(self, quotes, slots):
+        """`(token, price)` pairs crossed by the quote table rows `slots` (tick dispatcher thread)."""
+        if not self.active or not len(slots) or not len(self.tokens):
+            return []
+
+        batch_tokens = quotes.tokens[slots]
+        pos = np.searchsorted(self.tokens, batch_tokens)
+        pos[pos == len(self.tokens)] = 0
+        match = (self.tokens[pos] == batch_tokens) & self.armed[pos]
+        if not match.any():
+            return []
+
+        pos = pos[match]
+        prices = quotes.columns["last_price"][slots[match]]
+        if self.direction == ABOVE:
+            hit = prices >= self.thresholds[pos]
+        else:
+            hit = prices <= self.thresholds[pos]
+        if not hit.any():
+            return []
+
+        pos, prices = pos[hit], prices[hit]
+        pos, first = np.unique(pos, return_index=True)  # a token can tick twice in one batch
+        prices = prices[first]
+
+        self.armed[pos] = False
+        if self.exclusive:
+            self.active = False
+
+        order = np.argsort(self.position[pos], kind="stable")
+        return [(int(self.tokens[p]), float(prices[i])) for i, p in zip(order, pos[order])]
+
+
+class TriggerRegistry:
+    """
+    One-shot price triggers by token, plus threshold indexes.
+
+    The token → triggers map is replaced (copy on write) on register/cancel,
+    so `evaluate` on the tick dispatcher reads it without a lock.
+    """
+
+    def __init__(self):
+        self._by_token = {}
+        self._indexes = ()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self._queue = queue.SimpleQueue()
+        self._worker = None
+
+    # ---------------------------------------------------------
+    # REGISTRATION
+    # ---------------------------------------------------------
+    def register(self, token, threshold, callback, direction=ABOVE, group=None):
+        """`callback(token, price)` runs on the trigger worker once the threshold is hit."""
+        trigger = Trigger(next(self._ids), int(token), float(threshold), direction, callback, group)
+
+        with self._lock:
+            by_token = dict(self._by_token)
+            by_token[trigger.token] = by_token.get(trigger.token, ()) + (trigger,)
+            self._by_token = by_token
+
+        self._ensure_worker()
+        return trigger
+
+    def cancel(self, trigger):
+        self._remove(lambda t: t is trigger)
+
+    def add_index(self, index):
+        with self._lock:
+            self._indexes = self._indexes + (index,)
+        self._ensure_worker()
+        return index
+
+    def cancel_group(self, group):
+        removed = self._remove(lambda t: t.group == group)
+        if removed:
+            logger.info("🧹 Cancelled %s triggers of %s", removed, group)
+        return removed
+
+    def _remove(self, match):
+        with self._lock:
+            by_token = {}
+            removed = 0
+            for token, triggers in self._by_token.items():
+                kept = []
+                for trigger in triggers:
+                    if match(trigger):
+                        trigger.active = False
+                        removed += 1
+                    else:
+                        kept.append(trigger)
+                if kept:
+                    by_token[token] = tuple(kept)
+            self._by_token = by_token
+
+            indexes = []
+            for index in self._indexes:
+                if match(index):
+                    index.active = False
+                    removed += len(index.tokens)
+                else:
+                    indexes.append(index)
+            self._indexes = tuple(indexes)
+            return removed
+
+    def __len__(self):
+        return sum(len(t) for t in self._by_token.values()) + sum(len(i.tokens) for i in self._indexes)
+
+    # ---------------------------------------------------------
+    # HOT PATH (tick dispatcher thread)
+    # ---------------------------------------------------------
+    def evaluate(self, ticks, quotes=None, slots=None, merged_ns=None):
+        """
+        Check `ticks`; indexes need the live quote table and the slots `quotes.update(ticks)` touched.
+        `merged_ns` (when the batch was merged) feeds the merge_to_signal latency.
+        """
+        if self._indexes and quotes is not None:
+            slots = np.asarray(slots, dtype="i8")
+            for index in self._indexes:
+                crossed = index.crossed(quotes, slots)
+                if crossed:
+                    self._queue.put((self._fire_index, merged_ns, index, crossed))
+
+        by_token = self._by_token
+        if not by_token:
+            return
+
+        for tick in ticks:
+            triggers = by_token.get(tick.get("instrument_token"))
+            if not triggers:
+                continue
+
+            price = tick.get("last_price")
+            if price is None:
+                continue
+
+            for trigger in triggers:
+                if trigger.active and trigger.hit(price):
+                    trigger.active = False
+                    self._queue.put((self._fire, merged_ns, trigger, price))
+
+    # ---------------------------------------------------------
+    # WORKER
+    # ---------------------------------------------------------
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="trigger-worker", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            fire, merged_ns, *args = self._queue.get()
+            if merged_ns is not None:
+                latency.since("merge_to_signal", merged_ns)
+            fire(*args)
+
+    def _fire(self, trigger, price):
+        self.cancel(trigger)
+
+        outbox.log(logger.info, "🎯 Trigger fired | token=%s price=%s %s %s",
+                   trigger.token, price, trigger.direction, trigger.threshold)
+        try:
+            trigger.callback(trigger.token, price)
+        except Exception:
+            logger.exception("❌ Trigger callback error | token=%s", trigger.token)
+
+    def _fire_index(self, index, crossed):
+        if not index.active or not index.armed.any():
+            self._remove(lambda t: t is index)
+
+        outbox.log(logger.info, "🎯 Index %s crossed | %s", index.group, crossed)
+        try:
+            index.callback(crossed)
+        except Exception:
+            logger.exception("❌ Index callback error | group=%s", index.group)
+
+
+# ---------------------------------------------------------
+# GLOBAL INSTANCE
+# ---------------------------------------------------------
+triggers = TriggerRegistry()
@@ -1,6 +1,8 @@
 from state_manager import trading_state as state
 from datetime import datetime
+import math
 from logger_config import setup_logger
+from sizing import quantity_table
 
 logger = setup_logger("WEB_SOCKET_LOGIC_PRICE")
 # --------------------------------------------------
@@ -20,7 +22,7 @@ def price_logic():
 
     logger.info("Running price logic...")
     kite = state.get("kite")
-    live = state.get("live_data", {})
+    live = state["live_data"]
     eligible = state.get("eligible_stocks", [])
     running = state.get("is_running")
 
@@ -91,22 +93,30 @@ def price_logic():
     # ==================================================
     # ✅ CASE 2: NO ACTIVE POSITION → ELIGIBLE STOCK FEED
     # ==================================================
+    # Stocks without a usable token are skipped, like any other bad row
+    priced = []
     for stock in eligible:
         try:
-            token = int(stock.get("instrument_token"))
+            priced.append((stock, int(stock.get("instrument_token"))))
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Skipping {stock.get('symbol')} in /price: bad instrument_token")
+
+    # One consistent snapshot of every eligible token (taken without blocking the ticker)
+    quotes = live.snapshot([token for _, token in priced])
+
+    for (stock, token), quote in zip(priced, quotes):
+        try:
             symbol = stock.get("symbol")
 
             high = safe_float(stock.get("high"))
             low = safe_float(stock.get("low"))
 
-            tick = live.get(token)
-            if not tick:
+            if not quote["seq"]:
                 continue
 
-            last = safe_float(tick.get("last_price") or tick.get("last"))
-            ohlc = tick.get("ohlc", {})
-            open_price = safe_float(ohlc.get("open"))
-            prev_close = safe_float(ohlc.get("close"))
+            last = safe_float(quote["last_price"])
+            open_price = 0.0 if math.isnan(quote["open"]) else float(quote["open"])
+            prev_close = 0.0 if math.isnan(quote["close"]) else float(quote["close"])
 
             # Skip invalid market data
             if last <= 0 or high <= 0:
@@ -119,9 +129,11 @@ def price_logic():
             to_trigger_points = round(high - last, 2)
             to_trigger_percent = round((to_trigger_points / high) * 100, 2)
 
-            # Quantity calculation
-            margin = state.get("margin", 0)
-            quantity = int(margin / (last/5))           
+            # Quantity the entry would be placed with (precomputed per tick)
+            quantity = quantity_table.quantity(token)
+            if quantity is None:
+                margin = state.get("margin", 0) or 0
+                quantity = int(margin / (last/5))
            
 
             rows.append({